@@ -1,18 +1,25 @@
 import streamlit as st
-import pandas as pd
 
+from datasource import TABLE_SOURCES
+from repository import TableRepository
+from storage import insert_row, update_row, delete_row
+from claims import place_claim, complete_claim, cancel_claim, remove_claim
 
-PROVIDERS_CSV = "C:/Local_food_Project/data/providers_data.csv"
-RECEIVERS_CSV = "C:/Local_food_Project/data/receivers_data.csv"
-FOOD_LISTINGS_CSV = "C:/Local_food_Project/data/food_listings_data.csv"
-CLAIMS_CSV = "C:/Local_food_Project/data/claims_data.csv"
+
+PROVIDERS_CSV = TABLE_SOURCES["providers"][0]
+RECEIVERS_CSV = TABLE_SOURCES["receivers"][0]
+FOOD_LISTINGS_CSV = TABLE_SOURCES["food_listings"][0]
+CLAIMS_CSV = TABLE_SOURCES["claims"][0]
+
+# The CSVs are the import format: sync.py loads them into the database and
+# every mutation below is a single indexed statement in a SQLite transaction.
 
 
 def load_data():
-    providers_df = pd.read_csv(PROVIDERS_CSV)
-    receivers_df = pd.read_csv(RECEIVERS_CSV)
-    food_listings_df = pd.read_csv(FOOD_LISTINGS_CSV)
-    claims_df = pd.read_csv(CLAIMS_CSV)
+    # call on demand, never at import: app.py imports this module before
+    # sync_all has created the tables. Served from the column snapshot when
+    # it is current, else from SQLite
+    providers_df, receivers_df, food_listings_df, claims_df = TableRepository().get_all()
     return providers_df, receivers_df, food_listings_df, claims_df
 
 
@@ -25,10 +32,8 @@ def save_to_csv(df, file_path):
 
 
 def add_food_item(name, qty, expiry, provider_id, provider_type, city, food_type, meal_type):
-    df = pd.read_csv(FOOD_LISTINGS_CSV)
-    new_id = df['Food_ID'].max() + 1 if not df.empty else 1
     new_row = {
-        'Food_ID': new_id,
+        'Food_ID': None,
         'Food_Name': name,
         'Quantity': qty,
         'Expiry_Date': expiry,
@@ -38,77 +43,54 @@ def add_food_item(name, qty, expiry, provider_id, provider_type, city, food_type
         'Food_Type': food_type,
         'Meal_Type': meal_type
     }
-    df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-    save_to_csv(df, FOOD_LISTINGS_CSV)
+    return insert_row("food_listings", new_row)
 
 def update_food_quantity(food_id, new_quantity):
-    df = pd.read_csv(FOOD_LISTINGS_CSV)
-    df.loc[df['Food_ID'] == food_id, 'Quantity'] = new_quantity
-    save_to_csv(df, FOOD_LISTINGS_CSV)
+    update_row("food_listings", food_id, {'Quantity': new_quantity})
 
 def delete_food_item(food_id):
-    df = pd.read_csv(FOOD_LISTINGS_CSV)
-    df = df[df['Food_ID'] != food_id]
-    save_to_csv(df, FOOD_LISTINGS_CSV)
+    delete_row("food_listings", food_id)
 
 
 def add_provider(provider_id, name, type_, city):
-    df = pd.read_csv(PROVIDERS_CSV)
     new_row = {'Provider_ID': provider_id, 'Name': name, 'Type': type_, 'City': city}
-    df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-    save_to_csv(df, PROVIDERS_CSV)
+    insert_row("providers", new_row)
 
 def update_provider_name(provider_id, new_name):
-    df = pd.read_csv(PROVIDERS_CSV)
-    df.loc[df['Provider_ID'] == provider_id, 'Name'] = new_name
-    save_to_csv(df, PROVIDERS_CSV)
+    update_row("providers", provider_id, {'Name': new_name})
 
 def delete_provider(provider_id):
-    df = pd.read_csv(PROVIDERS_CSV)
-    df = df[df['Provider_ID'] != provider_id]
-    save_to_csv(df, PROVIDERS_CSV)
+    delete_row("providers", provider_id)
 
 
 def add_receiver(receiver_id, name, organization, city):
-    df = pd.read_csv(RECEIVERS_CSV)
     new_row = {'Receiver_ID': receiver_id, 'Name': name, 'Organization': organization, 'City': city}
-    df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-    save_to_csv(df, RECEIVERS_CSV)
+    insert_row("receivers", new_row)
 
 def update_receiver_name(receiver_id, new_name):
-    df = pd.read_csv(RECEIVERS_CSV)
-    df.loc[df['Receiver_ID'] == receiver_id, 'Name'] = new_name
-    save_to_csv(df, RECEIVERS_CSV)
+    update_row("receivers", receiver_id, {'Name': new_name})
 
 def delete_receiver(receiver_id):
-    df = pd.read_csv(RECEIVERS_CSV)
-    df = df[df['Receiver_ID'] != receiver_id]
-    save_to_csv(df, RECEIVERS_CSV)
+    delete_row("receivers", receiver_id)
 
-# Add, Update, and Delete operations for Claims
-def add_claim(claim_id, food_id, receiver_id, claim_date):
-    df = pd.read_csv(CLAIMS_CSV)
-    new_row = {
-        'Claim_ID': claim_id,
-        'Food_ID': food_id,
-        'Receiver_ID': receiver_id,
-        'Claim_Date': claim_date,
-        'Status': 'Pending'
-    }
-    df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-    save_to_csv(df, CLAIMS_CSV)
+# Add, Update, and Delete operations for Claims; placing, completing and
+# cancelling go through the claim lifecycle in claims.py
+def add_claim(claim_id, food_id, receiver_id, claim_date, quantity=1):
+    return place_claim(food_id, receiver_id, quantity, claim_id, claim_date)
 
 def update_claim_date(claim_id, new_date):
-    df = pd.read_csv(CLAIMS_CSV)
-    df.loc[df['Claim_ID'] == claim_id, 'Claim_Date'] = new_date
-    save_to_csv(df, CLAIMS_CSV)
+    update_row("claims", claim_id, {'Claim_Date': new_date})
 
-def delete_claim(claim_id):
-    df = pd.read_csv(CLAIMS_CSV)
-    df = df[df['Claim_ID'] != claim_id]
-    save_to_csv(df, CLAIMS_CSV)
+def update_claim_status(claim_id, status):
+    if status == 'Completed':
+        complete_claim(claim_id)
+    elif status == 'Cancelled':
+        cancel_claim(claim_id)
+    else:
+        raise ValueError(f"a claim can only become Completed or Cancelled, not {status!r}")
 
-providers_df, receivers_df, food_listings_df, claims_df = load_data()
+def delete_claim(claim_id):
+    remove_claim(claim_id)
 
 st.title("Local Food Wastage Management System")
 
@@ -150,8 +132,9 @@ if operation == "Add":
         food_id = st.number_input("Food ID")
         receiver_id = st.number_input("Receiver ID")
         claim_date = st.date_input("Claim Date")
+        quantity = st.number_input("Quantity", min_value=1)
         if st.button("Add Claim"):
-            add_claim(claim_id, food_id, receiver_id, claim_date)
+            add_claim(claim_id, food_id, receiver_id, claim_date, quantity)
 
 elif operation == "Update":
     entity_type = st.selectbox("Select Entity to Update", ["Food", "Provider", "Receiver", "Claim"])
@@ -179,6 +162,9 @@ elif operation == "Update":
         new_date = st.date_input("New Claim Date")
         if st.button("Update Claim Date"):
             update_claim_date(claim_id, new_date)
+        new_status = st.selectbox("New Status", ["Completed", "Cancelled"])
+        if st.button("Update Claim Status"):
+            update_claim_status(claim_id, new_status)
 
 elif operation == "Delete":
     entity_type = st.selectbox("Select Entity to Delete", ["Food", "Provider", "Receiver", "Claim"])
@@ -0,0 +1,213 @@
+import argparse
+import re
+import sqlite3
+
+from datasource import DB_PATH
+
+
+def claim_day_sql(ts):
+    """SQL expression turning a claims Timestamp into an ISO day.
+
+    The shipped data mixes ISO dates with 'M/D/YYYY H:MM', which DATE()
+    maps to NULL, so both forms are parsed by hand.
+    """
+    rest = f"substr({ts}, instr({ts}, '/') + 1)"
+    month = f"CAST(substr({ts}, 1, instr({ts}, '/') - 1) AS INTEGER)"
+    day = f"CAST(substr({rest}, 1, instr({rest}, '/') - 1) AS INTEGER)"
+    year = f"CAST(substr({rest}, instr({rest}, '/') + 1, 4) AS INTEGER)"
+    return (
+        f"CASE WHEN {ts} LIKE '____-__-__%' THEN substr({ts}, 1, 10) "
+        f"WHEN {ts} LIKE '%/%/%' THEN printf('%04d-%02d-%02d', {year}, {month}, {day}) END"
+    )
+
+
+def claim_hour_sql(ts):
+    """Like claim_day_sql, to the hour: 'YYYY-MM-DD HH:00'. A date without a time is hour 0."""
+    clock = f"substr({ts}, instr({ts}, ' ') + 1)"
+    hour = (
+        f"CASE WHEN {ts} LIKE '____-__-__%' AND length({ts}) >= 13 THEN CAST(substr({ts}, 12, 2) AS INTEGER) "
+        f"WHEN {ts} LIKE '%/%/% %:%' THEN CAST(substr({clock}, 1, instr({clock}, ':') - 1) AS INTEGER) "
+        f"ELSE 0 END"
+    )
+    return f"({claim_day_sql(ts)}) || printf(' %02d:00', {hour})"
+
+
+def claim_week_sql(ts):
+    # the Monday on or before the claim's day
+    return f"date({claim_day_sql(ts)}, '-6 days', 'weekday 1')"
+
+
+def claim_month_sql(ts):
+    return f"substr({claim_day_sql(ts)}, 1, 7) || '-01'"
+
+
+# name -> (source table, {key column: expression}, {summed column: expression})
+# Expressions use "{row}" as the column prefix so the same definition serves
+# the triggers (NEW. / OLD.) and the full recompute (bare columns).
+AGGREGATES = {
+    "agg_providers_city": ("providers", {"City": "{row}City"}, {}),
+    "agg_providers_type": ("providers", {"Type": "{row}Type"}, {}),
+    "agg_receivers_city": ("receivers", {"City": "{row}City"}, {}),
+    "agg_listings_total": ("food_listings", {}, {"Quantity": "{row}Quantity"}),
+    "agg_listings_location": ("food_listings", {"Location": "{row}Location"}, {"Quantity": "{row}Quantity"}),
+    "agg_listings_provider": ("food_listings", {"Provider_ID": "{row}Provider_ID"}, {"Quantity": "{row}Quantity"}),
+    "agg_listings_food_type": ("food_listings", {"Food_Type": "{row}Food_Type"}, {"Quantity": "{row}Quantity"}),
+    "agg_listings_meal_type": ("food_listings", {"Meal_Type": "{row}Meal_Type"}, {"Quantity": "{row}Quantity"}),
+    "agg_claims_status": ("claims", {"Status": "{row}Status"}, {}),
+    "agg_claims_receiver": ("claims", {"Receiver_ID": "{row}Receiver_ID"}, {}),
+    "agg_claims_food": ("claims", {"Food_ID": "{row}Food_ID", "Status": "{row}Status"}, {}),
+    "agg_claims_day": ("claims", {"Claim_Day": claim_day_sql("{row}Timestamp")}, {}),
+    # claim-trend rollups; timeseries.py picks one per date range
+    "agg_claims_hour": ("claims", {"Claim_Hour": claim_hour_sql("{row}Timestamp")}, {}),
+    "agg_claims_week": ("claims", {"Claim_Week": claim_week_sql("{row}Timestamp")}, {}),
+    "agg_claims_month": ("claims", {"Claim_Month": claim_month_sql("{row}Timestamp")}, {}),
+    # what expired unclaimed still counts as donated (q13)
+    "agg_archive_provider": ("food_listings_archive", {"Provider_ID": "{row}Provider_ID"}, {"Quantity": "{row}Quantity"}),
+}
+
+CLAIM_ROLLUPS = ("agg_claims_hour", "agg_claims_week", "agg_claims_month")
+# created once the archive exists (sweeper.create_expiry_objects)
+ARCHIVE_ROLLUPS = ("agg_archive_provider",)
+
+
+def _expr(template, row):
+    return template.replace("{row}", row)
+
+
+def _match(keys, row):
+    # IS rather than = so NULL keys (e.g. a listing without a Location) group together
+    if not keys:
+        return "1"
+    return " AND ".join(f"{name} IS {_expr(expr, row)}" for name, expr in keys.items())
+
+
+def _apply(name, keys, sums, row, sign):
+    assignments = [f"Row_Count = Row_Count {sign} 1"] + [
+        f"{col} = {col} {sign} IFNULL({_expr(expr, row)}, 0)" for col, expr in sums.items()
+    ]
+    statements = []
+    if sign == "+":
+        columns = list(keys) + ["Row_Count"] + list(sums)
+        values = [_expr(expr, row) for expr in keys.values()] + ["0"] * (1 + len(sums))
+        statements.append(
+            f"INSERT INTO {name} ({', '.join(columns)}) SELECT {', '.join(values)} "
+            f"WHERE NOT EXISTS (SELECT 1 FROM {name} WHERE {_match(keys, row)});"
+        )
+    statements.append(f"UPDATE {name} SET {', '.join(assignments)} WHERE {_match(keys, row)};")
+    if sign == "-" and keys:
+        statements.append(f"DELETE FROM {name} WHERE {_match(keys, row)} AND Row_Count <= 0;")
+    return "\n        ".join(statements)
+
+
+def source_columns(name):
+    """The source columns an aggregate's keys and sums read, in definition order."""
+    _, keys, sums = AGGREGATES[name]
+    columns = re.findall(r"\{row\}(\w+)", " ".join(list(keys.values()) + list(sums.values())))
+    return list(dict.fromkeys(columns))
+
+
+def create_aggregate(conn, name):
+    source, keys, sums = AGGREGATES[name]
+    columns = [f"{key}" for key in keys] + ["Row_Count INTEGER NOT NULL"] + [f"{col} NUMERIC NOT NULL" for col in sums]
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {name} ({', '.join(columns)})")
+    if keys:
+        conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{name} ON {name} ({', '.join(keys)})")
+
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS tr_{name}_insert AFTER INSERT ON {source} BEGIN
+        {_apply(name, keys, sums, "NEW.", "+")}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS tr_{name}_delete AFTER DELETE ON {source} BEGIN
+        {_apply(name, keys, sums, "OLD.", "-")}
+        END
+    """)
+    # only updates of the columns it reads can move the aggregate; a claim's
+    # Reserved bump on food_listings does not fire it
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS tr_{name}_update AFTER UPDATE OF {', '.join(source_columns(name))} ON {source} BEGIN
+        {_apply(name, keys, sums, "OLD.", "-")}
+        {_apply(name, keys, sums, "NEW.", "+")}
+        END
+    """)
+    rebuild_aggregate(conn, name)
+
+
+def recompute_sql(name):
+    source, keys, sums = AGGREGATES[name]
+    selected = [f"{_expr(expr, '')} AS {key}" for key, expr in keys.items()]
+    selected += ["COUNT(*) AS Row_Count"] + [f"IFNULL(SUM({_expr(expr, '')}), 0) AS {col}" for col, expr in sums.items()]
+    group_by = f" GROUP BY {', '.join(_expr(expr, '') for expr in keys.values())}" if keys else ""
+    return f"SELECT {', '.join(selected)} FROM {source}{group_by}"
+
+
+def rebuild_aggregate(conn, name):
+    source, keys, sums = AGGREGATES[name]
+    columns = list(keys) + ["Row_Count"] + list(sums)
+    conn.execute(f"DELETE FROM {name}")
+    conn.execute(f"INSERT INTO {name} ({', '.join(columns)}) {recompute_sql(name)}")
+
+
+def create_aggregates(conn):
+    for name in AGGREGATES:
+        if name not in ARCHIVE_ROLLUPS:
+            create_aggregate(conn, name)
+
+
+def create_claim_rollups(conn):
+    for name in CLAIM_ROLLUPS:
+        create_aggregate(conn, name)
+
+
+def create_archive_rollups(conn):
+    for name in ARCHIVE_ROLLUPS:
+        create_aggregate(conn, name)
+
+
+def check_aggregates(conn, names=None):
+    """Compare each materialized aggregate with a full recompute.
+
+    Returns {name: (rows only in the table, rows only in the recompute)} for
+    every aggregate that has drifted; an empty dict means all are consistent.
+    """
+    drift = {}
+    for name in names or AGGREGATES:
+        source, keys, sums = AGGREGATES[name]
+        columns = ", ".join(list(keys) + ["Row_Count"] + list(sums))
+        stored = f"SELECT {columns} FROM {name}"
+        if not keys:
+            # an empty source leaves no row in the table but one (0, 0) row in the recompute
+            stored = f"SELECT {columns} FROM {name} UNION ALL SELECT 0{', 0' * len(sums)} WHERE NOT EXISTS ({stored})"
+        recomputed = f"SELECT {columns} FROM ({recompute_sql(name)})"
+        extra = conn.execute(f"{stored} EXCEPT {recomputed}").fetchall()
+        missing = conn.execute(f"{recomputed} EXCEPT {stored}").fetchall()
+        if extra or missing:
+            drift[name] = (extra, missing)
+    return drift
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check or rebuild the materialized dashboard aggregates.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--rebuild", action="store_true", help="recompute drifted aggregates")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        drift = check_aggregates(conn)
+        for name, (extra, missing) in drift.items():
+            print(f"{name}: {len(extra)} stale rows, {len(missing)} missing rows")
+        if drift and args.rebuild:
+            with conn:
+                for name in drift:
+                    rebuild_aggregate(conn, name)
+            print(f"rebuilt {len(drift)} aggregates")
+        elif not drift:
+            print(f"{len(AGGREGATES)} aggregates consistent")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import argparse
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+
+import pandas as pd
+
+from claims import PENDING, RESERVE_SQL, ClaimError
+from datasource import DB_PATH
+from facets import iso_date
+from storage import next_id, transaction
+from versions import bump_version
+
+
+ASSIGNMENT_COLUMNS = ["Claim_ID", "Food_ID", "Receiver_ID", "City", "Quantity", "Expiry_Date"]
+
+
+def allocate_city(city, listings, receivers, capacity=None):
+    """Greedy assignment of one city's listings to its receivers.
+
+    listings: [(Food_ID, expiry, quantity left)]; receivers: [Receiver_ID].
+    Listings are taken soonest-expiring first (larger first on a tie) and
+    what is left of each goes to the receiver with the least quantity assigned so far,
+    which is the one with the most room under capacity; a listing that does
+    not fit there fits nowhere and is left open. O(L log R).
+    Returns [(Food_ID, Receiver_ID, city, quantity, expiry)].
+    """
+    if not receivers:
+        return []
+    load = [(0, receiver_id) for receiver_id in sorted(receivers)]
+    assigned = []
+    for food_id, expiry, quantity in sorted(listings, key=lambda l: (l[1], -l[2], l[0])):
+        given, receiver_id = load[0]
+        if capacity is not None and given + quantity > capacity:
+            continue
+        heapq.heapreplace(load, (given + quantity, receiver_id))
+        assigned.append((food_id, receiver_id, city, quantity, expiry))
+    return assigned
+
+
+def _allocate_job(job):
+    return allocate_city(*job)
+
+
+def open_listings_by_city(conn, as_of):
+    """{Location: [(Food_ID, expiry, quantity left)]} of listings with quantity
+    left (Quantity - Reserved) that have not expired before as_of."""
+    rows = conn.execute("""
+        SELECT Food_ID, Location, Expiry_Date, Quantity - Reserved
+        FROM food_listings
+        WHERE Quantity - Reserved > 0 AND Location IS NOT NULL
+    """)
+    cutoff = as_of.isoformat()
+    cities = {}
+    for food_id, location, expiry, quantity in rows:
+        expiry = iso_date(expiry)
+        if expiry is not None and expiry >= cutoff:
+            cities.setdefault(location, []).append((food_id, expiry, quantity))
+    return cities
+
+
+def receivers_by_city(conn):
+    cities = {}
+    for receiver_id, city in conn.execute("SELECT Receiver_ID, City FROM receivers WHERE City IS NOT NULL"):
+        cities.setdefault(city, []).append(receiver_id)
+    return cities
+
+
+def allocate(as_of=None, capacity=None, workers=1, dry_run=False, db_path=DB_PATH):
+    """Assign what is left of every open listing to a receiver in its city and
+    record the claims (status Pending, Claim_Date as_of) in one transaction.
+
+    capacity caps the quantity any one receiver gets in this batch (None: no
+    cap). Cities are independent, so with workers > 1 they are spread over a
+    process pool. Each claim reserves its quantity with claims.RESERVE_SQL,
+    as place_claim does, under the write lock held since the read, so
+    nothing can be claimed twice. Returns the assignments as a DataFrame.
+    """
+    as_of = as_of or date.today()
+    with transaction(db_path) as conn:
+        listings = open_listings_by_city(conn, as_of)
+        receivers = receivers_by_city(conn)
+        jobs = [(city, items, receivers.get(city, []), capacity) for city, items in listings.items()]
+
+        if workers > 1 and len(jobs) > 1:
+            # cities shipped in chunks to amortize pickling; map keeps their order
+            with ProcessPoolExecutor(workers) as pool:
+                results = list(pool.map(_allocate_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+        else:
+            results = [allocate_city(*job) for job in jobs]
+
+        first = next_id(conn, "claims")
+        assignments = [
+            (first + i,) + row
+            for i, row in enumerate(row for city in results for row in city)
+        ]
+        if assignments and not dry_run:
+            reserved = conn.executemany(
+                RESERVE_SQL, [(quantity, food_id, quantity) for _, food_id, _, _, quantity, _ in assignments]
+            ).rowcount
+            if reserved != len(assignments):
+                # the transaction rolls back: no claim is written
+                raise ClaimError(f"{len(assignments) - reserved} listings changed while allocating")
+            timestamp = datetime.now().isoformat(sep=" ", timespec="seconds")
+            conn.executemany(
+                "INSERT INTO claims (Claim_ID, Food_ID, Receiver_ID, Status, Timestamp, Claim_Date, Quantity) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(claim_id, food_id, receiver_id, PENDING, timestamp, as_of.isoformat(), quantity)
+                 for claim_id, food_id, receiver_id, _, quantity, _ in assignments],
+            )
+            # one stamp per table for the whole batch: in-process indexes rebuild on their next read
+            bump_version(conn, "food_listings")
+            bump_version(conn, "claims")
+    return pd.DataFrame(assignments, columns=ASSIGNMENT_COLUMNS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assign open food listings to receivers in their city.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--as-of", type=date.fromisoformat, default=date.today(),
+                        help="skip listings expiring before this day (YYYY-MM-DD)")
+    parser.add_argument("--capacity", type=float, help="most quantity one receiver may get")
+    parser.add_argument("--workers", type=int, default=1, help="processes, each taking a share of the cities")
+    parser.add_argument("--dry-run", action="store_true", help="print the plan without writing claims")
+    args = parser.parse_args()
+
+    assignments = allocate(args.as_of, args.capacity, args.workers, args.dry_run, args.db)
+    action = "planned" if args.dry_run else "claimed"
+    print(f"{len(assignments)} listings {action}, quantity {assignments['Quantity'].sum():g}, "
+          f"{assignments['City'].nunique()} cities, {assignments['Receiver_ID'].nunique()} receivers")
+
+
+if __name__ == "__main__":
+    main()
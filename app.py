@@ -1,29 +1,31 @@
+import os
+import tempfile
+import time
+
 import streamlit as st
 import pandas as pd
-import sqlite3
-from database import (
-    get_total_food_quantity,
-    get_providers_and_receivers_by_city,
-    get_top_provider_type,
-    get_provider_contacts_by_city,
-    get_top_receivers_by_claims,
-    get_city_with_most_listings,
-    get_common_food_types,
-    get_claims_per_food_item,
-    get_provider_with_most_claims,
-    get_claim_status_distribution,
-    get_avg_quantity_per_receiver,
-    get_most_claimed_meal_type,
-    get_food_quantity_by_provider,
-    get_food_claims_trend,
-    get_city_with_highest_demand
-)
+import metrics
+from datasource import cache_stats
+from sync import sync_all
+from repository import TableRepository
+from facets import FacetIndex
+from matching import MatchIndex
+from allocation import allocate
+from storage import add_listener
+from sweeper import ExpirySweeper
+from query_registry import QUESTIONS, run_question
+import export
+from executor import get_executor
+from search import search, suggest
+from timeseries import claim_counts, claim_range
+from table_browser import DEFAULT_PAGE_SIZE, estimate_row_count, fetch_page, table_columns
 from extraqs import (
     get_total_providers,
     get_total_receivers,
     get_total_food_listings,
     get_total_claims,
     get_total_quantity_provided,
+    get_total_quantity_wasted,
     get_food_types_available,
     get_providers_by_location,
     get_receivers_by_location,
@@ -34,14 +36,94 @@ from CRUD_CSV import (
     add_food_item, update_food_quantity, delete_food_item,
     add_provider, update_provider_name, delete_provider,
     add_receiver, update_receiver_name, delete_receiver,
-    add_claim, update_claim_date, delete_claim
+    add_claim, update_claim_date, update_claim_status, delete_claim
 )
 
+
+@st.cache_resource
+def get_repository():
+    return TableRepository()
+
+
+@st.cache_resource
+def get_facet_index():
+    # CRUD writes in this process update the index in place
+    index = FacetIndex()
+    add_listener(index.apply_change)
+    return index
+
+
+@st.cache_resource
+def start_metrics_endpoint():
+    # FOOD_METRICS_PORT=9108 serves the Prometheus text on localhost:9108
+    port = os.environ.get("FOOD_METRICS_PORT")
+    return metrics.serve(int(port)) if port else None
+
+
+@st.cache_resource
+def start_export_endpoint():
+    # FOOD_EXPORT_PORT (off by default) streams downloads from localhost;
+    # FOOD_EXPORT_URL is where browsers reach it behind a proxy. Without it
+    # the Export page prepares the file and offers a download_button.
+    if not export.EXPORT_PORT:
+        return None
+    try:
+        return export.serve(export.EXPORT_PORT)
+    except OSError:
+        # port taken, e.g. by a second app instance: downloads are buffered instead
+        return None
+
+
+@st.cache_resource
+def start_expiry_sweeper():
+    # FOOD_SWEEP_INTERVAL_S=3600 archives expired listings hourly; off by default
+    interval = float(os.environ.get("FOOD_SWEEP_INTERVAL_S", "0"))
+    return ExpirySweeper(interval).start() if interval > 0 else None
+
+
+@st.cache_resource
+def get_match_index():
+    index = MatchIndex()
+    add_listener(index.apply_change)
+    return index
+
+
+# A query still running after BACKGROUND_WAIT_S is left to the executor; the
+# page renders without it and reruns every BACKGROUND_POLL_S until it lands.
+BACKGROUND_WAIT_S = 0.5
+BACKGROUND_POLL_S = 0.5
+poll_pending = False
+
+
+def run_in_background(name, fn, *args):
+    """fn(*args) on the shared query executor; identical requests run once.
+
+    While it runs, shows a progress bar and returns the previous result for
+    the same arguments (or None), and schedules a rerun to poll.
+    """
+    global poll_pending
+    executor = get_executor()
+    job = executor.submit(name, fn, *args)
+    try:
+        return job.result(timeout=BACKGROUND_WAIT_S)
+    except TimeoutError:
+        pass
+    previous = executor.latest(name, args)
+    shared = f", shared with {job.waiters} other request(s)" if job.waiters else ""
+    if previous is not None:
+        # progress against the last run's duration
+        st.progress(min(job.elapsed() / previous.elapsed(), 0.95),
+                    text=f"Refreshing: {job.elapsed():.1f}s{shared}. Showing the previous result.")
+    else:
+        st.progress(0.0, text=f"Running: {job.elapsed():.1f}s{shared}")
+    poll_pending = True
+    return previous.result() if previous is not None else None
+
+
 try:
-    providers_df = pd.read_csv("C:/Local_food_Project/data/providers_data.csv")
-    receivers_df = pd.read_csv("C:/Local_food_Project/data/receivers_data.csv")
-    food_listings_df = pd.read_csv("C:/Local_food_Project/data/food_listings_data.csv")
-    claims_df = pd.read_csv("C:/Local_food_Project/data/claims_data.csv")
+    # Only rows that changed in the CSVs since the last run are written; an
+    # unchanged rerun costs one stat() per file.
+    sync_all()
 except FileNotFoundError as e:
     st.error("Error loading CSV files. Please ensure the paths are correct.")
     st.exception(e)
@@ -51,18 +133,6 @@ except pd.errors.EmptyDataError as e:
 except Exception as e:
     st.error("An unexpected error occurred while loading the data.")
     st.exception(e)
-    
-
-
-
-conn = sqlite3.connect("local_food.db")  
-cursor = conn.cursor()
-
-
-providers_df.to_sql('providers', conn, if_exists='replace', index=False)
-receivers_df.to_sql('receivers', conn, if_exists='replace', index=False)
-food_listings_df.to_sql('food_listings', conn, if_exists='replace', index=False)
-claims_df.to_sql('claims', conn, if_exists='replace', index=False)
 
 
 st.set_page_config(page_title="Local Food Wastage Management", layout="wide")
@@ -76,9 +146,18 @@ page = st.sidebar.radio("Go to", [
     "SQL Queries & Visualization",
     "Learner SQL Queries",
     "Data Filtering",
+    "Search",
+    "Food Matching",
+    "Export",
+    "Performance",
     "User Introduction"
 ])
 
+start_metrics_endpoint()
+start_export_endpoint()
+start_expiry_sweeper()
+page_started = time.perf_counter()
+
 
 if page == "Project Introduction":
     st.title("🍛 Local Food Wastage Management System")
@@ -124,17 +203,47 @@ elif page == "View Tables":
     ])
     
   
-    if table_choice == "Providers":
-        df = providers_df
-    elif table_choice == "Receivers":
-        df = receivers_df
-    elif table_choice == "Food Listings":
-        df = food_listings_df
-    elif table_choice == "Claims":
-        df = claims_df
-    
+    table_name = {
+        "Providers": "providers",
+        "Receivers": "receivers",
+        "Food Listings": "food_listings",
+        "Claims": "claims",
+    }[table_choice]
+    all_columns = table_columns(table_name)
+    columns = st.multiselect("Columns", all_columns, default=all_columns)
+    sort_by = st.selectbox("Sort by", all_columns)
+    descending = st.checkbox("Descending")
+    page_size = st.selectbox("Rows per page", [25, 50, 100, 250], index=1)
+
+    # cursors[i] starts page i; any change of view starts over at page 0
+    view = (table_name, tuple(columns), sort_by, descending, page_size)
+    if st.session_state.get("browse_view") != view:
+        st.session_state.browse_view = view
+        st.session_state.browse_cursors = [None]
+    cursors = st.session_state.browse_cursors
+
+    page_df, next_cursor = fetch_page(
+        table_name, columns or None, sort_by, descending, cursors[-1], page_size
+    )
+
     st.subheader(f"{table_choice} Table")
-    st.dataframe(df)
+    st.caption(f"Page {len(cursors)} of ~{estimate_row_count(table_name):,} rows")
+    st.dataframe(page_df)
+
+    prev_col, next_col = st.columns(2)
+    if prev_col.button("Previous", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+    if next_col.button("Next", disabled=next_cursor is None):
+        cursors.append(next_cursor)
+        st.rerun()
+
+    with st.expander("Table cache memory"):
+        # pages read SQLite; a full typed frame is loaded only when asked for
+        repository = get_repository()
+        if st.checkbox(f"Load {table_choice} into the cache"):
+            repository.get(table_name)
+        st.dataframe(repository.memory_usage())
 
 
 elif page == "CRUD Operations":
@@ -256,9 +365,11 @@ elif page == "CRUD Operations":
                     food_id = st.number_input("Food ID", min_value=1)
                     receiver_id = st.number_input("Receiver ID", min_value=1)
                     claim_date = st.date_input("Claim Date")
+                    quantity = st.number_input("Quantity", min_value=1)
                     submitted = st.form_submit_button("Add Claim")
                 if submitted:
-                    add_claim(claim_id, food_id, receiver_id, claim_date.strftime('%Y-%m-%d'))
+                    # reserves the quantity; fails if the listing has less left
+                    add_claim(claim_id, food_id, receiver_id, claim_date.strftime('%Y-%m-%d'), quantity)
                     st.success("Claim added successfully!")
 
             elif action == "Update":
@@ -269,6 +380,12 @@ elif page == "CRUD Operations":
                     update_claim_date(claim_id, new_date.strftime('%Y-%m-%d'))
                     st.success(f"Claim ID {claim_id} updated.")
 
+                st.subheader("🔁 Complete or Cancel a Pending Claim")
+                new_status = st.selectbox("New Status", ["Completed", "Cancelled"])
+                if st.button("Update Status"):
+                    update_claim_status(claim_id, new_status)
+                    st.success(f"Claim ID {claim_id} is now {new_status}.")
+
             elif action == "Delete":
                 st.subheader("🗑️ Delete Claim")
                 claim_id = st.number_input("Claim ID to Delete", min_value=1)
@@ -283,111 +400,51 @@ elif page == "CRUD Operations":
 elif page == "SQL Queries & Visualization":
     st.title("📊 SQL Queries & Visualization")
 
-    questions = {
-        "1. How many food providers and receivers are there in each city?": "q1",
-        "2. Which type of food provider contributes the most?": "q2",
-        "3. Contact information of food providers in a specific city": "q3",
-        "4. Which receivers have claimed the most food?": "q4",
-        "5. Total quantity of food available from all providers": "q5",
-        "6. City with the highest number of food listings": "q6",
-        "7. Most commonly available food types": "q7",
-        "8. How many food claims have been made for each food item?": "q8",
-        "9. Which provider has had the highest number of successful claims?": "q9",
-        "10. What percentage of food claims are completed vs. pending vs. canceled?": "q10",
-        "11. What is the average quantity of food claimed per receiver?": "q11",
-        "12. Which meal type is claimed the most?": "q12",
-        "13. Total quantity of food donated by each provider": "q13",
-        "14. Trend of food claims over time": "q14",
-        "15. City with the highest food demand based on claims": "q15"
-    }
+    questions = {question.text: qid for qid, question in QUESTIONS.items()}
 
     selected_question = st.selectbox("Choose a question to analyze", list(questions.keys()))
     qid = questions[selected_question]
 
     st.subheader(selected_question)
 
+    # Every answer is computed in SQLite, off the script thread; only the
+    # result rows come back. Results are shared between sessions: no in-place edits.
     try:
-      
-        if qid == "q1":
-            provider_city = providers_df['City'].value_counts()
-            receiver_city = receivers_df['City'].value_counts()
-            merged = pd.concat([provider_city, receiver_city], axis=1, keys=['Providers', 'Receivers']).fillna(0)
-            st.dataframe(merged.astype(int))
-
-        elif qid == "q2":
-            top_type = providers_df['Type'].value_counts().reset_index()
-            top_type.columns = ['Provider Type', 'Count']
-            st.dataframe(top_type)
-
-        elif qid == "q3":
+        if qid == "q3":
             city = st.text_input("Enter city name:")
             if city:
-                filtered = providers_df[providers_df['City'].str.lower() == city.lower()]
-                st.dataframe(filtered[['Name', 'Contact']])
-
-        elif qid == "q4":
-          top_receivers = claims_df.groupby('Receiver_ID').size().reset_index(name='Claim_Count')
-          top_receivers = top_receivers.sort_values(by='Claim_Count', ascending=False)
-          st.dataframe(top_receivers)
+                df = run_in_background(qid, lambda city: run_question(qid, city=city), city)
+                if df is not None:
+                    st.dataframe(df)
+                    if df.empty:
+                        similar = suggest("providers", "City", city)
+                        if similar:
+                            st.caption(f"No provider in {city}. Did you mean: {', '.join(similar)}?")
 
         elif qid == "q5":
-         total_quantity = food_listings_df['Quantity'].sum()
-         st.write(f"Total Quantity of Food: {total_quantity}")
-
-        elif qid == "q6":
-         merged_df = pd.merge(food_listings_df, providers_df[['Provider_ID', 'City']], on='Provider_ID', how='left')
-         city_listing = merged_df['City'].value_counts().reset_index()
-         city_listing.columns = ['City', 'Total Listings']
-         st.dataframe(city_listing)
-
-        elif qid == "q7":
-          food_types = food_listings_df['Food_Type'].value_counts().reset_index()
-          food_types.columns = ['Food Type', 'Count']
-          st.dataframe(food_types)
-
-        elif qid == "q8":
-         food_claims = claims_df.groupby('Food_ID').size().reset_index(name='Claim_Count')
-         food_claims = food_claims.sort_values(by='Claim_Count', ascending=False)
-         st.dataframe(food_claims)
-
-        elif qid == "q9":
-         data = get_provider_with_most_claims()
-         df = pd.DataFrame(data, columns=["Provider_Name", "Successful_Claims"])
-         st.dataframe(df)
-
-        elif qid == "q10":
-         data = get_claim_status_distribution()
-         df = pd.DataFrame(data, columns=["Claim_Status", "Count"])
-         st.dataframe(df)
-
-        elif qid == "q11":
-         avg_quantity_per_receiver = claims_df.groupby('Receiver_ID')['Quantity'].mean().reset_index()
-         avg_quantity_per_receiver.columns = ['Receiver ID', 'Avg Quantity Claimed']
-         st.dataframe(avg_quantity_per_receiver)
-
-        elif qid == "q12":
-         most_claimed_meal = food_listings_df['Meal_Type'].value_counts().reset_index()
-         most_claimed_meal.columns = ['Meal Type', 'Count']
-         st.dataframe(most_claimed_meal)
-
-        elif qid == "q13":
-         food_by_provider = food_listings_df.groupby('Provider_ID')['Quantity'].sum().reset_index()
-         food_by_provider.columns = ['Provider ID', 'Total Quantity Donated']
-         st.dataframe(food_by_provider)
+            df = run_in_background(qid, run_question, qid)
+            if df is not None:
+                st.write(f"Total Quantity of Food: {df.iloc[0, 0]}")
 
         elif qid == "q14":
-         # Example if actual column is 'Date_Claimed'
-          data = get_food_claims_trend()
-          df = pd.DataFrame(data, columns=['Claim_Date', 'Total_Claims'])
-          df['Claim_Date'] = pd.to_datetime(df['Claim_Date'])  # Optional, for formatting
-          st.line_chart(df.set_index('Claim_Date'))
-
-        elif qid == "q15":
-         merged_claims = pd.merge(claims_df, receivers_df[['Receiver_ID', 'City']], on='Receiver_ID', how='left')
-         city_demand = merged_claims['City'].value_counts().reset_index()
-         city_demand.columns = ['City', 'Claim Count']
-         st.dataframe(city_demand)
-
+            # read from the hour/day/week/month rollups, at most timeseries.MAX_POINTS points
+            bounds = claim_range()
+            if bounds is None:
+                st.info("No claims with a readable date yet.")
+            else:
+                first, last = bounds[0].date(), bounds[1].date()
+                picked = st.date_input("Date range", (first, last), min_value=first, max_value=last)
+                if len(picked) == 2:
+                    result = run_in_background(qid, claim_counts, picked[0], picked[1])
+                    if result is not None:
+                        df, resolution = result
+                        st.caption(f"Claims per {resolution}")
+                        st.line_chart(df.set_index('Period'))
+
+        else:
+            df = run_in_background(qid, answer, qid)
+            if df is not None:
+                st.dataframe(df)
 
     except Exception as e:
         st.error("An error occurred while processing the SQL query.")
@@ -404,6 +461,7 @@ elif page == "Learner SQL Queries":
         "Total Number of Food Listings": get_total_food_listings,
         "Total Number of Claims": get_total_claims,
         "Total Quantity of Food Provided": get_total_quantity_provided,
+        "Total Quantity of Food Wasted": get_total_quantity_wasted,
         "Types of Food Available": get_food_types_available,
         "Providers by Location": get_providers_by_location,
         "Receivers by Location": get_receivers_by_location,
@@ -417,39 +475,189 @@ elif page == "Learner SQL Queries":
     st.subheader(selected_question)
 
     if st.button("Run Query"):
-        result = qid()
-        st.dataframe(result)
+        st.session_state.learner_query = selected_question
+    # kept across the reruns that poll a query still running
+    if st.session_state.get("learner_query") == selected_question:
+        result = run_in_background(qid.__name__, qid)
+        if result is not None:
+            st.dataframe(result)
         
 elif page == "Data Filtering":
     st.title("🔍 Simple Data Filtering")
 
     table_option = st.selectbox("Select a table", ["Providers", "Receivers", "Food Listings"])
+    facets = get_facet_index()
 
+    def facet_select(label, table, column):
+        counts = dict(facets.values(table, column))
+        return st.multiselect(label, list(counts), format_func=lambda v: f"{v} ({counts[v]})")
+
+    ranges = {}
     if table_option == "Providers":
+        table = "providers"
         st.subheader("Filter Providers by City or Type")
-        city = st.selectbox("Select City", sorted(providers_df["City"].unique()))
-        type_ = st.selectbox("Select Type", sorted(providers_df["Type"].unique()))
-        
-        filtered_df = providers_df[(providers_df["City"] == city) & (providers_df["Type"] == type_)]
-        st.dataframe(filtered_df)
+        selections = {
+            "City": facet_select("Select City", table, "City"),
+            "Type": facet_select("Select Type", table, "Type"),
+        }
 
     elif table_option == "Receivers":
+        table = "receivers"
         st.subheader("Filter Receivers by City")
-        city = st.selectbox("Select City", sorted(receivers_df["City"].unique()))
-        
-        filtered_df = receivers_df[receivers_df["City"] == city]
-        st.dataframe(filtered_df)
+        selections = {"City": facet_select("Select City", table, "City")}
 
     elif table_option == "Food Listings":
+        table = "food_listings"
         st.subheader("Filter Food Listings by Location and Food Type")
-        location = st.selectbox("Select Location", sorted(food_listings_df["Location"].dropna().astype(str).unique()))
+        selections = {
+            "Location": facet_select("Select Location", table, "Location"),
+            "Food_Type": facet_select("Select Food Type", table, "Food_Type"),
+            "Meal_Type": facet_select("Select Meal Type", table, "Meal_Type"),
+        }
+        # a range left at its full extent is no filter: it would drop rows
+        # whose value is NULL or does not parse
+        quantity = facets.range_bounds(table, "Quantity")
+        if quantity and quantity[0] < quantity[1]:
+            extent = (int(quantity[0]), int(quantity[1]))
+            picked = st.slider("Quantity", *extent, extent)
+            if picked != extent:
+                ranges["Quantity"] = picked
+        expiry = facets.range_bounds(table, "Expiry_Date")
+        if expiry:
+            extent = tuple(pd.Timestamp(d).date() for d in expiry)
+            picked = st.date_input("Expiry Date between", extent)
+            if isinstance(picked, (tuple, list)) and len(picked) == 2 and tuple(picked) != extent:
+                ranges["Expiry_Date"] = tuple(picked)
+
+    if not any(selections.values()) and not ranges:
+        st.info("Pick a value or narrow a range to see the matching rows.")
+    else:
+        keys = facets.filter(table, selections, ranges)
+        # only one page of rows is fetched; the keys come from the index
+        pages = max(1, -(-len(keys) // DEFAULT_PAGE_SIZE))
+        page_number = st.number_input("Page", min_value=1, max_value=pages, value=1)
+        st.caption(f"{len(keys)} matching rows, page {page_number} of {pages}")
+        start = (page_number - 1) * DEFAULT_PAGE_SIZE
+        st.dataframe(facets.rows(table, keys[start:start + DEFAULT_PAGE_SIZE]))
+
+
+elif page == "Search":
+    st.title("🔎 Search")
+
+    tables = {"Food Listings": "food_listings", "Providers": "providers"}
+    table = tables[st.selectbox("Search in", list(tables))]
+    text = st.text_input("Search for", placeholder="e.g. rice, bakery, new york")
+    fuzzy = st.checkbox("Include close spellings", value=True)
+
+    if text.strip():
+        df = run_in_background("search", search, table, text, 50, fuzzy)
+        if df is not None:
+            st.caption(f"{len(df)} best matches")
+            st.dataframe(df)
 
-        food_type = st.selectbox("Select Food Type", sorted(food_listings_df["Food_Type"].unique()))
         
-        filtered_df = food_listings_df[(food_listings_df["Location"] == location) & (food_listings_df["Food_Type"] == food_type)]
-        st.dataframe(filtered_df)
+elif page == "Food Matching":
+    st.title("🤝 Food Matching")
+    st.write("Open listings in the receiver's city, soonest-expiring first.")
+
+    facets = get_facet_index()
+    receiver_id = st.number_input("Receiver ID", min_value=1, step=1)
+    food_types = st.multiselect("Food Types", [v for v, _ in facets.values("food_listings", "Food_Type")])
+    meal_types = st.multiselect("Meal Types", [v for v, _ in facets.values("food_listings", "Meal_Type")])
+    k = st.slider("Number of matches", 1, 50, 10)
+    as_of = st.date_input("Available on")
+
+    matches = get_match_index().match_receiver(
+        int(receiver_id), food_types or None, meal_types or None, k, as_of
+    )
+    if matches:
+        ids = [food_id for _, food_id in matches]
+        st.dataframe(facets.rows("food_listings", ids).set_index("Food_ID").loc[ids].reset_index())
+    else:
+        st.info("No open listings match this receiver.")
+
+    st.subheader("Batch allocation")
+    st.write("Claim every open listing for a receiver in its city, most urgent first.")
+    capacity = st.number_input("Most quantity per receiver (0 = no limit)", min_value=0, value=0)
+    dry_run = st.checkbox("Preview only", value=True)
+    if st.button("Allocate open listings"):
+        assignments = allocate(as_of, capacity or None, dry_run=dry_run)
+        verb = "would be claimed" if dry_run else "claimed"
+        st.success(f"{len(assignments)} listings {verb}, total quantity {assignments['Quantity'].sum():g}")
+        st.dataframe(assignments)
+
+
+elif page == "Export":
+    st.title("📤 Export")
+    st.write("Whole tables, partner reports and question results as CSV, gzip-compressed CSV or Parquet.")
+
+    kinds = {"Table": "table", "Report": "report", "Question": "question"}
+    kind = kinds[st.radio("Export a", list(kinds), horizontal=True)]
+    params = {}
+    if kind == "table":
+        name = st.selectbox("Table", export.export_tables())
+    elif kind == "report":
+        name = st.selectbox("Report", list(export.REPORTS))
+        if "provider_id" in export.REPORTS[name][1]:
+            params["provider_id"] = int(st.number_input("Provider ID", min_value=1, step=1))
+    else:
+        name = st.selectbox("Question", list(QUESTIONS), format_func=lambda qid: QUESTIONS[qid].text)
+        if "city" in QUESTIONS[name].params:
+            params["city"] = st.text_input("City")
+    fmt = st.selectbox("Format", list(export.FORMATS))
+    file_name = export.file_name(kind, name, fmt, **params)
+
+    if fmt == "parquet" and export.pq is None:
+        st.warning("Parquet export needs pyarrow (pip install pyarrow).")
+    elif all(value != "" for value in params.values()):
+        server = start_export_endpoint()
+        if server is not None:
+            # the endpoint sends the file as it is read, a batch of rows at a time
+            base = os.environ.get("FOOD_EXPORT_URL", f"http://localhost:{server.server_address[1]}")
+            st.link_button(f"Download {file_name}", export.export_url(base, kind, name, fmt, **params))
+            st.caption(f"Streamed from the database {export.BATCH_ROWS:,} rows at a time.")
+        elif st.button("Prepare download"):
+            # written to disk in batches; Streamlit still holds the finished file in memory
+            with tempfile.TemporaryFile() as f:
+                for chunk in export.stream(kind, name, fmt, **params):
+                    f.write(chunk)
+                f.seek(0)
+                st.download_button(f"Download {file_name}", f, file_name=file_name, mime=export.FORMATS[fmt][0])
+
+
+elif page == "Performance":
+    st.title("⏱️ Performance")
+
+    summary = metrics.summary()
+    kinds = st.multiselect("Show", ["query", "question", "page"], default=["query", "question", "page"])
+    st.subheader("Latency by query, question and page (ms)")
+    st.dataframe(summary[summary["Kind"].isin(kinds)])
+
+    st.subheader("Cache hit rates")
+    st.dataframe(metrics.cache_rates())
+    results = cache_stats()
+    st.caption(f"Query result cache: {results['entries']} of {results['max_entries']} entries, "
+               f"{results['evictions']} evicted, {results['invalidations']} invalidated by writes.")
+
+    st.subheader(f"Slow queries (over {metrics.SLOW_QUERY_MS:g} ms)")
+    slow = metrics.slow_log()
+    if slow:
+        st.dataframe(pd.DataFrame(slow).drop(columns=["plan"]).sort_values("time", ascending=False))
+    else:
+        st.info("No slow queries recorded.")
+
+    with st.expander("Query plans"):
+        for name, plan in metrics.plans().items():
+            st.text(name)
+            st.code("\n".join(plan))
+
+    st.download_button("Download Prometheus metrics", metrics.prometheus_text(), file_name="metrics.prom")
+    jsonl_path = st.text_input("JSONL export file", "metrics.jsonl")
+    if st.button("Append snapshot to JSONL"):
+        metrics.export_jsonl(jsonl_path)
+        st.success(f"Appended to {jsonl_path}")
+
 
-        
 elif page == "User Introduction":
     st.title("👤 User Introduction")
     st.info("""
@@ -466,7 +674,11 @@ elif page == "User Introduction":
         I am always excited to learn and improve my skills in data science and technology, and I'm eager 
         to contribute to meaningful and impactful projects.
     """)
- 
-        
-        
 
+
+metrics.observe("page", page, (time.perf_counter() - page_started) * 1e3)
+
+if poll_pending:
+    # a background query is still running; each rerun is interruptible by input
+    time.sleep(BACKGROUND_POLL_S)
+    st.rerun()
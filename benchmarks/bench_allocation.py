@@ -0,0 +1,53 @@
+"""Batch claim allocation: wall time for one core and for a process pool.
+
+Each run is a dry run (the plan is computed, nothing is written), then one
+real run records the claims so the single-transaction write is timed too.
+
+    python -m benchmarks.bench_allocation --listings 50000 --workers 4
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import date
+
+
+def run(db_path, capacity, workers):
+    # imported late so FOOD_DB_PATH is honoured
+    from allocation import allocate
+
+    as_of = date(2025, 1, 1)  # datagen's first expiry date: nothing has expired
+    rows = []
+    for count in sorted({1, workers}):
+        start = time.perf_counter()
+        plan = allocate(as_of, capacity, count, dry_run=True, db_path=db_path)
+        rows.append((f"plan, {count} process(es)", time.perf_counter() - start, plan))
+    start = time.perf_counter()
+    written = allocate(as_of, capacity, workers, db_path=db_path)
+    rows.append(("plan + write claims", time.perf_counter() - start, written))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--providers", type=int, default=2_000)
+    parser.add_argument("--receivers", type=int, default=20_000)
+    parser.add_argument("--listings", type=int, default=50_000)
+    parser.add_argument("--claims", type=int, default=5_000)
+    parser.add_argument("--capacity", type=float, default=100)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        # must be set before anything imports datasource
+        os.environ["FOOD_DB_PATH"] = db_path
+        from benchmarks.datagen import generate
+        generate(db_path, args.providers, args.receivers, args.listings, args.claims)
+        results = run(db_path, args.capacity, args.workers)
+    for case, seconds, plan in results:
+        print(f"{case:<26} {seconds * 1e3:9.1f} ms   {len(plan):>7} listings, quantity {plan['Quantity'].sum():g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Per-operation latency of the CRUD write path as the listing count grows.
+
+Compares the old whole-file CSV rewrite (read_csv -> concat/mask -> to_csv)
+with the SQLite-backed storage engine used by CRUD_CSV.py.
+
+    python -m benchmarks.bench_crud --sizes 1000 10000 100000 --ops 50
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+import pandas as pd
+
+import storage
+from connection_pool import get_pool
+
+
+def make_listings(n):
+    rng = random.Random(n)
+    return pd.DataFrame({
+        "Food_ID": range(1, n + 1),
+        "Food_Name": [rng.choice(["Rice", "Soup", "Bread", "Fruits"]) for _ in range(n)],
+        "Quantity": [rng.randint(1, 50) for _ in range(n)],
+        "Reserved": [0] * n,
+        "Expiry_Date": ["2025-03-20"] * n,
+        "Provider_ID": [rng.randint(1, 1000) for _ in range(n)],
+        "Provider_Type": ["Restaurant"] * n,
+        "Location": [f"City {rng.randint(1, 500)}" for _ in range(n)],
+        "Food_Type": [rng.choice(["Vegetarian", "Non-Vegetarian", "Vegan"]) for _ in range(n)],
+        "Meal_Type": [rng.choice(["Breakfast", "Lunch", "Dinner", "Snacks"]) for _ in range(n)],
+    })
+
+
+def csv_add(path, row):
+    df = pd.read_csv(path)
+    row = dict(row, Food_ID=df["Food_ID"].max() + 1)
+    pd.concat([df, pd.DataFrame([row])], ignore_index=True).to_csv(path, index=False)
+
+
+def csv_update(path, food_id, qty):
+    df = pd.read_csv(path)
+    df.loc[df["Food_ID"] == food_id, "Quantity"] = qty
+    df.to_csv(path, index=False)
+
+
+def csv_delete(path, food_id):
+    df = pd.read_csv(path)
+    df[df["Food_ID"] != food_id].to_csv(path, index=False)
+
+
+def timed(fn, args_list):
+    start = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    return (time.perf_counter() - start) / len(args_list) * 1e3
+
+
+def run(sizes, ops, include_csv=True):
+    sample = make_listings(1).iloc[0].to_dict()
+    sample.pop("Food_ID")
+    results = []
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            listings = make_listings(n)
+            ids = random.Random(0).sample(range(1, n + 1), ops * 2)
+
+            db_path = os.path.join(tmp, "bench.db")
+            conn = sqlite3.connect(db_path)
+            listings.to_sql("food_listings", conn, index=False)
+            conn.close()
+            with get_pool(db_path).connection() as conn:
+                storage.ensure_key_index(conn, "food_listings")
+            results.append({
+                "rows": n, "engine": "sqlite",
+                "add_ms": timed(lambda: storage.insert_row("food_listings", dict(sample), db_path), [()] * ops),
+                "update_ms": timed(lambda i: storage.update_row("food_listings", i, {"Quantity": 1}, db_path), [(i,) for i in ids[:ops]]),
+                "delete_ms": timed(lambda i: storage.delete_row("food_listings", i, db_path), [(i,) for i in ids[ops:]]),
+            })
+
+            if include_csv:
+                csv_path = os.path.join(tmp, "food_listings.csv")
+                listings.to_csv(csv_path, index=False)
+                results.append({
+                    "rows": n, "engine": "csv",
+                    "add_ms": timed(lambda: csv_add(csv_path, sample), [()] * ops),
+                    "update_ms": timed(lambda i: csv_update(csv_path, i, 1), [(i,) for i in ids[:ops]]),
+                    "delete_ms": timed(lambda i: csv_delete(csv_path, i), [(i,) for i in ids[ops:]]),
+                })
+    return pd.DataFrame(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--ops", type=int, default=50)
+    parser.add_argument("--no-csv", action="store_true", help="skip the legacy CSV rewrite path")
+    args = parser.parse_args()
+    print(run(args.sizes, args.ops, include_csv=not args.no_csv).to_string(index=False, float_format="%.3f"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Many sessions asking the same dashboard question at once, right after a
+write: each session running it itself vs the shared query executor.
+
+Reports wall time until every session has its answer and how many times
+the question actually executed.
+
+    python -m benchmarks.bench_executor --sessions 16 --listings 500000 --claims 500000
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+
+QUESTIONS = ("q8", "q11", "q12")
+
+
+def concurrently(sessions, fn):
+    barrier = threading.Barrier(sessions)
+
+    def session():
+        barrier.wait()
+        fn()
+
+    threads = [threading.Thread(target=session) for _ in range(sessions)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return (time.perf_counter() - start) * 1e3
+
+
+def run(sessions):
+    # imported late so FOOD_DB_PATH is honoured
+    import metrics
+    from datasource import clear_cache
+    from executor import QueryExecutor
+    from query_registry import run_question
+
+    def executions(qid):
+        counts = metrics.summary()
+        return int(counts.loc[(counts["Kind"] == "question") & (counts["Name"] == qid), "Count"].sum())
+
+    rows = []
+    for qid in QUESTIONS:
+        run_question(qid)  # warm the page cache
+
+        clear_cache()
+        metrics.reset()
+        direct = concurrently(sessions, lambda: run_question(qid))
+        rows.append({"question": qid, "path": "per session", "wall_ms": direct, "executions": executions(qid)})
+
+        clear_cache()
+        metrics.reset()
+        executor = QueryExecutor()
+        shared = concurrently(sessions, lambda: executor.submit(qid, run_question, qid).result())
+        rows.append({"question": qid, "path": "executor", "wall_ms": shared, "executions": executions(qid)})
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--providers", type=int, default=10_000)
+    parser.add_argument("--receivers", type=int, default=10_000)
+    parser.add_argument("--listings", type=int, default=500_000)
+    parser.add_argument("--claims", type=int, default=500_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        # must be set before anything imports datasource
+        os.environ["FOOD_DB_PATH"] = db_path
+        from benchmarks.datagen import generate
+        generate(db_path, args.providers, args.receivers, args.listings, args.claims)
+        results = run(args.sessions)
+    print(results.to_string(index=False, float_format="%.1f"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Export: export.stream from cursor batches against reading the table into a
+DataFrame and writing it with to_csv (the save_to_csv path), by time and
+peak Python memory.
+
+    python -m benchmarks.bench_export --listings 200000 --claims 2000000
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+
+def measure(fn):
+    # timed untraced; tracemalloc slows allocation-heavy code several times over
+    start = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    try:
+        fn()
+        return seconds, tracemalloc.get_traced_memory()[1] / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+
+def run(out_dir):
+    # imported late so FOOD_DB_PATH is honoured
+    import export
+    from datasource import pool
+
+    def whole_frame(table, fmt):
+        path = os.path.join(out_dir, f"frame{export.FORMATS[fmt][1]}")
+
+        def fn():
+            with pool().connection() as conn:
+                df = pd.read_sql(f"SELECT * FROM {table}", conn)
+            if fmt == "parquet":
+                df.to_parquet(path, index=False)
+            else:
+                df.to_csv(path, index=False)
+        return fn, path
+
+    def streamed(table, fmt):
+        path = os.path.join(out_dir, f"stream{export.FORMATS[fmt][1]}")
+        return lambda: export.export_to_file(path, "table", table, fmt), path
+
+    formats = ["csv", "csv.gz"] + (["parquet"] if export.pq is not None else [])
+    rows = []
+    for table in ("food_listings", "claims"):
+        for fmt in formats:
+            for method, build in (("DataFrame.to_*", whole_frame), ("export.stream", streamed)):
+                if method == "DataFrame.to_*" and fmt == "csv.gz":
+                    continue
+                fn, path = build(table, fmt)
+                seconds, peak_mb = measure(fn)
+                rows.append({"table": table, "format": fmt, "method": method, "seconds": seconds,
+                             "peak_mb": peak_mb, "file_mb": os.path.getsize(path) / 2 ** 20})
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--providers", type=int, default=10_000)
+    parser.add_argument("--receivers", type=int, default=10_000)
+    parser.add_argument("--listings", type=int, default=200_000)
+    parser.add_argument("--claims", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        # must be set before anything imports datasource
+        os.environ["FOOD_DB_PATH"] = db_path
+        from benchmarks.datagen import generate
+        generate(db_path, args.providers, args.receivers, args.listings, args.claims)
+        results = run(tmp)
+    print(results.to_string(index=False, float_format="%.1f"))
+
+
+if __name__ == "__main__":
+    main()
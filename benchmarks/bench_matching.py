@@ -0,0 +1,109 @@
+"""Receiver matching: MatchIndex top-k vs the equivalent SQL query.
+
+Builds the index over a generated database, then times top-k lookups for
+random receivers (their city, optionally one food type) and the index
+upkeep when listings and claims are written through storage.py.
+
+    python -m benchmarks.bench_matching --listings 1000000 --receivers 100000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date
+
+
+SQL_TOP_K = """
+    SELECT Expiry_Date, Food_ID FROM food_listings f
+    WHERE Location = ? AND Quantity - Reserved > 0 AND Expiry_Date >= ?
+    ORDER BY Expiry_Date, Food_ID
+    LIMIT ?
+"""
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda p: samples[min(len(samples) - 1, int(p * len(samples)))]
+    return {"p50_ms": pick(0.50), "p99_ms": pick(0.99), "mean_ms": statistics.fmean(samples)}
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return (time.perf_counter() - start) * 1e3, result
+
+
+def run(db_path, queries, k, seed=0):
+    # imported late so FOOD_DB_PATH is honoured
+    import storage
+    from claims import place_claim
+    from datasource import pool
+    from matching import MatchIndex
+
+    rng = random.Random(seed)
+    as_of = date(2025, 1, 1)  # datagen's first expiry date: nothing has expired
+    with pool().connection() as conn:
+        receivers = conn.execute("SELECT MAX(Receiver_ID) FROM receivers").fetchone()[0]
+        cities = dict(conn.execute("SELECT Receiver_ID, City FROM receivers"))
+        food_types = [row[0] for row in conn.execute("SELECT DISTINCT Food_Type FROM food_listings")]
+
+    index = MatchIndex(db_path)
+    storage.add_listener(index.apply_change)
+    build_ms, _ = timed(index.refresh)
+    print(f"index build: {build_ms:.0f} ms")
+
+    picks = [(cities[rng.randint(1, receivers)], rng.choice([None, [rng.choice(food_types)]]))
+             for _ in range(queries)]
+    index_ms = [timed(index.top_k, city, types, None, k, as_of)[0] for city, types in picks]
+    with pool().connection() as conn:
+        sql_ms = [
+            timed(lambda city: conn.execute(SQL_TOP_K, (city, as_of.isoformat(), k)).fetchall(), city)[0]
+            for city, _ in picks[:max(1, queries // 10)]
+        ]
+
+    # index upkeep rides on each committed write
+    city = picks[0][0]
+    write_ms = []
+    for _ in range(200):
+        elapsed, food_id = timed(storage.insert_row, "food_listings", {
+            "Food_ID": None, "Quantity": 5, "Expiry_Date": "2025-01-02",
+            "Location": city, "Food_Type": food_types[0], "Meal_Type": "Dinner",
+        })
+        write_ms.append(elapsed)
+        write_ms.append(timed(place_claim, food_id, 1, 5)[0])
+    assert index.builds == 1, "writes through storage.py should not rebuild the index"
+
+    return [
+        {"case": f"index top-{k}", **percentiles(index_ms)},
+        {"case": f"SQL top-{k}", **percentiles(sql_ms)},
+        {"case": "write + index upkeep", **percentiles(write_ms)},
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", help="existing database to benchmark (default: generate one)")
+    parser.add_argument("--providers", type=int, default=10_000)
+    parser.add_argument("--receivers", type=int, default=100_000)
+    parser.add_argument("--listings", type=int, default=1_000_000)
+    parser.add_argument("--claims", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=10_000)
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = args.db or os.path.join(tmp, "bench.db")
+        # must be set before anything imports datasource
+        os.environ["FOOD_DB_PATH"] = db_path
+        if args.db is None:
+            from benchmarks.datagen import generate
+            generate(db_path, args.providers, args.receivers, args.listings, args.claims)
+        results = run(db_path, args.queries, args.k)
+    for row in results:
+        print(f"{row['case']:<40} p50 {row['p50_ms']:8.3f} ms   p99 {row['p99_ms']:8.3f} ms   mean {row['mean_ms']:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
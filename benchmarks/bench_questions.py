@@ -0,0 +1,110 @@
+"""Dashboard questions: legacy pandas path vs the SQL query registry.
+
+The pandas path loads all four tables into DataFrames (as every app.py
+session used to) and aggregates them; the registry path runs one query per
+question and returns only the result rows. Reports latency and peak Python
+memory (tracemalloc) for each.
+
+    python -m benchmarks.bench_questions --listings 200000 --claims 200000
+"""
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+
+def legacy_answers(providers_df, receivers_df, food_listings_df, claims_df):
+    return {
+        "q1": lambda: pd.concat([providers_df['City'].value_counts(), receivers_df['City'].value_counts()],
+                                axis=1, keys=['Providers', 'Receivers']).fillna(0),
+        "q2": lambda: providers_df['Type'].value_counts().reset_index(),
+        "q3": lambda: providers_df[providers_df['City'].str.lower() == "city 00001"][['Name', 'Contact']],
+        "q4": lambda: claims_df.groupby('Receiver_ID').size().reset_index(name='Claim_Count')
+                               .sort_values(by='Claim_Count', ascending=False),
+        "q5": lambda: food_listings_df['Quantity'].sum(),
+        "q6": lambda: pd.merge(food_listings_df, providers_df[['Provider_ID', 'City']], on='Provider_ID',
+                               how='left')['City'].value_counts().reset_index(),
+        "q7": lambda: food_listings_df['Food_Type'].value_counts().reset_index(),
+        "q8": lambda: claims_df.groupby('Food_ID').size().reset_index(name='Claim_Count')
+                               .sort_values(by='Claim_Count', ascending=False),
+        "q12": lambda: food_listings_df['Meal_Type'].value_counts().reset_index(),
+        "q13": lambda: food_listings_df.groupby('Provider_ID')['Quantity'].sum().reset_index(),
+        "q15": lambda: pd.merge(claims_df, receivers_df[['Receiver_ID', 'City']], on='Receiver_ID',
+                                how='left')['City'].value_counts().reset_index(),
+    }
+
+
+def measure(fn, reset=lambda: None):
+    # timed without tracemalloc, whose per-allocation hook would dominate
+    gc.collect()
+    reset()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    reset()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed * 1e3, peak / 2**20
+
+
+def run(db_path):
+    # imported late so FOOD_DB_PATH is honoured
+    from datasource import clear_cache, fetchall
+    from query_registry import QUESTIONS, run_question
+    from repository import TableRepository
+
+    fetchall("SELECT 1")  # open the pooled connection outside the timings
+
+    # SQL first: once the pandas frames are resident, the garbage collector
+    # walks their object columns and would inflate whatever runs next
+    rows = []
+    for qid in QUESTIONS:
+        params = {"city": "City 00001"} if qid == "q3" else {}
+        # result cache cleared so every SQL run really executes the query
+        sql_ms, sql_mb = measure(lambda: run_question(qid, **params), reset=clear_cache)
+        rows.append({"question": qid, "sql_ms": sql_ms, "sql_peak_mb": sql_mb})
+
+    frames = {}
+
+    def load():
+        frames["all"] = TableRepository(db_path).get_all()
+
+    load_ms, load_mb = measure(load)
+    legacy = legacy_answers(*frames["all"])
+    for row in rows:
+        if row["question"] in legacy:
+            row["pandas_ms"], row["pandas_peak_mb"] = measure(legacy[row["question"]])
+    rows.insert(0, {"question": "load tables", "pandas_ms": load_ms, "pandas_peak_mb": load_mb})
+    resident = sum(int(df.memory_usage(deep=True).sum()) for df in frames["all"]) / 2**20
+    return pd.DataFrame(rows), resident
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", help="existing database to benchmark (default: generate one)")
+    parser.add_argument("--providers", type=int, default=10_000)
+    parser.add_argument("--receivers", type=int, default=10_000)
+    parser.add_argument("--listings", type=int, default=100_000)
+    parser.add_argument("--claims", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = args.db or os.path.join(tmp, "bench.db")
+        # must be set before anything imports datasource
+        os.environ["FOOD_DB_PATH"] = db_path
+        if args.db is None:
+            from benchmarks.datagen import generate
+            generate(db_path, args.providers, args.receivers, args.listings, args.claims)
+        results, resident = run(db_path)
+    print(results.to_string(index=False, float_format="%.2f", na_rep="-"))
+    print(f"\nDataFrames held per pandas session: {resident:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Query result cache under a read/write mix: dropping every result on any
+write (the old whole-database version check) vs per-table invalidation.
+
+Sessions cycle through every query function in database.py and extraqs.py;
+every --write-every reads, one CRUD write lands on a table drawn from
+--write-mix (claims-heavy by default, as in production).
+
+    python -m benchmarks.bench_result_cache --listings 50000 --claims 50000
+"""
+import argparse
+import inspect
+import os
+import random
+import tempfile
+import time
+
+import pandas as pd
+
+
+def run(reads, write_every, write_mix, seed=0):
+    # imported late so FOOD_DB_PATH is honoured
+    import database
+    import datasource
+    import extraqs
+    import storage
+
+    functions = [
+        (fn, ("City 00000",) if name == "get_provider_contacts_by_city" else ())
+        for module in (database, extraqs)
+        for name, fn in inspect.getmembers(module, inspect.isfunction)
+        if fn.__module__ == module.__name__ and name.startswith("get_")
+    ]
+    tables = list(write_mix)
+    weights = [write_mix[table] for table in tables]
+    values = {"providers": ("Name", "Renamed"), "receivers": ("Name", "Renamed"),
+              "food_listings": ("Quantity", 7), "claims": ("Status", "Completed")}
+
+    rows = []
+    for mode in ("clear on any write", "per-table"):
+        rng = random.Random(seed)
+        datasource.clear_cache()
+        before = datasource.cache_stats()
+        start = time.perf_counter()
+        for i in range(reads):
+            fn, args = functions[i % len(functions)]
+            fn(*args)
+            if (i + 1) % write_every == 0:
+                table = rng.choices(tables, weights)[0]
+                column, value = values[table]
+                storage.update_row(table, rng.randint(1, 1000), {column: value})
+                if mode == "clear on any write":
+                    datasource.clear_cache()
+        elapsed = (time.perf_counter() - start) * 1e3
+        after = datasource.cache_stats()
+        hits, misses = after["hits"] - before["hits"], after["misses"] - before["misses"]
+        rows.append({"mode": mode, "reads": reads, "hit_rate": hits / (hits + misses),
+                     "total_ms": elapsed, "ms_per_read": elapsed / reads})
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reads", type=int, default=2_000)
+    parser.add_argument("--write-every", type=int, default=100)
+    parser.add_argument("--providers", type=int, default=10_000)
+    parser.add_argument("--receivers", type=int, default=10_000)
+    parser.add_argument("--listings", type=int, default=50_000)
+    parser.add_argument("--claims", type=int, default=50_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        # must be set before anything imports datasource
+        os.environ["FOOD_DB_PATH"] = db_path
+        from benchmarks.datagen import generate
+        generate(db_path, args.providers, args.receivers, args.listings, args.claims)
+        mix = {"claims": 0.6, "food_listings": 0.3, "providers": 0.05, "receivers": 0.05}
+        results = run(args.reads, args.write_every, mix)
+    print(results.to_string(index=False, float_format="%.3f"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Search: search.search over the value dictionary against a LIKE '%word%'
+scan in SQLite and str.contains over a loaded frame, plus what the
+dictionary triggers cost each listing insert.
+
+    python -m benchmarks.bench_search --listings 1000000 --providers 50000
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+import pandas as pd
+
+
+def best_of(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - start) * 1e3)
+    return min(times), result
+
+
+def insert_cost(db_path, rows, search_triggers):
+    # per-listing insert time with or without the search triggers, rolled back after
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("BEGIN")
+    try:
+        if not search_triggers:
+            for event in ("insert", "delete", "update"):
+                conn.execute(f"DROP TRIGGER tr_search_food_listings_{event}")
+        first = conn.execute("SELECT MAX(Food_ID) FROM food_listings").fetchone()[0] + 1
+        start = time.perf_counter()
+        conn.executemany(
+            "INSERT INTO food_listings (Food_ID, Food_Name, Quantity, Expiry_Date, Location, Food_Type, Meal_Type) "
+            "VALUES (?, ?, 5, '2025-03-01', ?, 'Vegan', 'Lunch')",
+            ((first + i, f"Dish {i % 500}", f"Town {i % 2000}") for i in range(rows)),
+        )
+        return (time.perf_counter() - start) * 1e6 / rows
+    finally:
+        conn.execute("ROLLBACK")
+        conn.close()
+
+
+def run(db_path):
+    # imported late so FOOD_DB_PATH is honoured
+    from datasource import pool
+    from search import RESULT_COLUMNS, SEARCH_COLUMNS, search
+
+    with pool().connection() as conn:
+        frames = {table: pd.read_sql(f"SELECT {', '.join(RESULT_COLUMNS[table])} FROM {table}", conn)
+                  for table in SEARCH_COLUMNS}
+        city = conn.execute("SELECT City FROM providers GROUP BY City ORDER BY COUNT(*) DESC LIMIT 1").fetchone()[0]
+        name = conn.execute("SELECT Name FROM providers LIMIT 1 OFFSET 100").fetchone()[0]
+
+    def like_scan(table, word):
+        where = " OR ".join(f'"{column}" LIKE ?' for column in SEARCH_COLUMNS[table])
+        with pool().connection() as conn:
+            return conn.execute(f"SELECT * FROM {table} WHERE {where} LIMIT 20",
+                                (f"%{word}%",) * len(SEARCH_COLUMNS[table])).fetchall()
+
+    def pandas_scan(table, word):
+        df = frames[table]
+        mask = pd.Series(False, index=df.index)
+        for column in SEARCH_COLUMNS[table]:
+            mask |= df[column].astype(str).str.contains(word, case=False, regex=False)
+        return df[mask].head(20)
+
+    cases = [
+        ("food_listings", "rice", "exact word"),
+        ("food_listings", "ri", "2-letter prefix"),
+        ("food_listings", "chiken", "typo"),
+        ("food_listings", f"bread {city.split()[0]}", "two words"),
+        ("providers", name.split()[0][:5].lower(), "name prefix"),
+        ("providers", "zzqx", "no match"),
+    ]
+    rows = []
+    for table, text, kind in cases:
+        search_ms, result = best_of(lambda: search(table, text))
+        like_ms, _ = best_of(lambda: like_scan(table, text.split()[0]))
+        pandas_ms, _ = best_of(lambda: pandas_scan(table, text.split()[0]))
+        rows.append({"table": table, "query": text, "kind": kind, "hits": len(result), "search_ms": search_ms,
+                     "like_scan_ms": like_ms, "pandas_contains_ms": pandas_ms})
+    inserts = pd.DataFrame([
+        {"triggers": "without search", "us_per_insert": insert_cost(db_path, 20_000, False)},
+        {"triggers": "with search", "us_per_insert": insert_cost(db_path, 20_000, True)},
+    ])
+    return pd.DataFrame(rows), inserts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--providers", type=int, default=50_000)
+    parser.add_argument("--receivers", type=int, default=10_000)
+    parser.add_argument("--listings", type=int, default=1_000_000)
+    parser.add_argument("--claims", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        # must be set before anything imports datasource
+        os.environ["FOOD_DB_PATH"] = db_path
+        from benchmarks.datagen import generate
+        generate(db_path, args.providers, args.receivers, args.listings, args.claims)
+        queries, inserts = run(db_path)
+    print(queries.to_string(index=False, float_format="%.2f"))
+    print()
+    print(inserts.to_string(index=False, float_format="%.2f"))
+
+
+if __name__ == "__main__":
+    main()
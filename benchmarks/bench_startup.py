@@ -0,0 +1,93 @@
+"""Cold start: the four tables as DataFrames from CSV, from SQLite and from
+the column snapshot.
+
+"first page" is the time until the first 50 rows of every table can be
+rendered; "full" also touches every value (the snapshot maps numeric
+columns lazily, so this is when their pages are actually read).
+
+    python -m benchmarks.bench_startup --listings 1000000 --claims 1000000
+"""
+import argparse
+import gc
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+
+TABLES = ("providers", "receivers", "food_listings", "claims")
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1e3)
+    return min(times)
+
+
+def touch(frames):
+    for df in frames:
+        for name in df.columns:
+            if df[name].dtype.kind in "biuf":
+                df[name].to_numpy().sum()
+            else:
+                df[name].nunique()
+
+
+def run(db_path, csv_dir, repeat):
+    # imported late so FOOD_DB_PATH is honoured
+    from datasource import pool
+    from snapshot import read_snapshot, write_snapshots
+    from versions import database_id, get_versions
+
+    with pool().connection() as conn:
+        database = database_id(conn)
+        versions = get_versions(conn)
+        for table in TABLES:
+            pd.read_sql(f"SELECT * FROM {table}", conn).to_csv(os.path.join(csv_dir, f"{table}.csv"), index=False)
+    write_snapshots(db_path, TABLES)
+
+    def from_csv():
+        return [pd.read_csv(os.path.join(csv_dir, f"{table}.csv")) for table in TABLES]
+
+    def from_sqlite():
+        with pool().connection() as conn:
+            return [pd.read_sql(f"SELECT * FROM {table}", conn) for table in TABLES]
+
+    def from_snapshot():
+        return [read_snapshot(table, database, versions.get(table, 0), db_path) for table in TABLES]
+
+    rows = []
+    for name, load in [("CSV (pd.read_csv)", from_csv), ("SQLite (pd.read_sql)", from_sqlite),
+                       ("column snapshot", from_snapshot)]:
+        first = best_of(lambda: [df.head(50).to_dict() for df in load()], repeat)
+        full = best_of(lambda: touch(load()), repeat)
+        rows.append({"source": name, "first_page_ms": first, "full_ms": full})
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--providers", type=int, default=10_000)
+    parser.add_argument("--receivers", type=int, default=10_000)
+    parser.add_argument("--listings", type=int, default=500_000)
+    parser.add_argument("--claims", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        # must be set before anything imports datasource
+        os.environ["FOOD_DB_PATH"] = db_path
+        from benchmarks.datagen import generate
+        generate(db_path, args.providers, args.receivers, args.listings, args.claims)
+        results = run(db_path, tmp, args.repeat)
+    print(results.to_string(index=False, float_format="%.1f"))
+
+
+if __name__ == "__main__":
+    main()
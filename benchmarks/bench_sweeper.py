@@ -0,0 +1,59 @@
+"""Expiry sweeper: one tick per simulated day over the generated expiry range,
+against finding the expired listings with a full scan of food_listings.
+
+    python -m benchmarks.bench_sweeper --listings 1000000 --claims 200000
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+
+
+def run(days, step):
+    # imported late so FOOD_DB_PATH is honoured
+    from aggregates import claim_day_sql
+    from datasource import pool
+    from sweeper import sweep
+
+    rows = []
+    for offset in range(step, days + 1, step):
+        as_of = date(2025, 1, 1) + timedelta(days=offset)
+        with pool().connection() as conn:
+            start = time.perf_counter()
+            conn.execute(
+                f"SELECT COUNT(*) FROM food_listings WHERE {claim_day_sql('Expiry_Date')} < ?", (as_of.isoformat(),)
+            ).fetchone()
+            scan_ms = (time.perf_counter() - start) * 1e3
+            remaining = conn.execute("SELECT COUNT(*) FROM food_listings").fetchone()[0]
+        start = time.perf_counter()
+        result = sweep(as_of)
+        rows.append({"as_of": as_of.isoformat(), "listings": remaining, "examined": result["examined"],
+                     "archived": result["archived"], "sweep_ms": (time.perf_counter() - start) * 1e3,
+                     "full_scan_ms": scan_ms})
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--providers", type=int, default=10_000)
+    parser.add_argument("--receivers", type=int, default=10_000)
+    parser.add_argument("--listings", type=int, default=500_000)
+    parser.add_argument("--claims", type=int, default=100_000)
+    parser.add_argument("--step", type=int, default=10, help="days between ticks")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        # must be set before anything imports datasource
+        os.environ["FOOD_DB_PATH"] = db_path
+        from benchmarks.datagen import DAYS, generate
+        generate(db_path, args.providers, args.receivers, args.listings, args.claims)
+        results = run(DAYS, args.step)
+    print(results.to_string(index=False, float_format="%.1f"))
+
+
+if __name__ == "__main__":
+    main()
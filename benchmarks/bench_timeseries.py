@@ -0,0 +1,118 @@
+"""Claim trend over a long history: GROUP BY over claims, the whole day
+rollup (the old q14), and timeseries.claim_counts; plus what the extra
+hour/week/month rollup triggers cost each claim insert.
+
+    python -m benchmarks.bench_timeseries --claims 2000000 --years 10
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+
+def fill_claims(db_path, claims, years, seed=0):
+    from schema import migrate
+
+    rng = random.Random(seed)
+    minutes = years * 365 * 24 * 60
+    start = datetime(2015, 1, 1)
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    migrate(conn)
+    conn.execute("BEGIN")
+    conn.executemany(
+        "INSERT INTO claims (Claim_ID, Food_ID, Receiver_ID, Status, Timestamp) VALUES (?, 1, 1, 'Pending', ?)",
+        ((i, (start + timedelta(minutes=rng.randrange(minutes))).strftime("%Y-%m-%d %H:%M:%S"))
+         for i in range(1, claims + 1)),
+    )
+    conn.execute("COMMIT")
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+def best_of(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - start) * 1e3)
+    return min(times), result
+
+
+def insert_cost(db_path, rows, rollups):
+    # per-claim insert time with the given rollup triggers in place, rolled back after
+    from aggregates import CLAIM_ROLLUPS
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("BEGIN")
+    try:
+        if not rollups:
+            for name in CLAIM_ROLLUPS:
+                for event in ("insert", "delete", "update"):
+                    conn.execute(f"DROP TRIGGER tr_{name}_{event}")
+        first = conn.execute("SELECT MAX(Claim_ID) FROM claims").fetchone()[0] + 1
+        start = time.perf_counter()
+        conn.executemany(
+            "INSERT INTO claims (Claim_ID, Food_ID, Receiver_ID, Status, Timestamp) VALUES (?, 1, 1, 'Pending', ?)",
+            ((first + i, "2024-06-01 12:00:00") for i in range(rows)),
+        )
+        return (time.perf_counter() - start) * 1e6 / rows
+    finally:
+        conn.execute("ROLLBACK")
+        conn.close()
+
+
+def run(db_path):
+    # imported late so FOOD_DB_PATH is honoured
+    from datasource import clear_cache, pool
+    from timeseries import claim_counts
+
+    def group_by():
+        with pool().connection() as conn:
+            return conn.execute("SELECT DATE(Timestamp), COUNT(*) FROM claims GROUP BY DATE(Timestamp)").fetchall()
+
+    def day_rollup():
+        with pool().connection() as conn:
+            return conn.execute("SELECT Claim_Day, Row_Count FROM agg_claims_day ORDER BY Claim_Day").fetchall()
+
+    def rollups(start=None, end=None):
+        clear_cache()
+        return claim_counts(start, end)[0]
+
+    rows = []
+    for name, fn in [("GROUP BY DATE(Timestamp)", group_by), ("agg_claims_day, all days", day_rollup),
+                     ("claim_counts, all history", rollups),
+                     ("claim_counts, one year", lambda: rollups("2020-01-01", "2020-12-31")),
+                     ("claim_counts, one week", lambda: rollups("2020-03-02", "2020-03-08"))]:
+        ms, result = best_of(fn)
+        rows.append({"query": name, "ms": ms, "points": len(result)})
+    inserts = pd.DataFrame([
+        {"triggers": "day only", "us_per_insert": insert_cost(db_path, 20_000, False)},
+        {"triggers": "hour/day/week/month", "us_per_insert": insert_cost(db_path, 20_000, True)},
+    ])
+    return pd.DataFrame(rows), inserts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--claims", type=int, default=1_000_000)
+    parser.add_argument("--years", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        # must be set before anything imports datasource
+        os.environ["FOOD_DB_PATH"] = db_path
+        fill_claims(db_path, args.claims, args.years)
+        queries, inserts = run(db_path)
+    print(queries.to_string(index=False, float_format="%.2f"))
+    print()
+    print(inserts.to_string(index=False, float_format="%.2f"))
+
+
+if __name__ == "__main__":
+    main()
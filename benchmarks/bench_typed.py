@@ -0,0 +1,74 @@
+"""Typed table layer: per-table memory and groupby speed, plain vs typed frames.
+
+    python -m benchmarks.bench_typed --listings 1000000 --claims 1000000
+"""
+import argparse
+import gc
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+
+TABLES = ("providers", "receivers", "food_listings", "claims")
+
+GROUPBYS = {
+    "providers by City": ("providers", lambda df: df.groupby("City").size()),
+    "listings Quantity by Location": ("food_listings", lambda df: df.groupby("Location")["Quantity"].sum()),
+    "listings by Food_Type, Meal_Type": ("food_listings", lambda df: df.groupby(["Food_Type", "Meal_Type"]).size()),
+    "claims by Status": ("claims", lambda df: df.groupby("Status").size()),
+    "claims per day": ("claims", lambda df: df.groupby(pd.to_datetime(df["Timestamp"]).dt.date).size()),
+}
+
+
+def best_of(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1e3)
+    return min(times)
+
+
+def run():
+    # imported late so FOOD_DB_PATH is honoured
+    from datasource import pool
+    from table_types import memory_report, to_typed
+
+    with pool().connection() as conn:
+        plain = {table: pd.read_sql(f"SELECT * FROM {table}", conn) for table in TABLES}
+    typed = {table: to_typed(table, df) for table, df in plain.items()}
+
+    timings = []
+    for name, (table, fn) in GROUPBYS.items():
+        timings.append({"groupby": name, "plain_ms": best_of(lambda: fn(plain[table])),
+                        "typed_ms": best_of(lambda: fn(typed[table]))})
+    return memory_report(plain), pd.DataFrame(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--providers", type=int, default=10_000)
+    parser.add_argument("--receivers", type=int, default=10_000)
+    parser.add_argument("--listings", type=int, default=500_000)
+    parser.add_argument("--claims", type=int, default=500_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        # must be set before anything imports datasource
+        os.environ["FOOD_DB_PATH"] = db_path
+        from benchmarks.datagen import generate
+        generate(db_path, args.providers, args.receivers, args.listings, args.claims)
+        memory, timings = run()
+    memory["Plain_MB"] = memory.pop("Plain_Bytes") / 2**20
+    memory["Typed_MB"] = memory.pop("Typed_Bytes") / 2**20
+    print(memory[["Table", "Rows", "Plain_MB", "Typed_MB", "Ratio"]].to_string(index=False, float_format="%.2f"))
+    print()
+    print(timings.to_string(index=False, float_format="%.2f"))
+
+
+if __name__ == "__main__":
+    main()
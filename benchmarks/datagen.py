@@ -0,0 +1,127 @@
+"""Synthetic providers/receivers/food_listings/claims written straight into SQLite.
+
+    python -m benchmarks.datagen out.db --listings 1000000 --claims 1000000
+"""
+import argparse
+import random
+import sqlite3
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from schema import migrate
+
+
+FOOD_NAMES = ["Rice", "Soup", "Bread", "Fruits", "Vegetables", "Pasta", "Salad", "Dairy", "Chicken", "Fish"]
+PROVIDER_TYPES = ["Restaurant", "Grocery Store", "Supermarket", "Catering Service"]
+RECEIVER_TYPES = ["NGO", "Shelter", "Charity", "Individual"]
+FOOD_TYPES = ["Vegetarian", "Non-Vegetarian", "Vegan"]
+MEAL_TYPES = ["Breakfast", "Lunch", "Dinner", "Snacks"]
+STATUSES = ["Pending", "Completed", "Cancelled"]
+
+
+# Relative frequencies; cities follow a Zipf law (see generate's skew).
+FOOD_TYPE_WEIGHTS = [0.45, 0.35, 0.20]
+MEAL_TYPE_WEIGHTS = [0.20, 0.35, 0.35, 0.10]
+STATUS_WEIGHTS = [0.25, 0.60, 0.15]
+# claims by hour of day: quiet nights, lunch and evening peaks
+HOUR_WEIGHTS = [1, 1, 1, 1, 1, 2, 3, 5, 6, 6, 7, 9, 12, 11, 8, 6, 7, 9, 12, 13, 10, 6, 3, 2]
+DAYS = 120
+
+
+def _cities(n):
+    return [f"City {i:05d}" for i in range(n)]
+
+
+def _claim_time(rng, start, day_weights, hour_weights):
+    day = rng.choices(range(DAYS), cum_weights=day_weights)[0]
+    hour = rng.choices(range(24), cum_weights=hour_weights)[0]
+    return start + timedelta(days=day, hours=hour, minutes=rng.randrange(60))
+
+
+def generate(db_path, providers=1_000, receivers=1_000, listings=1_000, claims=1_000,
+             cities=None, seed=0, batch_size=50_000, skew=1.0):
+    """Fill db_path with synthetic rows, deterministic for a given seed.
+
+    skew is the Zipf exponent of the city distribution (0: uniform; 1: the
+    biggest city is ~10x the 10th). Food and meal types and claim statuses
+    follow fixed weights; claims cluster at lunch and evening, on weekends,
+    and grow over the 120 days covered.
+    """
+    rng = random.Random(seed)
+    cities = _cities(cities or max(10, providers // 2))
+    start = datetime(2025, 1, 1)
+    city_weights = list(accumulate(1 / (rank ** skew) for rank in range(1, len(cities) + 1)))
+    food_weights = list(accumulate(FOOD_TYPE_WEIGHTS))
+    meal_weights = list(accumulate(MEAL_TYPE_WEIGHTS))
+    status_weights = list(accumulate(STATUS_WEIGHTS))
+    hour_weights = list(accumulate(HOUR_WEIGHTS))
+    # weekends 1.5x, and 2x growth from the first day to the last
+    day_weights = list(accumulate(
+        (1.5 if (start + timedelta(days=day)).weekday() >= 5 else 1.0) * (1 + day / DAYS)
+        for day in range(DAYS)
+    ))
+
+    def city():
+        return rng.choices(cities, cum_weights=city_weights)[0]
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        migrate(conn)
+
+        def insert(table, columns, rows):
+            sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+            conn.execute("BEGIN")
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    conn.executemany(sql, batch)
+                    batch.clear()
+            conn.executemany(sql, batch)
+            conn.execute("COMMIT")
+
+        insert("providers", ["Provider_ID", "Name", "Type", "Address", "City", "Contact"], (
+            (i, f"Provider {i}", rng.choice(PROVIDER_TYPES), f"{i} Main St", city(), f"555-{i:07d}")
+            for i in range(1, providers + 1)
+        ))
+        insert("receivers", ["Receiver_ID", "Name", "Type", "City", "Contact"], (
+            (i, f"Receiver {i}", rng.choice(RECEIVER_TYPES), city(), f"556-{i:07d}")
+            for i in range(1, receivers + 1)
+        ))
+        insert("food_listings", ["Food_ID", "Food_Name", "Quantity", "Expiry_Date", "Provider_ID",
+                                 "Provider_Type", "Location", "Food_Type", "Meal_Type"], (
+            (i, rng.choice(FOOD_NAMES), rng.randint(1, 50),
+             (start + timedelta(days=rng.randint(0, DAYS))).strftime("%Y-%m-%d"),
+             rng.randint(1, providers), rng.choice(PROVIDER_TYPES), city(),
+             rng.choices(FOOD_TYPES, cum_weights=food_weights)[0],
+             rng.choices(MEAL_TYPES, cum_weights=meal_weights)[0])
+            for i in range(1, listings + 1)
+        ))
+        insert("claims", ["Claim_ID", "Food_ID", "Receiver_ID", "Status", "Timestamp"], (
+            (i, rng.randint(1, listings), rng.randint(1, receivers),
+             rng.choices(STATUSES, cum_weights=status_weights)[0],
+             _claim_time(rng, start, day_weights, hour_weights).strftime("%Y-%m-%d %H:%M:%S"))
+            for i in range(1, claims + 1)
+        ))
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("db")
+    parser.add_argument("--providers", type=int, default=1_000)
+    parser.add_argument("--receivers", type=int, default=1_000)
+    parser.add_argument("--listings", type=int, default=1_000)
+    parser.add_argument("--claims", type=int, default=1_000)
+    parser.add_argument("--cities", type=int)
+    parser.add_argument("--skew", type=float, default=1.0, help="Zipf exponent of city sizes")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate(args.db, args.providers, args.receivers, args.listings, args.claims,
+             args.cities, args.seed, skew=args.skew)
+
+
+if __name__ == "__main__":
+    main()
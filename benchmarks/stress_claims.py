@@ -0,0 +1,147 @@
+"""Claim lifecycle under concurrency: many threads placing, completing and
+cancelling claims on a few hot listings, then checking that no listing was
+over-allocated and no reservation was lost.
+
+For every listing, at the end:
+    Quantity == starting Quantity
+    Reserved == quantity of its Pending and Completed claims <= Quantity
+--naive runs the old CRUD sequence (read what is left, write the reservation
+back, insert the claim) for comparison.
+Exits 1 if the invariant fails for the lifecycle path.
+
+    python -m benchmarks.stress_claims --threads 16 --seconds 10
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+
+def setup(db_path, listings, quantity):
+    from schema import migrate
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    migrate(conn)
+    conn.execute("BEGIN")
+    conn.executemany(
+        "INSERT INTO food_listings (Food_ID, Food_Name, Quantity, Expiry_Date, Location) VALUES (?, 'Rice', ?, '2030-01-01', 'City 1')",
+        [(i, quantity) for i in range(1, listings + 1)],
+    )
+    conn.executemany("INSERT INTO receivers (Receiver_ID, Name, City) VALUES (?, ?, 'City 1')",
+                     [(i, f"Receiver {i}") for i in range(1, 101)])
+    conn.execute("COMMIT")
+    conn.close()
+
+
+def lifecycle_worker(db_path, listings, deadline, seed, claims, counts, lock):
+    from claims import ClaimError, cancel_claim, complete_claim, place_claim
+
+    rng = random.Random(seed)
+    while time.perf_counter() < deadline:
+        action = rng.random()
+        try:
+            if action < 0.7 or not claims:
+                claims.append(place_claim(rng.randint(1, listings), rng.randint(1, 100), rng.randint(1, 5), db_path=db_path))
+                op = "placed"
+            else:
+                # any thread's claim: racing moves on one claim must not both apply
+                claim_id = claims[rng.randrange(len(claims))]
+                (complete_claim if action < 0.85 else cancel_claim)(claim_id, db_path)
+                op = "completed" if action < 0.85 else "cancelled"
+        except ClaimError:
+            op = "rejected"
+        with lock:
+            counts[op] = counts.get(op, 0) + 1
+
+
+def naive_worker(db_path, listings, deadline, seed, claims, counts, lock):
+    # the old CRUD sequence: check, then write the new reservation back
+    import storage
+    from connection_pool import get_pool
+
+    rng = random.Random(seed)
+    while time.perf_counter() < deadline:
+        food_id, quantity = rng.randint(1, listings), rng.randint(1, 5)
+        with get_pool(db_path).connection() as conn:
+            total, reserved = conn.execute(
+                "SELECT Quantity, Reserved FROM food_listings WHERE Food_ID = ?", (food_id,)
+            ).fetchone()
+        if total - reserved < quantity:
+            op = "rejected"
+        else:
+            storage.update_row("food_listings", food_id, {"Reserved": reserved + quantity}, db_path)
+            claims.append(storage.insert_row("claims", {"Food_ID": food_id, "Receiver_ID": 1, "Status": "Pending",
+                                                        "Quantity": quantity}, db_path))
+            op = "placed"
+        with lock:
+            counts[op] = counts.get(op, 0) + 1
+
+
+def check(db_path, quantity):
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("""
+            SELECT f.Food_ID, f.Quantity, f.Reserved,
+                   IFNULL((SELECT SUM(c.Quantity) FROM claims c
+                           WHERE c.Food_ID = f.Food_ID AND c.Status IN ('Pending', 'Completed')), 0)
+            FROM food_listings f
+        """).fetchall()
+    finally:
+        conn.close()
+    broken = [(food_id, total, reserved, held) for food_id, total, reserved, held in rows
+              if total != quantity or reserved != held or held > total]
+    # units held by claims beyond the listing, or reserved for no claim
+    over = sum(max(0, held - total) + abs(reserved - held) for _, total, reserved, held in broken)
+    return broken, over
+
+
+def run(db_path, worker, threads, seconds, listings, quantity):
+    setup(db_path, listings, quantity)
+    claims, counts, lock = [], {}, threading.Lock()
+    deadline = time.perf_counter() + seconds
+    workers = [threading.Thread(target=worker, args=(db_path, listings, deadline, seed, claims, counts, lock))
+               for seed in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    broken, over = check(db_path, quantity)
+    ops = sum(counts.values())
+    return {"path": worker.__name__.replace("_worker", ""), "threads": threads, "ops": ops,
+            "ops_per_s": ops / elapsed, **{k: counts.get(k, 0) for k in ("placed", "completed", "cancelled", "rejected")},
+            "listings_broken": len(broken), "units_lost_or_overallocated": over}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--listings", type=int, default=20, help="hot listings every thread competes for")
+    parser.add_argument("--quantity", type=int, default=100_000, help="starting quantity of each listing")
+    parser.add_argument("--naive", action="store_true", help="also run the old read-then-write CRUD sequence")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        # must be set before anything imports datasource
+        os.environ["FOOD_DB_PATH"] = os.path.join(tmp, "lifecycle.db")
+        results.append(run(os.path.join(tmp, "lifecycle.db"), lifecycle_worker, args.threads, args.seconds,
+                           args.listings, args.quantity))
+        if args.naive:
+            results.append(run(os.path.join(tmp, "naive.db"), naive_worker, args.threads, args.seconds,
+                               args.listings, args.quantity))
+    print(pd.DataFrame(results).to_string(index=False, float_format="%.0f"))
+    if results[0]["listings_broken"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
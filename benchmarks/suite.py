@@ -0,0 +1,287 @@
+"""Benchmark suite: every dashboard query, every CRUD operation and the app
+startup path against a generated database, written as JSON for comparison.
+
+Each query function runs with the result cache cleared, so the numbers are
+what a session pays after any write. CRUD operations are timed one call at a
+time on fresh keys. Startup is what app.py does before the first page:
+sync_all against the CSVs and the first page of View Tables. The repository
+group times TableRepository().get_all() cold, which app.py no longer does at
+startup (CRUD_CSV.load_data and the View Tables cache expander still load
+tables through it).
+
+    python -m benchmarks.suite --scale 100k --out bench-100k.json
+    python -m benchmarks.suite --scale 100k --baseline bench-100k.json
+
+With --baseline, any benchmark whose median grew by more than its threshold
+ratio (and by more than NOISE_FLOOR_MS) is reported and the exit status is 1.
+"""
+import argparse
+import gc
+import inspect
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+
+# rows per table: (providers, receivers, food_listings, claims)
+SCALES = {
+    "10k": (1_000, 1_000, 10_000, 10_000),
+    "100k": (10_000, 10_000, 100_000, 100_000),
+    "1m": (50_000, 50_000, 1_000_000, 1_000_000),
+    "10m": (200_000, 200_000, 10_000_000, 10_000_000),
+}
+
+TABLES = ("providers", "receivers", "food_listings", "claims")
+
+# Allowed median ratio against the baseline, by benchmark name prefix
+# (longest match wins). CRUD calls are fsync-bound and noisier.
+DEFAULT_THRESHOLD = 1.25
+THRESHOLDS = {
+    "crud.": 1.5,
+    "startup.sync_first": 1.5,
+}
+# differences below this are timer noise, whatever the ratio
+NOISE_FLOOR_MS = 0.5
+
+
+def sample(fn, repeat):
+    """Wall time of `repeat` calls of fn, in ms."""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1e3)
+    return times
+
+
+def stats(times):
+    ordered = sorted(times)
+    return {
+        "runs": len(ordered),
+        "min_ms": ordered[0],
+        "median_ms": statistics.median(ordered),
+        "p95_ms": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+    }
+
+
+def query_benchmarks(city):
+    import database
+    import extraqs
+
+    # arguments for the functions that take any
+    args = {"get_provider_contacts_by_city": (city,)}
+    for module in (database, extraqs):
+        for name, fn in inspect.getmembers(module, inspect.isfunction):
+            if fn.__module__ == module.__name__ and name.startswith("get_"):
+                yield f"query.{module.__name__}.{name}", fn, args.get(name, ())
+
+
+def run_queries(repeat, city):
+    from datasource import clear_cache
+
+    results = {}
+    for name, fn, args in query_benchmarks(city):
+        def cold():
+            clear_cache()
+            fn(*args)
+        cold()  # warm the page cache and the statement cache
+        results[name] = stats(sample(cold, repeat))
+    return results
+
+
+def run_crud(ops, city):
+    """One timed call per operation on keys above the generated ones."""
+    try:
+        import CRUD_CSV as crud
+    except ImportError as e:
+        # CRUD_CSV builds its Streamlit form at import time
+        print(f"skipping crud benchmarks: {e}", file=sys.stderr)
+        return {}
+    from datasource import pool
+
+    with pool().connection() as conn:
+        top = {table: conn.execute(f'SELECT COALESCE(MAX(rowid), 0) FROM "{table}"').fetchone()[0]
+               for table in TABLES}
+        # add_claim reserves quantity, so claim the fullest listing
+        food_id = conn.execute("SELECT Food_ID FROM food_listings ORDER BY Quantity DESC LIMIT 1").fetchone()[0]
+        receiver_id = conn.execute("SELECT MIN(Receiver_ID) FROM receivers").fetchone()[0]
+
+    def timed(fn, args_list):
+        times = []
+        for args in args_list:
+            start = time.perf_counter()
+            fn(*args)
+            times.append((time.perf_counter() - start) * 1e3)
+        return stats(times)
+
+    results = {}
+    keys = [top["providers"] + 1 + i for i in range(ops)]
+    results["crud.add_provider"] = timed(crud.add_provider, [(k, f"Bench {k}", "Restaurant", city) for k in keys])
+    results["crud.update_provider_name"] = timed(crud.update_provider_name, [(k, f"Renamed {k}") for k in keys])
+    results["crud.delete_provider"] = timed(crud.delete_provider, [(k,) for k in keys])
+
+    keys = [top["receivers"] + 1 + i for i in range(ops)]
+    results["crud.add_receiver"] = timed(crud.add_receiver, [(k, f"Bench {k}", "NGO", city) for k in keys])
+    results["crud.update_receiver_name"] = timed(crud.update_receiver_name, [(k, f"Renamed {k}") for k in keys])
+    results["crud.delete_receiver"] = timed(crud.delete_receiver, [(k,) for k in keys])
+
+    listing = ("Rice", 10, "2025-03-01", 1, "Restaurant", city, "Vegetarian", "Lunch")
+    keys = []
+    results["crud.add_food_item"] = timed(lambda: keys.append(crud.add_food_item(*listing)), [()] * ops)
+    results["crud.update_food_quantity"] = timed(crud.update_food_quantity, [(k, 5) for k in keys])
+    results["crud.delete_food_item"] = timed(crud.delete_food_item, [(k,) for k in keys])
+
+    keys = [top["claims"] + 1 + i for i in range(ops)]
+    results["crud.add_claim"] = timed(crud.add_claim, [(k, food_id, receiver_id, "2025-03-01 12:00") for k in keys])
+    results["crud.update_claim_date"] = timed(crud.update_claim_date, [(k, "2025-03-02 12:00") for k in keys])
+    results["crud.delete_claim"] = timed(crud.delete_claim, [(k,) for k in keys])
+    return results
+
+
+def run_startup(db_path, repeat):
+    """app.py before its first page: CSV sync, first View Tables page."""
+    from datasource import TABLE_SOURCES, pool
+    from sync import sync_all
+    from table_browser import DEFAULT_PAGE_SIZE, fetch_page, table_columns
+
+    with pool().connection() as conn:
+        for table, (csv_path, _) in TABLE_SOURCES.items():
+            pd.read_sql(f'SELECT * FROM "{table}"', conn).to_csv(csv_path, index=False)
+
+    results = {}
+    # the first run hashes and diffs every CSV; the database already matches them
+    results["startup.sync_first"] = stats(sample(lambda: sync_all(db_path), 1))
+    results["startup.sync_unchanged"] = stats(sample(lambda: sync_all(db_path), repeat))
+
+    def first_page():
+        columns = table_columns("food_listings")
+        fetch_page("food_listings", columns, columns[0], False, None, DEFAULT_PAGE_SIZE)
+    results["startup.first_page"] = stats(sample(first_page, repeat))
+    return results
+
+
+def run_repository(db_path, repeat):
+    """Every table loaded into a new TableRepository, from snapshot or SQLite."""
+    from repository import TableRepository
+
+    return {"repository.get_all_cold": stats(sample(lambda: TableRepository(db_path).get_all(), repeat))}
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, dirty
+
+
+def threshold(name):
+    matches = [prefix for prefix in THRESHOLDS if name.startswith(prefix)]
+    return THRESHOLDS[max(matches, key=len)] if matches else DEFAULT_THRESHOLD
+
+
+def compare(current, baseline):
+    """One row per benchmark present in both runs; Regression marks the ones over threshold."""
+    rows = []
+    for name, now in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        ratio = now["median_ms"] / before["median_ms"] if before["median_ms"] else float("inf")
+        rows.append({
+            "Benchmark": name, "Baseline_ms": before["median_ms"], "Current_ms": now["median_ms"],
+            "Ratio": ratio, "Threshold": threshold(name),
+            "Regression": ratio > threshold(name) and now["median_ms"] - before["median_ms"] > NOISE_FLOOR_MS,
+        })
+    return pd.DataFrame(rows, columns=["Benchmark", "Baseline_ms", "Current_ms", "Ratio", "Threshold", "Regression"])
+
+
+def run(scale, repeat, ops, seed, skew, groups):
+    providers, receivers, listings, claims = SCALES[scale]
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        # must be set before anything imports datasource
+        os.environ["FOOD_DB_PATH"] = db_path
+        os.environ["FOOD_CSV_DIR"] = tmp
+        from benchmarks.datagen import generate
+        start = time.perf_counter()
+        generate(db_path, providers, receivers, listings, claims, seed=seed, skew=skew)
+        print(f"generated {scale} in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("ANALYZE")
+            # the biggest city, so the per-city lookup returns rows
+            city = conn.execute("SELECT City FROM providers GROUP BY City ORDER BY COUNT(*) DESC LIMIT 1").fetchone()[0]
+        conn.close()
+
+        results = {}
+        if "startup" in groups:
+            # first, while the repository and the page cache are cold
+            results.update(run_startup(db_path, repeat))
+        if "repository" in groups:
+            results.update(run_repository(db_path, repeat))
+        if "queries" in groups:
+            results.update(run_queries(repeat, city))
+        if "crud" in groups:
+            results.update(run_crud(ops, city))
+
+    commit, dirty = git_commit()
+    return {
+        "commit": commit,
+        "dirty": dirty,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "pandas": pd.__version__,
+        "params": {"scale": scale, "rows": dict(zip(TABLES, SCALES[scale])), "repeat": repeat,
+                   "ops": ops, "seed": seed, "skew": skew},
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=SCALES, default="10k")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--ops", type=int, default=50, help="calls per CRUD operation")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skew", type=float, default=1.0, help="Zipf exponent of city sizes")
+    parser.add_argument("--only", nargs="+", choices=["startup", "repository", "queries", "crud"],
+                        default=["startup", "repository", "queries", "crud"])
+    parser.add_argument("--out", help="write the run as JSON here")
+    parser.add_argument("--baseline", help="JSON from an earlier run to check for regressions")
+    args = parser.parse_args()
+
+    report = run(args.scale, args.repeat, args.ops, args.seed, args.skew, args.only)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    table = pd.DataFrame([{"Benchmark": name, **result} for name, result in report["results"].items()])
+    print(table.to_string(index=False, float_format="%.3f"))
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["params"] != report["params"]:
+            print(f"warning: baseline params differ: {baseline['params']}", file=sys.stderr)
+        comparison = compare(report, baseline)
+        print()
+        print(comparison.to_string(index=False, float_format="%.3f"))
+        regressions = comparison[comparison["Regression"]]
+        if not regressions.empty:
+            print(f"\n{len(regressions)} regression(s) against {baseline.get('commit')}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
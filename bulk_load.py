@@ -0,0 +1,190 @@
+import argparse
+import sqlite3
+import time
+
+import pandas as pd
+
+from aggregates import AGGREGATES, rebuild_aggregate
+from datasource import DB_PATH, TABLE_SOURCES
+from schema import migrate
+from search import SEARCH_COLUMNS, rebuild_search_terms
+from snapshot import write_snapshots
+from storage import archived_keys, ensure_columns, overdrawn
+from sweeper import rebuild_expiry_queue
+from versions import bump_version
+
+
+CHUNK_SIZE = 50_000
+COMMIT_EVERY = 500_000
+
+
+def _deferred_objects(conn, table):
+    # secondary indexes and triggers on the table, with the SQL to recreate them
+    return conn.execute(
+        "SELECT type, name, sql FROM sqlite_master "
+        "WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL",
+        (table,),
+    ).fetchall()
+
+
+def _restore(conn, table, deferred):
+    # a rollback of the first batch brings the dropped objects back by itself
+    conn.execute("BEGIN IMMEDIATE")
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+    for _, name, sql in deferred:
+        if name not in existing:
+            conn.execute(sql)
+    for name, (source, _, _) in AGGREGATES.items():
+        if source == table:
+            rebuild_aggregate(conn, name)
+    if table == "food_listings" and "_expiry_queue" in existing:
+        rebuild_expiry_queue(conn)
+    if table in SEARCH_COLUMNS and "_search_terms" in existing:
+        rebuild_search_terms(conn, table)
+    bump_version(conn, table)
+    conn.execute("COMMIT")
+
+
+def _declared_types(conn, table):
+    return {row[1]: (row[2] or "").upper() for row in conn.execute(f'PRAGMA table_info("{table}")')}
+
+
+def coerce_chunk(chunk, types, pk):
+    """Coerce a chunk read as text to the table's declared column types.
+
+    INTEGER/REAL/NUMERIC columns go through pd.to_numeric; a value that does
+    not parse becomes NULL and is counted as coerced. Rows without a usable
+    primary key are dropped and counted as rejected.
+    Returns (chunk, rejected, coerced).
+    """
+    coerced = 0
+    for column in chunk.columns:
+        declared = types.get(column, "")
+        if not any(name in declared for name in ("INT", "REAL", "NUM", "FLOA", "DOUB")):
+            continue
+        values = pd.to_numeric(chunk[column], errors="coerce")
+        coerced += int((values.isna() & chunk[column].notna()).sum())
+        if "INT" in declared and (values.dropna() % 1 == 0).all():
+            values = values.astype("Int64")
+        chunk[column] = values
+    valid = chunk[pk].notna()
+    return chunk[valid], int((~valid).sum()), coerced
+
+
+def _records(chunk):
+    # pd.NA / NaN -> None so sqlite stores NULL, numpy scalars -> python scalars
+    return list(chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None))
+
+
+def load_table(conn, table, csv_path, pk, chunk_size=CHUNK_SIZE, commit_every=COMMIT_EVERY):
+    """Stream csv_path into table, upserting on pk. Memory is bounded by chunk_size.
+
+    Secondary indexes and triggers are dropped for the load and recreated
+    afterwards (also when the load fails), then the trigger-maintained
+    aggregates over the table are recomputed once. Rows are written with
+    executemany, committing every commit_every rows; a later row with the
+    same key replaces an earlier one, so re-running a load is idempotent.
+    Rows whose key is archived (storage.ARCHIVES) are skipped, and a listing
+    whose Quantity would drop below its Reserved is rejected.
+    Returns a dict of counts and timings.
+    """
+    start = time.perf_counter()
+    stats = {"table": table, "rows": 0, "rejected": 0, "coerced": 0}
+    deferred = _deferred_objects(conn, table)
+    types = _declared_types(conn, table)
+
+    conn.execute("BEGIN IMMEDIATE")
+    for kind, name, _ in deferred:
+        conn.execute(f'DROP {kind.upper()} IF EXISTS "{name}"')
+    try:
+        pending = 0
+        for chunk in pd.read_csv(csv_path, chunksize=chunk_size, dtype=str):
+            chunk, rejected, coerced = coerce_chunk(chunk, types, pk)
+            stats["rejected"] += rejected
+            stats["coerced"] += coerced
+            retired = archived_keys(conn, table, chunk[pk])
+            if retired:
+                chunk = chunk[~chunk[pk].isin(retired)]
+            if table == "food_listings" and "Quantity" in chunk.columns:
+                # the load holds the write lock, so this check stands until the upsert
+                held = overdrawn(conn, _records(chunk[[pk, "Quantity"]]))
+                if held:
+                    kept = ~chunk[pk].isin(held)
+                    stats["rejected"] += int((~kept).sum())
+                    chunk = chunk[kept]
+            if chunk.empty:
+                continue
+            new_columns = [c for c in chunk.columns if c not in types]
+            if new_columns:
+                ensure_columns(conn, table, new_columns)
+                types.update({column: "" for column in new_columns})
+            columns = ", ".join(f'"{c}"' for c in chunk.columns)
+            placeholders = ", ".join("?" for _ in chunk.columns)
+            updates = ", ".join(f'"{c}" = excluded."{c}"' for c in chunk.columns if c != pk)
+            conn.executemany(
+                f'INSERT INTO "{table}" ({columns}) VALUES ({placeholders}) '
+                f'ON CONFLICT("{pk}") DO ' + (f"UPDATE SET {updates}" if updates else "NOTHING"),
+                _records(chunk),
+            )
+            stats["rows"] += len(chunk)
+            pending += len(chunk)
+            if pending >= commit_every:
+                conn.execute("COMMIT")
+                conn.execute("BEGIN IMMEDIATE")
+                pending = 0
+        conn.execute("COMMIT")
+        load_seconds = time.perf_counter() - start
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        _restore(conn, table, deferred)
+
+    stats["load_s"] = load_seconds
+    stats["total_s"] = time.perf_counter() - start
+    stats["rows_per_s"] = stats["rows"] / load_seconds if load_seconds else 0.0
+    return stats
+
+
+def load_all(db_path=DB_PATH, sources=TABLE_SOURCES, chunk_size=CHUNK_SIZE, commit_every=COMMIT_EVERY):
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        # keyed tables are what make the upsert possible
+        migrate(conn)
+        results = [
+            load_table(conn, table, csv_path, pk, chunk_size, commit_every)
+            for table, (csv_path, pk) in sources.items()
+        ]
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    write_snapshots(db_path, list(sources))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream CSV files into the food database, upserting on primary keys.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="CSV rows parsed at a time")
+    parser.add_argument("--commit-every", type=int, default=COMMIT_EVERY, help="rows per transaction")
+    parser.add_argument("sources", nargs="*", metavar="TABLE=CSV",
+                        help="tables to load (default: every table from its configured CSV)")
+    args = parser.parse_args()
+
+    sources = TABLE_SOURCES
+    if args.sources:
+        sources = {}
+        for item in args.sources:
+            table, _, path = item.partition("=")
+            if table not in TABLE_SOURCES or not path:
+                parser.error(f"expected TABLE=CSV with TABLE one of {', '.join(TABLE_SOURCES)}: {item}")
+            sources[table] = (path, TABLE_SOURCES[table][1])
+
+    for stats in load_all(args.db, sources, args.chunk_size, args.commit_every):
+        print(f"{stats['table']}: {stats['rows']} rows in {stats['load_s']:.2f} s "
+              f"({stats['rows_per_s']:,.0f} rows/s; indexes and aggregates {stats['total_s'] - stats['load_s']:.2f} s), "
+              f"{stats['rejected']} rejected, {stats['coerced']} values coerced to NULL")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+from datetime import date, datetime
+
+from datasource import DB_PATH
+from storage import next_id, notify, transaction
+from versions import bump_version
+
+
+PENDING = "Pending"
+COMPLETED = "Completed"
+CANCELLED = "Cancelled"
+
+# the only moves a claim can make; Completed and Cancelled are final
+TRANSITIONS = {PENDING: {COMPLETED, CANCELLED}}
+
+# Quantity is what was donated and stays put; Reserved is what Pending and
+# Completed claims hold. Params (quantity, Food_ID, quantity): matches no row
+# when less than quantity is left.
+RESERVE_SQL = "UPDATE food_listings SET Reserved = Reserved + ? WHERE Food_ID = ? AND Quantity - Reserved >= ?"
+RELEASE_SQL = "UPDATE food_listings SET Reserved = Reserved - ? WHERE Food_ID = ?"
+
+
+class ClaimError(ValueError):
+    """A claim that cannot be placed or moved: unknown listing or claim, not
+    enough quantity left, or a transition TRANSITIONS does not allow."""
+
+
+def place_claim(food_id, receiver_id, quantity=1, claim_id=None, claim_date=None, db_path=DB_PATH):
+    """Reserve quantity of a listing for a receiver as a Pending claim. Returns the Claim_ID.
+
+    The quantity is added to the listing's Reserved with a conditional
+    UPDATE (RESERVE_SQL) in the same transaction as the claim insert, so
+    concurrent claims can never take more than the listing holds.
+    """
+    if quantity <= 0:
+        raise ClaimError(f"quantity must be positive, got {quantity}")
+    with transaction(db_path) as conn:
+        reserved = conn.execute(RESERVE_SQL, (quantity, food_id, quantity)).rowcount
+        if not reserved:
+            row = conn.execute("SELECT Quantity - Reserved FROM food_listings WHERE Food_ID = ?", (food_id,)).fetchone()
+            if row is None:
+                raise ClaimError(f"no food listing {food_id}")
+            raise ClaimError(f"food listing {food_id} has {row[0]} left, {quantity} asked for")
+        if claim_id is None:
+            claim_id = next_id(conn, "claims")
+        conn.execute(
+            "INSERT INTO claims (Claim_ID, Food_ID, Receiver_ID, Status, Timestamp, Claim_Date, Quantity) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (claim_id, food_id, receiver_id, PENDING, datetime.now().isoformat(sep=" ", timespec="seconds"),
+             str(claim_date or date.today()), quantity),
+        )
+        listings_version = bump_version(conn, "food_listings")
+        claims_version = bump_version(conn, "claims")
+    notify("food_listings", food_id, listings_version)
+    notify("claims", claim_id, claims_version)
+    return claim_id
+
+
+def _move(claim_id, status, db_path):
+    with transaction(db_path) as conn:
+        sources = [source for source, targets in TRANSITIONS.items() if status in targets]
+        # the status check and the write are one statement, so two racing moves cannot both apply
+        rows = conn.execute(
+            f"UPDATE claims SET Status = ? WHERE Claim_ID = ? AND Status IN ({', '.join('?' * len(sources))}) "
+            "RETURNING Food_ID, Quantity",
+            (status, claim_id, *sources),
+        ).fetchall()
+        if not rows:
+            current = conn.execute("SELECT Status FROM claims WHERE Claim_ID = ?", (claim_id,)).fetchone()
+            if current is None:
+                raise ClaimError(f"no claim {claim_id}")
+            raise ClaimError(f"claim {claim_id} is {current[0]}, cannot become {status}")
+        food_id, quantity = rows[0]
+        listings_version = None
+        if status == CANCELLED and quantity:
+            # give the reservation back; claims from before quantities were tracked hold none
+            conn.execute(RELEASE_SQL, (quantity, food_id))
+            listings_version = bump_version(conn, "food_listings")
+        claims_version = bump_version(conn, "claims")
+    if listings_version is not None:
+        notify("food_listings", food_id, listings_version)
+    notify("claims", claim_id, claims_version)
+
+
+def complete_claim(claim_id, db_path=DB_PATH):
+    """Pending -> Completed: the receiver collected the food; it stays reserved."""
+    _move(claim_id, COMPLETED, db_path)
+
+
+def cancel_claim(claim_id, db_path=DB_PATH):
+    """Pending -> Cancelled: the reserved quantity goes back to the listing."""
+    _move(claim_id, CANCELLED, db_path)
+
+
+def remove_claim(claim_id, db_path=DB_PATH):
+    """Delete a claim; a Pending one returns its reservation first. Returns whether it existed."""
+    with transaction(db_path) as conn:
+        rows = conn.execute(
+            "DELETE FROM claims WHERE Claim_ID = ? RETURNING Food_ID, Status, Quantity", (claim_id,)
+        ).fetchall()
+        if not rows:
+            return False
+        food_id, status, quantity = rows[0]
+        listings_version = None
+        if status == PENDING and quantity:
+            conn.execute(RELEASE_SQL, (quantity, food_id))
+            listings_version = bump_version(conn, "food_listings")
+        claims_version = bump_version(conn, "claims")
+    if listings_version is not None:
+        notify("food_listings", food_id, listings_version)
+    notify("claims", claim_id, claims_version)
+    return True
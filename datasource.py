@@ -0,0 +1,109 @@
+import os
+import sqlite3
+import sys
+import time
+
+import metrics
+from connection_pool import get_pool
+from result_cache import ResultCache
+from versions import get_versions
+
+
+# The one database every query module, the CRUD engine and the CSV sync use.
+DB_PATH = os.environ.get("FOOD_DB_PATH", "local_food.db")
+CSV_DIR = os.environ.get("FOOD_CSV_DIR", "C:/Local_food_Project/data")
+
+# table name -> (source CSV, primary key column)
+TABLE_SOURCES = {
+    "providers": (f"{CSV_DIR}/providers_data.csv", "Provider_ID"),
+    "receivers": (f"{CSV_DIR}/receivers_data.csv", "Receiver_ID"),
+    "food_listings": (f"{CSV_DIR}/food_listings_data.csv", "Food_ID"),
+    "claims": (f"{CSV_DIR}/claims_data.csv", "Claim_ID"),
+}
+
+RESULT_CACHE_SIZE = 1024
+
+_results = ResultCache(RESULT_CACHE_SIZE)
+_tables_read = {}   # sql -> tables whose writes change its result
+
+
+def pool():
+    return get_pool(DB_PATH)
+
+
+def data_version(conn):
+    return tuple(sorted(get_versions(conn).items()))
+
+
+def tables_read(conn, sql, params=()):
+    """The tables a statement reads, as recorded by SQLite while preparing it.
+
+    Aggregate tables stand for the table their triggers maintain them from.
+    """
+    tables = _tables_read.get(sql)
+    if tables is None:
+        # imported here: aggregates imports this module
+        from aggregates import AGGREGATES
+
+        seen = set()
+
+        def authorizer(action, table, column, database, trigger):
+            if action == sqlite3.SQLITE_READ and table:
+                seen.add(table)
+            return sqlite3.SQLITE_OK
+
+        conn.set_authorizer(authorizer)
+        try:
+            conn.execute(f"EXPLAIN {sql}", params).fetchall()
+        finally:
+            conn.set_authorizer(None)
+        tables = frozenset(
+            AGGREGATES[table][0] if table in AGGREGATES else table
+            for table in seen if not table.startswith(("sqlite_", "_"))
+        )
+        _tables_read[sql] = tables
+    return tables
+
+
+def _run(fetch, sql, params):
+    # sql and params identify the query function and its arguments
+    key = (fetch, sql, params)
+    with pool().connection() as conn:
+        versions = get_versions(conn)
+        hit, result = _results.get(key, versions)
+        metrics.record_cache("results", hit)
+        if hit:
+            return result
+        start = time.perf_counter()
+        cursor = conn.execute(sql, params)
+        result = cursor.fetchall() if fetch == "all" else cursor.fetchone()
+        if metrics.ENABLED:
+            # named for the dashboard question running it, else the calling query function
+            name = metrics.current_label.get() or sys._getframe(2).f_code.co_name
+            rows = len(result) if fetch == "all" else int(result is not None)
+            metrics.record_query(conn, name, sql, params, (time.perf_counter() - start) * 1e3, rows)
+        tables = tables_read(conn, sql, params)
+    metrics.record_cache_evictions("results", _results.put(key, tables, versions, result))
+    return result
+
+
+def fetchall(sql, params=()):
+    """Run a read query on the shared database; results are reused until a table it reads changes."""
+    return _run("all", sql, tuple(params))
+
+
+def fetchone(sql, params=()):
+    return _run("one", sql, tuple(params))
+
+
+def invalidate(table):
+    """Drop cached results that read table; storage calls this after each write."""
+    metrics.record_cache_invalidations("results", _results.invalidate(table))
+
+
+def cache_stats():
+    return _results.stats()
+
+
+def clear_cache():
+    _results.clear()
@@ -0,0 +1,110 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from datasource import data_version, pool
+
+
+MAX_WORKERS = 4
+# finished results kept per (name, args) for reuse and for display while refreshing
+LATEST_SIZE = 256
+
+
+class Job:
+    __slots__ = ("name", "args", "version", "future", "started", "finished", "waiters")
+
+    def __init__(self, name, args, version):
+        self.name = name
+        self.args = args
+        self.version = version
+        self.future = None
+        self.started = time.perf_counter()
+        self.finished = None
+        self.waiters = 0
+
+    def done(self):
+        return self.future.done()
+
+    def result(self, timeout=None):
+        return self.future.result(timeout)
+
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+
+class QueryExecutor:
+    """Runs dashboard queries on worker threads instead of the script thread.
+
+    Requests are keyed on (name, args, data version): a request identical to
+    one still running joins it instead of executing again, and one whose
+    result was already computed at the current version gets that result.
+    sqlite3 releases the GIL while a statement runs, so threads overlap the
+    work without pickling results across processes.
+    Results are shared between sessions and must be treated as read-only.
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix="query")
+        self._lock = threading.Lock()
+        self._running = {}   # (name, args, version) -> Job
+        self._latest = {}    # (name, args) -> last Job that succeeded
+        self.executed = 0
+        self.joined = 0
+
+    def submit(self, name, fn, *args):
+        with pool().connection() as conn:
+            version = data_version(conn)
+        key = (name, args, version)
+        with self._lock:
+            latest = self._latest.get((name, args))
+            if latest is not None and latest.version == version:
+                self.joined += 1
+                return latest
+            job = self._running.get(key)
+            if job is not None:
+                job.waiters += 1
+                self.joined += 1
+                return job
+            job = self._running[key] = Job(name, args, version)
+            self.executed += 1
+            job.future = self._pool.submit(self._run, job, fn)
+        return job
+
+    def _run(self, job, fn):
+        try:
+            result = fn(*job.args)
+        except BaseException:
+            job.finished = time.perf_counter()
+            with self._lock:
+                self._running.pop((job.name, job.args, job.version), None)
+            raise
+        job.finished = time.perf_counter()
+        # in one step, so no request between the two starts a second execution
+        with self._lock:
+            self._running.pop((job.name, job.args, job.version), None)
+            self._latest.pop((job.name, job.args), None)
+            if len(self._latest) >= LATEST_SIZE:
+                del self._latest[next(iter(self._latest))]
+            self._latest[(job.name, job.args)] = job
+        return result
+
+    def latest(self, name, args=()):
+        """The last successful Job for (name, args) at any version, or None."""
+        with self._lock:
+            return self._latest.get((name, args))
+
+    def running(self):
+        with self._lock:
+            return list(self._running.values())
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = QueryExecutor()
+        return _executor
@@ -0,0 +1,347 @@
+import argparse
+import csv
+import io
+import os
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlencode, urlparse
+
+import metrics
+from datasource import pool
+from query_registry import QUESTIONS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+
+# Rows fetched from the cursor and encoded per step; memory stays at about
+# one batch whatever the size of the export.
+BATCH_ROWS = 10_000
+GZIP_LEVEL = 6
+
+# format -> (MIME type, file extension)
+FORMATS = {
+    "csv": ("text/csv", ".csv"),
+    "csv.gz": ("application/gzip", ".csv.gz"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+}
+
+# Partner reports: name -> (sql, parameter names).
+REPORTS = {
+    "claims_history": (
+        """
+        SELECT c.Claim_ID, c.Status, c.Timestamp, c.Food_ID, f.Food_Name, f.Quantity, f.Food_Type,
+               f.Meal_Type, f.Location, p.Provider_ID, p.Name AS Provider_Name,
+               c.Receiver_ID, r.Name AS Receiver_Name, r.City AS Receiver_City
+        FROM claims c
+        LEFT JOIN food_listings f ON f.Food_ID = c.Food_ID
+        LEFT JOIN providers p ON p.Provider_ID = f.Provider_ID
+        LEFT JOIN receivers r ON r.Receiver_ID = c.Receiver_ID
+        ORDER BY c.Claim_ID
+        """,
+        (),
+    ),
+    # every listing of one provider, once per claim on it (unclaimed listings once)
+    "provider_report": (
+        """
+        SELECT f.Food_ID, f.Food_Name, f.Quantity, f.Expiry_Date, f.Location, f.Food_Type, f.Meal_Type,
+               c.Claim_ID, c.Status, c.Timestamp, c.Receiver_ID, r.Name AS Receiver_Name
+        FROM food_listings f
+        LEFT JOIN claims c ON c.Food_ID = f.Food_ID
+        LEFT JOIN receivers r ON r.Receiver_ID = c.Receiver_ID
+        WHERE f.Provider_ID = ?
+        ORDER BY f.Food_ID, c.Claim_ID
+        """,
+        ("provider_id",),
+    ),
+}
+
+# FOOD_EXPORT_PORT serves exports over HTTP (see serve). Off when unset or 0:
+# the endpoint has no authentication and hands out every table.
+EXPORT_PORT = int(os.environ.get("FOOD_EXPORT_PORT") or 0)
+
+
+def export_tables():
+    """User tables in the database (not the internal _ ones)."""
+    with pool().connection() as conn:
+        rows = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' "
+            "AND name NOT LIKE 'sqlite\\_%' ESCAPE '\\' AND name NOT LIKE '\\_%' ESCAPE '\\' ORDER BY name"
+        ).fetchall()
+    return [name for name, in rows]
+
+
+def source_statement(kind, name, **params):
+    """(sql, params) for a table, a report or a question; ValueError for an unknown one.
+
+    Questions answered by a statement (run.sql) stream it; questions without
+    one are computed in Python, return small results, and their rows are
+    exported as is.
+    """
+    if kind == "table":
+        if name not in export_tables():
+            raise ValueError(f"unknown table {name!r}")
+        return f'SELECT * FROM "{name}"', ()
+    if kind == "report":
+        if name not in REPORTS:
+            raise ValueError(f"unknown report {name!r}")
+        sql, names = REPORTS[name]
+    elif kind == "question":
+        if name not in QUESTIONS:
+            raise ValueError(f"unknown question {name!r}")
+        question = QUESTIONS[name]
+        sql, names = getattr(question.run, "sql", None), question.params
+    else:
+        raise ValueError(f"unknown source kind {kind!r}")
+    missing = [n for n in names if n not in params]
+    if missing:
+        raise ValueError(f"{name} needs {', '.join(missing)}")
+    return sql, tuple(params[n] for n in names)
+
+
+def batches(kind, name, batch_rows=BATCH_ROWS, **params):
+    """Yield the column names, then lists of up to batch_rows rows.
+
+    The rows come straight off one cursor on a pooled connection, which
+    holds its read snapshot until the export finishes or is closed: the
+    export is consistent, and a long one delays WAL checkpoints meanwhile.
+    """
+    sql, args = source_statement(kind, name, **params)
+    if sql is None:
+        question = QUESTIONS[name]
+        rows = question.run(**{n: params[n] for n in question.params})
+        yield list(question.columns)
+        for start in range(0, len(rows), batch_rows):
+            yield [tuple(row) for row in rows[start:start + batch_rows]]
+        return
+    with pool().connection() as conn:
+        cursor = conn.execute(sql, args)
+        try:
+            if kind == "question":
+                yield list(QUESTIONS[name].columns)
+            else:
+                yield [column[0] for column in cursor.description]
+            while True:
+                rows = cursor.fetchmany(batch_rows)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cursor.close()
+
+
+def csv_chunks(source):
+    """CSV bytes, header first, one chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for i, rows in enumerate(source):
+        if i == 0:
+            writer.writerow(rows)
+        else:
+            writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def gzip_chunks(chunks, level=GZIP_LEVEL):
+    """Gzip a stream of byte chunks (one gzip member, as gzip.open writes)."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class _Spool(io.RawIOBase):
+    # write-only sink the Parquet writer writes into and the generator drains;
+    # keeps the running offset the footer's row group positions refer to
+    def __init__(self):
+        super().__init__()
+        self._parts = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def _arrow_type(values):
+    inferred = pa.array(values).type
+    # a first batch of NULLs says nothing; text holds whatever comes later
+    return pa.string() if pa.types.is_null(inferred) else inferred
+
+
+def parquet_chunks(source):
+    """Parquet bytes, one row group per batch; needs pyarrow.
+
+    Column types are taken from the first batch.
+    """
+    if pq is None:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+    columns = next(source)
+    spool = _Spool()
+    writer = None
+    for rows in source:
+        values = [list(column) for column in zip(*rows)]
+        if writer is None:
+            schema = pa.schema([(name, _arrow_type(column)) for name, column in zip(columns, values)])
+            writer = pq.ParquetWriter(spool, schema)
+        writer.write_table(pa.Table.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(values, schema)], schema=schema))
+        yield spool.drain()
+    if writer is None:
+        # no rows: a valid empty file with text columns
+        writer = pq.ParquetWriter(spool, pa.schema([(name, pa.string()) for name in columns]))
+    writer.close()
+    yield spool.drain()
+
+
+def stream(kind, name, fmt="csv", batch_rows=BATCH_ROWS, **params):
+    """Yield the export of a table, report or question as bytes in fmt.
+
+    The source is checked before the first chunk, so a bad request raises
+    here rather than halfway through a download.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown format {fmt!r}")
+    if fmt == "parquet" and pq is None:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+    source_statement(kind, name, **params)
+    return _timed(kind, name, fmt, batches(kind, name, batch_rows, **params))
+
+
+def _timed(kind, name, fmt, source):
+    # recorded when the stream ends; metrics.timer's label cannot span yields
+    start = time.perf_counter()
+    counted = {"rows": 0}
+
+    def counting():
+        for i, rows in enumerate(source):
+            if i:
+                counted["rows"] += len(rows)
+            yield rows
+
+    if fmt == "parquet":
+        chunks = parquet_chunks(counting())
+    else:
+        chunks = csv_chunks(counting())
+        if fmt == "csv.gz":
+            chunks = gzip_chunks(chunks)
+    try:
+        yield from chunks
+    finally:
+        chunks.close()
+        source.close()
+        metrics.observe("export", f"{kind}:{name}.{fmt}", (time.perf_counter() - start) * 1e3, counted["rows"])
+
+
+def file_name(kind, name, fmt="csv", **params):
+    suffix = "".join(f"_{value}" for value in params.values())
+    return f"{name}{suffix}{FORMATS[fmt][1]}"
+
+
+def export_to_file(path, kind, name, fmt="csv", **params):
+    """Write an export to path chunk by chunk; returns the bytes written."""
+    size = 0
+    with open(path, "wb") as f:
+        for chunk in stream(kind, name, fmt, **params):
+            f.write(chunk)
+            size += len(chunk)
+    return size
+
+
+def export_url(base, kind, name, fmt="csv", **params):
+    """Link to an export on the endpoint serve() runs at base."""
+    return f"{base.rstrip('/')}/export?{urlencode({kind: name, 'format': fmt, **params})}"
+
+
+class _ExportHandler(BaseHTTPRequestHandler):
+    # chunked transfer needs HTTP/1.1
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        fmt = query.pop("format", "csv")
+        kinds = [kind for kind in ("table", "report", "question") if kind in query]
+        try:
+            if url.path != "/export" or len(kinds) != 1:
+                raise ValueError("expected /export?table=... (or report=, question=) and format=")
+            kind = kinds[0]
+            name = query.pop(kind)
+            chunks = stream(kind, name, fmt, **query)
+        except (ValueError, RuntimeError) as e:
+            body = f"{e}\n".encode("utf-8")
+            self.send_response(400)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", FORMATS[fmt][0])
+        self.send_header("Content-Disposition",
+                         f"attachment; filename*=UTF-8''{quote(file_name(kind, name, fmt, **query))}")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for chunk in chunks:
+                if chunk:
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # download cancelled; closing the stream frees the connection
+            self.close_connection = True
+        finally:
+            chunks.close()
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(port, host="127.0.0.1"):
+    """Serve exports on http://host:port/export from a daemon thread.
+
+    e.g. /export?table=claims&format=csv.gz or
+    /export?report=provider_report&provider_id=7&format=parquet
+    """
+    server = ThreadingHTTPServer((host, port), _ExportHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a table, report or question result.")
+    parser.add_argument("kind", choices=["table", "report", "question"])
+    parser.add_argument("name")
+    parser.add_argument("output")
+    parser.add_argument("--format", choices=list(FORMATS), default="csv")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=VALUE")
+    args = parser.parse_args()
+    params = dict(param.split("=", 1) for param in args.param)
+    size = export_to_file(args.output, args.kind, args.name, args.format, **params)
+    print(f"wrote {size} bytes to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
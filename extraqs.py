@@ -1,68 +1,61 @@
-import sqlite3
+from datasource import fetchall
 
 
-conn = sqlite3.connect('local_food.db', check_same_thread=False)
-cursor = conn.cursor()
-
 def get_total_providers():
-    cursor.execute("SELECT COUNT(*) AS total_providers FROM providers;")
-    return cursor.fetchall()
+    return fetchall("SELECT COUNT(*) AS total_providers FROM providers;")
 
 def get_total_receivers():
-    cursor.execute("SELECT COUNT(*) AS total_receivers FROM receivers;")
-    return cursor.fetchall()
+    return fetchall("SELECT COUNT(*) AS total_receivers FROM receivers;")
 
 def get_total_food_listings():
-    cursor.execute("SELECT COUNT(*) AS total_listings FROM food_listings;")
-    return cursor.fetchall()
+    return fetchall("SELECT COUNT(*) AS total_listings FROM food_listings;")
 
 def get_total_claims():
-    cursor.execute("SELECT COUNT(*) AS total_claims FROM claims;")
-    return cursor.fetchall()
+    return fetchall("SELECT COUNT(*) AS total_claims FROM claims;")
 
 def get_total_quantity_provided():
-    cursor.execute("SELECT SUM(Quantity) AS total_quantity FROM food_listings;")
-    return cursor.fetchall()
+    # current listings plus those the expiry sweeper archived
+    return fetchall("""
+        SELECT IFNULL((SELECT Quantity FROM agg_listings_total), 0)
+             + (SELECT IFNULL(SUM(Quantity), 0) FROM agg_archive_provider) AS total_quantity;
+    """)
+
+def get_total_quantity_wasted():
+    # listings the expiry sweeper archived unclaimed
+    return fetchall("SELECT IFNULL(SUM(Listings), 0) AS wasted_listings, IFNULL(SUM(Quantity), 0) AS wasted_quantity FROM waste_by_day;")
 
 def get_food_types_available():
-    cursor.execute("SELECT DISTINCT Food_Type FROM food_listings;")
-    return cursor.fetchall()
+    return fetchall("SELECT Food_Type FROM agg_listings_food_type;")
 
 def get_providers_by_location():
-    cursor.execute("""
-         SELECT City, COUNT(*) AS Provider_Count
-        FROM providers
-        GROUP BY City
+    return fetchall("""
+         SELECT City, Row_Count AS Provider_Count
+        FROM agg_providers_city
         ORDER BY Provider_Count DESC;
     """)
-    return cursor.fetchall()
 
 def get_receivers_by_location():
-    cursor.execute("""
-       SELECT City, COUNT(*) AS Receiver_Count
-        FROM receivers
-        GROUP BY City
+    return fetchall("""
+       SELECT City, Row_Count AS Receiver_Count
+        FROM agg_receivers_city
         ORDER BY Receiver_Count DESC;
     """)
-    return cursor.fetchall()
 
 def get_food_listings_by_provider():
-    cursor.execute("""
-        SELECT p.Name AS Provider_Name, COUNT(f.Food_ID) AS total_listings
+    return fetchall("""
+        SELECT p.Name AS Provider_Name, SUM(a.Row_Count) AS total_listings
         FROM providers p
-        JOIN food_listings f ON p.Provider_ID = f.Provider_ID
+        JOIN agg_listings_provider a ON p.Provider_ID = a.Provider_ID
         GROUP BY p.Name
         ORDER BY total_listings DESC;
     """)
-    return cursor.fetchall()
 
 def get_most_claimed_food_type():
-    cursor.execute("""
-        SELECT f.Food_Type, COUNT(c.Claim_ID) AS claim_count
-        FROM claims c 
-        JOIN food_listings f ON c.Food_ID = f.Food_ID
+    return fetchall("""
+        SELECT f.Food_Type, SUM(a.Row_Count) AS claim_count
+        FROM agg_claims_food a
+        JOIN food_listings f ON a.Food_ID = f.Food_ID
         GROUP BY f.Food_Type
         ORDER BY claim_count DESC
         LIMIT 1;
     """)
-    return cursor.fetchall()
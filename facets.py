@@ -0,0 +1,210 @@
+import bisect
+import json
+import threading
+
+import pandas as pd
+
+from connection_pool import get_pool
+from datasource import DB_PATH
+from storage import TABLE_KEYS
+from versions import get_versions
+
+
+# Columns offered as multi-select facets, and columns filtered by range.
+FACETS = {
+    "providers": ["City", "Type"],
+    "receivers": ["City"],
+    "food_listings": ["Location", "Food_Type", "Meal_Type"],
+}
+RANGES = {
+    "food_listings": {"Quantity": "number", "Expiry_Date": "date"},
+}
+
+
+def iso_date(value):
+    """'M/D/YYYY[ H:MM]' or ISO text -> 'YYYY-MM-DD'; None when unparseable."""
+    if value is None:
+        return None
+    if hasattr(value, "isoformat"):
+        return value.isoformat()[:10]
+    text = str(value).strip()
+    if len(text) >= 10 and text[4] == "-" and text[7] == "-":
+        return text[:10]
+    try:
+        month, day, year = text.split()[0].split("/")
+        return f"{int(year):04d}-{int(month):02d}-{int(day):02d}"
+    except ValueError:
+        return None
+
+
+def _number(value):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if number != number else number
+
+
+_CONVERT = {"number": _number, "date": iso_date}
+
+
+class FacetIndex:
+    """Distinct values, counts and value -> row id postings for the filter page.
+
+    Each table's index is built once per version stamp with a single scan of
+    the facet columns. Row writes made through storage.py are applied in
+    place (register apply_change with storage.add_listener); any other change,
+    such as a CSV sync, moves the version past the index and triggers a rebuild
+    on the next read.
+
+    Facet filters look up postings and intersect them smallest first, range
+    filters bisect a sorted (value, key) list, so a query costs the size of
+    the postings involved rather than a pass over the table.
+    """
+
+    def __init__(self, db_path=DB_PATH, facets=FACETS, ranges=RANGES):
+        self.db_path = db_path
+        self.facets = facets
+        self.ranges = ranges
+        self._tables = {}
+        self._lock = threading.RLock()
+        self.builds = 0
+
+    def _columns(self, table):
+        return self.facets.get(table, []) + list(self.ranges.get(table, {}))
+
+    def _row_values(self, table, row):
+        values = list(row[:len(self.facets.get(table, []))])
+        for (column, kind), value in zip(self.ranges.get(table, {}).items(), row[len(values):]):
+            values.append(_CONVERT[kind](value))
+        return tuple(values)
+
+    def _add(self, state, key, values):
+        state["rows"][key] = values
+        facet_count = len(state["postings"])
+        for column, value in zip(state["postings"], values):
+            if value is not None:
+                state["postings"][column].setdefault(value, set()).add(key)
+        for column, value in zip(state["sorted"], values[facet_count:]):
+            if value is not None:
+                bisect.insort(state["sorted"][column], (value, key))
+
+    def _remove(self, state, key):
+        values = state["rows"].pop(key, None)
+        if values is None:
+            return
+        facet_count = len(state["postings"])
+        for column, value in zip(state["postings"], values):
+            postings = state["postings"][column].get(value)
+            if postings is not None:
+                postings.discard(key)
+                if not postings:
+                    del state["postings"][column][value]
+        for column, value in zip(state["sorted"], values[facet_count:]):
+            if value is not None:
+                entries = state["sorted"][column]
+                position = bisect.bisect_left(entries, (value, key))
+                if position < len(entries) and entries[position] == (value, key):
+                    del entries[position]
+
+    def _select(self, conn, table, where="", params=()):
+        columns = ", ".join(f'"{c}"' for c in [TABLE_KEYS[table]] + self._columns(table))
+        return conn.execute(f'SELECT {columns} FROM "{table}" {where}', params)
+
+    def _build(self, conn, table, version):
+        state = {
+            "version": version,
+            "rows": {},
+            "postings": {column: {} for column in self.facets.get(table, [])},
+            "sorted": {column: [] for column in self.ranges.get(table, {})},
+        }
+        for row in self._select(conn, table):
+            values = self._row_values(table, row[1:])
+            state["rows"][row[0]] = values
+            for column, value in zip(state["postings"], values):
+                if value is not None:
+                    state["postings"][column].setdefault(value, set()).add(row[0])
+            for column, value in zip(state["sorted"], values[len(state["postings"]):]):
+                if value is not None:
+                    state["sorted"][column].append((value, row[0]))
+        for entries in state["sorted"].values():
+            entries.sort()
+        self._tables[table] = state
+        self.builds += 1
+        return state
+
+    def _state(self, table):
+        # callers hold self._lock, always taken before a pool connection
+        with get_pool(self.db_path).connection() as conn:
+            version = get_versions(conn).get(table, 0)
+            state = self._tables.get(table)
+            if state is None or state["version"] != version:
+                state = self._build(conn, table, version)
+            return state
+
+    def apply_change(self, table, key, version):
+        """storage.py listener: re-read one row and move its postings."""
+        with self._lock:
+            state = self._tables.get(table)
+            if state is None:
+                return
+            if state["version"] != version - 1:
+                # missed a write (another process, a sync); rebuild lazily
+                del self._tables[table]
+                return
+            with get_pool(self.db_path).connection() as conn:
+                row = self._select(conn, table, f'WHERE "{TABLE_KEYS[table]}" = ?', (key,)).fetchone()
+            self._remove(state, key)
+            if row is not None:
+                self._add(state, key, self._row_values(table, row[1:]))
+            state["version"] = version
+
+    def values(self, table, column):
+        """Sorted [(value, row count)] for one facet column, NULLs excluded."""
+        with self._lock:
+            postings = self._state(table)["postings"][column]
+            return sorted((value, len(keys)) for value, keys in postings.items())
+
+    def range_bounds(self, table, column):
+        with self._lock:
+            entries = self._state(table)["sorted"][column]
+            return (entries[0][0], entries[-1][0]) if entries else None
+
+    def filter(self, table, selections=None, ranges=None):
+        """Keys of rows matching every filter, in key order.
+
+        selections maps a facet column to the accepted values (empty or
+        missing: no constraint); ranges maps a range column to an inclusive
+        (low, high) pair where either end may be None.
+        """
+        with self._lock:
+            state = self._state(table)
+            candidates = []
+            for column, accepted in (selections or {}).items():
+                if not accepted:
+                    continue
+                postings = state["postings"][column]
+                candidates.append(set().union(*(postings.get(value, ()) for value in accepted)))
+            for column, (low, high) in (ranges or {}).items():
+                convert = _CONVERT[self.ranges[table][column]]
+                entries = state["sorted"][column]
+                start = 0 if low is None else bisect.bisect_left(entries, (convert(low),))
+                end = len(entries)
+                if high is not None:
+                    # (high, inf) sorts after every (high, key)
+                    end = bisect.bisect_right(entries, (convert(high), float("inf")))
+                candidates.append({key for _, key in entries[start:end]})
+            if not candidates:
+                return sorted(state["rows"])
+            candidates.sort(key=len)
+            return sorted(candidates[0].intersection(*candidates[1:]))
+
+    def rows(self, table, keys):
+        """The full rows for keys, fetched by primary key."""
+        pk = TABLE_KEYS[table]
+        with get_pool(self.db_path).connection() as conn:
+            return pd.read_sql(
+                f'SELECT * FROM "{table}" WHERE "{pk}" IN (SELECT value FROM json_each(?)) ORDER BY "{pk}"',
+                conn,
+                params=(json.dumps(list(keys)),),
+            )
@@ -0,0 +1,178 @@
+import heapq
+import itertools
+import threading
+from datetime import date
+
+from connection_pool import get_pool
+from datasource import DB_PATH
+from facets import iso_date
+from versions import get_versions
+
+
+# A bucket's heap is rebuilt once this many of its entries are stale and they
+# make up at least half of it.
+COMPACT_MIN_STALE = 64
+
+
+class MatchIndex:
+    """Open food listings bucketed by (Location, Food_Type, Meal_Type), each
+    bucket a heap ordered by expiry date, for receiver matching.
+
+    A listing is open while it has quantity left (Quantity - Reserved, see
+    claims.py) and a parseable Expiry_Date. Heap entries are never edited
+    and only open listings are pushed: a listing that closes or changes
+    leaves a stale entry behind that queries skip and compaction drops.
+
+    Writes made through storage.py are applied in place (register
+    apply_change with storage.add_listener); a version stamp the index did
+    not expect on food_listings rebuilds it on the next query.
+    """
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._version = None
+        self.builds = 0
+
+    def _reset(self):
+        self._listings = {}     # Food_ID -> (bucket key, expiry, quantity)
+        self._buckets = {}      # Location -> {(Food_Type, Meal_Type): heap of (expiry, Food_ID)}
+        self._stale = {}        # bucket key -> stale entries in its heap
+
+    def _is_open(self, food_id):
+        listing = self._listings.get(food_id)
+        return listing is not None and listing[2] > 0
+
+    def _heap(self, key):
+        return self._buckets.setdefault(key[0], {}).setdefault(key[1:], [])
+
+    def _valid(self, key, entry):
+        listing = self._listings.get(entry[1])
+        return listing is not None and listing[:2] == (key, entry[0]) and self._is_open(entry[1])
+
+    def _changing(self, food_id, change):
+        # only open listings are in the heaps: push on opening or moving, and
+        # count the entry left behind on closing or moving as stale
+        before = self._listings.get(food_id) if self._is_open(food_id) else None
+        change()
+        after = self._listings.get(food_id) if self._is_open(food_id) else None
+        if (before and before[:2]) == (after and after[:2]):
+            return
+        if before:
+            self._mark_stale(before[0])
+        if after:
+            heapq.heappush(self._heap(after[0]), (after[1], food_id))
+
+    def _mark_stale(self, key):
+        self._stale[key] = self._stale.get(key, 0) + 1
+        heap = self._heap(key)
+        if self._stale[key] >= COMPACT_MIN_STALE and self._stale[key] * 2 >= len(heap):
+            # a set drops duplicates left by a listing closing and reopening; sorted is a heap
+            heap[:] = sorted({entry for entry in heap if self._valid(key, entry)})
+            self._stale[key] = 0
+
+    def _put_listing(self, food_id, row):
+        # row: Location, Food_Type, Meal_Type, Expiry_Date, quantity left; None when deleted
+        def change():
+            self._listings.pop(food_id, None)
+            expiry = iso_date(row[3]) if row is not None else None
+            if expiry is None:
+                return
+            try:
+                quantity = float(row[4])
+            except (TypeError, ValueError):
+                quantity = 0
+            self._listings[food_id] = (tuple(row[:3]), expiry, quantity)
+        self._changing(food_id, change)
+
+    def _listing_sql(self, where=""):
+        return (f"SELECT Food_ID, Location, Food_Type, Meal_Type, Expiry_Date, Quantity - Reserved "
+                f"FROM food_listings {where}")
+
+    def _build(self, conn, version):
+        self._reset()
+        for row in conn.execute(self._listing_sql()):
+            self._put_listing(row[0], row[1:])
+        self._stale.clear()
+        self._version = version
+        self.builds += 1
+
+    def _current(self):
+        # callers hold self._lock, always taken before a pool connection
+        with get_pool(self.db_path).connection() as conn:
+            version = get_versions(conn).get("food_listings", 0)
+            if version != self._version:
+                self._build(conn, version)
+
+    def refresh(self):
+        """Bring the index up to date now rather than on the next query."""
+        with self._lock:
+            self._current()
+
+    def apply_change(self, table, key, version):
+        """storage.py listener: re-read one listing. Claims change a listing's
+        Reserved, so they arrive as listing writes."""
+        if table != "food_listings":
+            return
+        with self._lock:
+            if self._version is None:
+                return
+            if self._version != version - 1:
+                # missed a write (another process, a sync); rebuild lazily
+                self._version = None
+                return
+            with get_pool(self.db_path).connection() as conn:
+                row = conn.execute(self._listing_sql("WHERE Food_ID = ?"), (key,)).fetchone()
+                self._put_listing(key, row[1:] if row else None)
+            self._version = version
+
+    def top_k(self, location, food_types=None, meal_types=None, k=10, as_of=None):
+        """[(Expiry_Date, Food_ID)] of the k soonest-expiring open listings at
+        location that have not expired before as_of (default: today).
+
+        food_types / meal_types restrict the buckets searched; None accepts
+        any. Heaps are walked without popping, from the roots down, so a
+        query touches about k entries per bucket plus the expired and stale
+        ones it has to step over.
+        """
+        cutoff = (as_of or date.today()).isoformat()
+        with self._lock:
+            self._current()
+            frontier = []
+            # the counter breaks ties before comparison reaches the keys
+            order = itertools.count()
+            for (food_type, meal_type), heap in self._buckets.get(location, {}).items():
+                if food_types is not None and food_type not in food_types:
+                    continue
+                if meal_types is not None and meal_type not in meal_types:
+                    continue
+                key = (location, food_type, meal_type)
+                while heap and not self._valid(key, heap[0]):
+                    heapq.heappop(heap)
+                    self._stale[key] = max(self._stale.get(key, 0) - 1, 0)
+                if heap:
+                    frontier.append((heap[0], next(order), 0, key, heap))
+            heapq.heapify(frontier)
+
+            matches = []
+            seen = set()
+            while frontier and len(matches) < k:
+                entry, _, position, key, heap = heapq.heappop(frontier)
+                for child in (2 * position + 1, 2 * position + 2):
+                    if child < len(heap):
+                        heapq.heappush(frontier, (heap[child], next(order), child, key, heap))
+                expiry, food_id = entry
+                if expiry < cutoff or food_id in seen:
+                    continue
+                if self._valid(key, entry):
+                    seen.add(food_id)
+                    matches.append(entry)
+            return matches
+
+    def match_receiver(self, receiver_id, food_types=None, meal_types=None, k=10, as_of=None):
+        """top_k for the receiver's city; [] for an unknown receiver."""
+        with get_pool(self.db_path).connection() as conn:
+            row = conn.execute("SELECT City FROM receivers WHERE Receiver_ID = ?", (receiver_id,)).fetchone()
+        if row is None:
+            return []
+        return self.top_k(row[0], food_types, meal_types, k, as_of)
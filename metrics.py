@@ -0,0 +1,235 @@
+import bisect
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+
+# FOOD_METRICS=0 turns recording off; the hooks then cost one flag check.
+ENABLED = os.environ.get("FOOD_METRICS", "1") != "0"
+SLOW_QUERY_MS = float(os.environ.get("FOOD_SLOW_QUERY_MS", "100"))
+SLOW_LOG_SIZE = 200
+
+# Log-spaced histogram bounds, 10 us to ~100 s in steps of x1.25.
+BUCKETS_MS = [0.01 * 1.25 ** i for i in range(73)]
+
+_lock = threading.Lock()
+_histograms = {}    # (kind, name) -> Histogram
+_plans = {}         # (name, sql) -> query plan rows
+_caches = {}        # cache name -> [hits, misses, evictions, invalidations]
+_slow = deque(maxlen=SLOW_LOG_SIZE)
+
+# the operation (dashboard question, page) the current queries run for
+current_label = ContextVar("current_label", default=None)
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "total_ms", "max_ms", "rows")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+
+    def add(self, ms, rows):
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+        if rows:
+            self.rows += rows
+
+    def quantile(self, q):
+        # upper bound of the bucket holding the q-th sample (at most 25% high)
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS_MS + [self.max_ms], self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+
+def observe(kind, name, ms, rows=None):
+    if not ENABLED:
+        return
+    with _lock:
+        histogram = _histograms.get((kind, name))
+        if histogram is None:
+            histogram = _histograms[(kind, name)] = Histogram()
+        histogram.add(ms, rows)
+
+
+@contextmanager
+def timer(kind, name):
+    """Time a block as (kind, name); queries inside are labelled with name.
+
+    Yields a dict whose "rows" the block may set to record rows returned.
+    """
+    token = current_label.set(name)
+    span = {"rows": None}
+    start = time.perf_counter()
+    try:
+        yield span
+    finally:
+        observe(kind, name, (time.perf_counter() - start) * 1e3, span["rows"])
+        current_label.reset(token)
+
+
+def record_cache(cache, hit):
+    if not ENABLED:
+        return
+    with _lock:
+        counts = _caches.setdefault(cache, [0, 0, 0, 0])
+        counts[0 if hit else 1] += 1
+
+
+def _count_cache(cache, position, count):
+    if not ENABLED or not count:
+        return
+    with _lock:
+        _caches.setdefault(cache, [0, 0, 0, 0])[position] += count
+
+
+def record_cache_evictions(cache, count=1):
+    _count_cache(cache, 2, count)
+
+
+def record_cache_invalidations(cache, count=1):
+    _count_cache(cache, 3, count)
+
+
+def record_query(conn, name, sql, params, ms, rows):
+    """Record one executed statement; its plan is captured once per distinct SQL."""
+    if not ENABLED:
+        return
+    observe("query", name, ms, rows)
+    key = (name, sql)
+    plan = _plans.get(key)
+    if plan is None:
+        plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+        with _lock:
+            _plans[key] = plan
+    if ms >= SLOW_QUERY_MS:
+        with _lock:
+            _slow.append({
+                "time": time.time(), "name": name, "ms": ms, "rows": rows,
+                "sql": " ".join(sql.split()), "params": [str(p) for p in params], "plan": plan,
+            })
+
+
+def summary():
+    """One row per (kind, name): count, p50/p95/p99/max latency and rows returned."""
+    with _lock:
+        items = list(_histograms.items())
+    rows = [{
+        "Kind": kind, "Name": name, "Count": h.count,
+        "p50_ms": h.quantile(0.50), "p95_ms": h.quantile(0.95), "p99_ms": h.quantile(0.99),
+        "Max_ms": h.max_ms, "Total_ms": h.total_ms, "Rows": h.rows,
+    } for (kind, name), h in items]
+    columns = ["Kind", "Name", "Count", "p50_ms", "p95_ms", "p99_ms", "Max_ms", "Total_ms", "Rows"]
+    return pd.DataFrame(rows, columns=columns).sort_values("Total_ms", ascending=False, ignore_index=True)
+
+
+def cache_rates():
+    with _lock:
+        items = [(cache, *counts) for cache, counts in _caches.items()]
+    rows = [{"Cache": cache, "Hits": hits, "Misses": misses,
+             "Hit_Rate": hits / (hits + misses) if hits + misses else 0.0,
+             "Evictions": evictions, "Invalidations": invalidations}
+            for cache, hits, misses, evictions, invalidations in items]
+    return pd.DataFrame(rows, columns=["Cache", "Hits", "Misses", "Hit_Rate", "Evictions", "Invalidations"])
+
+
+def slow_log():
+    with _lock:
+        return list(_slow)
+
+
+def plans():
+    with _lock:
+        return {f"{name}: {' '.join(sql.split())}": plan for (name, sql), plan in _plans.items()}
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _plans.clear()
+        _caches.clear()
+        _slow.clear()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def prometheus_text():
+    """All histograms and cache counters in the Prometheus text exposition format."""
+    with _lock:
+        histograms = [(kind, name, list(h.counts), h.count, h.total_ms) for (kind, name), h in _histograms.items()]
+        caches = [(cache, *counts) for cache, counts in _caches.items()]
+    lines = [
+        "# HELP food_duration_seconds Wall time of queries, dashboard questions and page renders.",
+        "# TYPE food_duration_seconds histogram",
+    ]
+    for kind, name, counts, count, total_ms in histograms:
+        labels = f'kind="{_escape(kind)}",name="{_escape(name)}"'
+        cumulative = 0
+        for bound, bucket in zip(BUCKETS_MS, counts):
+            cumulative += bucket
+            lines.append(f'food_duration_seconds_bucket{{{labels},le="{bound / 1e3:.6g}"}} {cumulative}')
+        lines.append(f'food_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+        lines.append(f"food_duration_seconds_sum{{{labels}}} {total_ms / 1e3:.6f}")
+        lines.append(f"food_duration_seconds_count{{{labels}}} {count}")
+    lines += ["# HELP food_cache_requests_total Cache lookups by result.",
+              "# TYPE food_cache_requests_total counter"]
+    for cache, hits, misses, _, _ in caches:
+        lines.append(f'food_cache_requests_total{{cache="{_escape(cache)}",result="hit"}} {hits}')
+        lines.append(f'food_cache_requests_total{{cache="{_escape(cache)}",result="miss"}} {misses}')
+    lines += ["# HELP food_cache_removals_total Cache entries removed, by reason.",
+              "# TYPE food_cache_removals_total counter"]
+    for cache, _, _, evictions, invalidations in caches:
+        lines.append(f'food_cache_removals_total{{cache="{_escape(cache)}",reason="eviction"}} {evictions}')
+        lines.append(f'food_cache_removals_total{{cache="{_escape(cache)}",reason="invalidation"}} {invalidations}')
+    return "\n".join(lines) + "\n"
+
+
+def export_jsonl(path):
+    """Append one JSON line with the summary, cache rates and slow log."""
+    record = {
+        "time": time.time(),
+        "summary": summary().to_dict(orient="records"),
+        "caches": cache_rates().to_dict(orient="records"),
+        "slow": slow_log(),
+    }
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(port, host="127.0.0.1"):
+    """Serve prometheus_text() on http://host:port/ from a daemon thread."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
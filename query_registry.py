@@ -0,0 +1,212 @@
+from collections import namedtuple
+
+import pandas as pd
+
+import metrics
+from database import (
+    get_provider_with_most_claims,
+    get_claim_status_distribution,
+    get_food_claims_trend,
+)
+from datasource import fetchall
+
+
+# run(**params) returns result rows only; the aggregation happens in SQLite.
+# Per-food claim counts (q8, q12) read the covering claims index directly:
+# (Food_ID, Status) barely compresses claims, so agg_claims_food is no faster.
+Question = namedtuple("Question", "text run columns params")
+
+
+def _sql(sql):
+    def run(**params):
+        return fetchall(sql, tuple(params.values()))
+    # export streams the statement itself rather than the cached result
+    run.sql = sql
+    return run
+
+
+# the distinct provider cities; small, and cached until providers change
+PROVIDER_CITIES_SQL = "SELECT City FROM agg_providers_city WHERE City IS NOT NULL"
+
+
+def same_city(names, city):
+    """The names equal to city ignoring case, as str.lower() compares them.
+
+    SQLite's NOCASE folds ASCII letters only: it would not match "ÉVORA"
+    with "Évora".
+    """
+    folded = city.lower()
+    return [name for name in names if name.lower() == folded]
+
+
+def provider_contacts(city):
+    cities = same_city([name for name, in fetchall(PROVIDER_CITIES_SQL)], city)
+    if not cities:
+        return []
+    marks = ", ".join("?" * len(cities))
+    return fetchall(f"SELECT Name, Contact FROM providers WHERE City IN ({marks})", tuple(cities))
+
+
+QUESTIONS = {
+    "q1": Question(
+        "1. How many food providers and receivers are there in each city?",
+        _sql("""
+            SELECT City, SUM(Providers) AS Providers, SUM(Receivers) AS Receivers
+            FROM (
+                SELECT City, Row_Count AS Providers, 0 AS Receivers FROM agg_providers_city
+                UNION ALL
+                SELECT City, 0, Row_Count FROM agg_receivers_city
+            )
+            WHERE City IS NOT NULL
+            GROUP BY City
+            ORDER BY Providers DESC, Receivers DESC
+        """),
+        ["City", "Providers", "Receivers"],
+        (),
+    ),
+    "q2": Question(
+        "2. Which type of food provider contributes the most?",
+        _sql("""
+            SELECT Type, Row_Count FROM agg_providers_type
+            WHERE Type IS NOT NULL
+            ORDER BY Row_Count DESC
+        """),
+        ["Provider Type", "Count"],
+        (),
+    ),
+    "q3": Question(
+        "3. Contact information of food providers in a specific city",
+        provider_contacts,
+        ["Name", "Contact"],
+        ("city",),
+    ),
+    "q4": Question(
+        "4. Which receivers have claimed the most food?",
+        _sql("""
+            SELECT Receiver_ID, Row_Count FROM agg_claims_receiver
+            WHERE Receiver_ID IS NOT NULL
+            ORDER BY Row_Count DESC
+        """),
+        ["Receiver_ID", "Claim_Count"],
+        (),
+    ),
+    "q5": Question(
+        "5. Total quantity of food available from all providers",
+        _sql("SELECT Quantity FROM agg_listings_total"),
+        ["Total Quantity"],
+        (),
+    ),
+    "q6": Question(
+        "6. City with the highest number of food listings",
+        _sql("""
+            SELECT p.City, SUM(a.Row_Count) AS Listings
+            FROM agg_listings_provider a
+            JOIN providers p ON p.Provider_ID = a.Provider_ID
+            WHERE p.City IS NOT NULL
+            GROUP BY p.City
+            ORDER BY Listings DESC
+        """),
+        ["City", "Total Listings"],
+        (),
+    ),
+    "q7": Question(
+        "7. Most commonly available food types",
+        _sql("""
+            SELECT Food_Type, Row_Count FROM agg_listings_food_type
+            WHERE Food_Type IS NOT NULL
+            ORDER BY Row_Count DESC
+        """),
+        ["Food Type", "Count"],
+        (),
+    ),
+    "q8": Question(
+        "8. How many food claims have been made for each food item?",
+        _sql("""
+            SELECT Food_ID, COUNT(*) AS Claim_Count FROM claims
+            WHERE Food_ID IS NOT NULL
+            GROUP BY Food_ID
+            ORDER BY Claim_Count DESC
+        """),
+        ["Food_ID", "Claim_Count"],
+        (),
+    ),
+    "q9": Question(
+        "9. Which provider has had the highest number of successful claims?",
+        get_provider_with_most_claims,
+        ["Provider_Name", "Successful_Claims"],
+        (),
+    ),
+    "q10": Question(
+        "10. What percentage of food claims are completed vs. pending vs. canceled?",
+        get_claim_status_distribution,
+        ["Claim_Status", "Count"],
+        (),
+    ),
+    "q11": Question(
+        "11. What is the average quantity of food claimed per receiver?",
+        _sql("""
+            SELECT c.Receiver_ID, AVG(f.Quantity)
+            FROM claims c
+            JOIN food_listings f ON c.Food_ID = f.Food_ID
+            GROUP BY c.Receiver_ID
+        """),
+        ["Receiver ID", "Avg Quantity Claimed"],
+        (),
+    ),
+    "q12": Question(
+        "12. Which meal type is claimed the most?",
+        _sql("""
+            SELECT f.Meal_Type, COUNT(*) AS Claims
+            FROM claims c
+            JOIN food_listings f ON c.Food_ID = f.Food_ID
+            WHERE f.Meal_Type IS NOT NULL
+            GROUP BY f.Meal_Type
+            ORDER BY Claims DESC
+        """),
+        ["Meal Type", "Count"],
+        (),
+    ),
+    "q13": Question(
+        "13. Total quantity of food donated by each provider",
+        _sql("""
+            SELECT Provider_ID, SUM(Quantity)
+            FROM (
+                SELECT Provider_ID, Quantity FROM agg_listings_provider
+                UNION ALL
+                SELECT Provider_ID, Quantity FROM agg_archive_provider
+            )
+            WHERE Provider_ID IS NOT NULL
+            GROUP BY Provider_ID
+            ORDER BY Provider_ID
+        """),
+        ["Provider ID", "Total Quantity Donated"],
+        (),
+    ),
+    "q14": Question(
+        "14. Trend of food claims over time",
+        get_food_claims_trend,
+        ["Claim_Date", "Total_Claims"],
+        (),
+    ),
+    "q15": Question(
+        "15. City with the highest food demand based on claims",
+        _sql("""
+            SELECT r.City, SUM(a.Row_Count) AS Claims
+            FROM agg_claims_receiver a
+            JOIN receivers r ON a.Receiver_ID = r.Receiver_ID
+            WHERE r.City IS NOT NULL
+            GROUP BY r.City
+            ORDER BY Claims DESC
+        """),
+        ["City", "Claim Count"],
+        (),
+    ),
+}
+
+
+def run_question(qid, **params):
+    question = QUESTIONS[qid]
+    with metrics.timer("question", qid) as span:
+        rows = question.run(**params)
+        span["rows"] = len(rows)
+    return pd.DataFrame(rows, columns=question.columns)
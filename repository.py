@@ -0,0 +1,93 @@
+import threading
+
+import pandas as pd
+
+import metrics
+from connection_pool import get_pool
+from datasource import DB_PATH
+from snapshot import read_snapshot
+from table_types import to_typed
+from versions import database_id, get_versions
+
+
+TABLES = ("providers", "receivers", "food_listings", "claims")
+
+
+class TableRepository:
+    """One parsed copy of each table, shared by every session in the process.
+
+    A cached frame is reused until the table's version stamp in
+    _table_versions moves, or the file is another database (versions.database_id),
+    so there is no TTL; writers bump the stamp.
+    A miss is served from the column snapshot when one exists for that
+    version, otherwise from SQLite, and held in the typed layout of
+    table_types.py (categories, int32 keys, datetimes).
+    Frames handed out are shared and must be treated as read-only.
+    """
+
+    def __init__(self, db_path=DB_PATH, tables=TABLES):
+        self.db_path = db_path
+        self.tables = tables
+        self._frames = {}
+        self._locks = {table: threading.Lock() for table in tables}
+        self.loads = 0
+        self.hits = 0
+
+    def current_versions(self):
+        """(database id, {table: version})."""
+        with get_pool(self.db_path).connection() as conn:
+            return database_id(conn), get_versions(conn)
+
+    def get(self, table, versions=None):
+        if versions is None:
+            versions = self.current_versions()
+        database, stamps = versions
+        version = (database, stamps.get(table, 0))
+
+        cached = self._frames.get(table)
+        if cached is not None and cached[0] == version:
+            self.hits += 1
+            metrics.record_cache("repository", True)
+            return cached[1]
+
+        # one loader per table; concurrent sessions wait for it and reuse the result
+        with self._locks[table]:
+            cached = self._frames.get(table)
+            if cached is not None and cached[0] == version:
+                self.hits += 1
+                metrics.record_cache("repository", True)
+                return cached[1]
+            df = read_snapshot(table, database, version[1], self.db_path)
+            if df is None:
+                with get_pool(self.db_path).connection() as conn:
+                    df = pd.read_sql(f'SELECT * FROM "{table}"', conn)
+            df = to_typed(table, df)
+            self._frames[table] = (version, df)
+            self.loads += 1
+            metrics.record_cache("repository", False)
+            return df
+
+    def get_all(self):
+        versions = self.current_versions()
+        return tuple(self.get(table, versions) for table in self.tables)
+
+    def invalidate(self, table=None):
+        if table is None:
+            self._frames.clear()
+        else:
+            self._frames.pop(table, None)
+
+    def memory_usage(self):
+        rows = []
+        for table in self.tables:
+            cached = self._frames.get(table)
+            if cached is None:
+                continue
+            (_, version), df = cached
+            rows.append({
+                "Table": table,
+                "Version": version,
+                "Rows": len(df),
+                "Bytes": int(df.memory_usage(index=True, deep=True).sum()),
+            })
+        return pd.DataFrame(rows, columns=["Table", "Version", "Rows", "Bytes"])
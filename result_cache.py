@@ -0,0 +1,85 @@
+import threading
+from collections import OrderedDict
+
+
+class ResultCache:
+    """Bounded LRU of query results, each valid while the tables it read are.
+
+    An entry records the version of every table its query read; a lookup
+    with newer versions for any of them is a miss, and a write to one table
+    (invalidate) drops only the entries that read it. Results are shared
+    between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # key -> (((table, version), ...), result)
+        self._by_table = {}             # table -> set of keys
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key, versions):
+        """(True, result) if key is cached and current under versions, else (False, None)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and all(versions.get(table, 0) == version for table, version in entry[0]):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, tables, versions, result):
+        """Store result for key, read from tables at versions. Returns the number evicted."""
+        stamp = tuple((table, versions.get(table, 0)) for table in sorted(tables))
+        evicted = 0
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (stamp, result)
+            for table in tables:
+                self._by_table.setdefault(table, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+                evicted += 1
+            self.evictions += evicted
+        return evicted
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            for table, _ in entry[0]:
+                keys = self._by_table.get(table)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._by_table[table]
+
+    def invalidate(self, table):
+        """Drop every entry that read table. Returns the number dropped."""
+        with self._lock:
+            keys = self._by_table.pop(table, set())
+            for key in keys:
+                self._discard(key)
+            self.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_table.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries), "max_entries": self.max_entries,
+                "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions, "invalidations": self.invalidations,
+            }
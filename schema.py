@@ -0,0 +1,227 @@
+import argparse
+import sqlite3
+
+from aggregates import create_aggregates, create_archive_rollups, create_claim_rollups
+from datasource import DB_PATH
+from search import create_search_index
+from sweeper import create_expiry_objects
+from versions import ensure_database_id
+
+
+TABLE_DDL = {
+    "providers": """
+        CREATE TABLE IF NOT EXISTS providers (
+            Provider_ID INTEGER PRIMARY KEY,
+            Name TEXT,
+            Type TEXT,
+            Address TEXT,
+            City TEXT,
+            Contact TEXT
+        )
+    """,
+    "receivers": """
+        CREATE TABLE IF NOT EXISTS receivers (
+            Receiver_ID INTEGER PRIMARY KEY,
+            Name TEXT,
+            Type TEXT,
+            City TEXT,
+            Contact TEXT,
+            Organization TEXT
+        )
+    """,
+    "food_listings": """
+        CREATE TABLE IF NOT EXISTS food_listings (
+            Food_ID INTEGER PRIMARY KEY,
+            Food_Name TEXT,
+            Quantity INTEGER,
+            Expiry_Date TEXT,
+            Provider_ID INTEGER,
+            Provider_Type TEXT,
+            Location TEXT,
+            Food_Type TEXT,
+            Meal_Type TEXT,
+            FOREIGN KEY (Provider_ID) REFERENCES providers (Provider_ID)
+        )
+    """,
+    "claims": """
+        CREATE TABLE IF NOT EXISTS claims (
+            Claim_ID INTEGER PRIMARY KEY,
+            Food_ID INTEGER,
+            Receiver_ID INTEGER,
+            Status TEXT,
+            Timestamp TEXT,
+            Claim_Date TEXT,
+            FOREIGN KEY (Food_ID) REFERENCES food_listings (Food_ID),
+            FOREIGN KEY (Receiver_ID) REFERENCES receivers (Receiver_ID)
+        )
+    """,
+}
+
+# Covering indexes for the dashboard joins and the per-city lookups.
+INDEXES = {
+    "ix_claims_food": "claims (Food_ID, Receiver_ID, Status)",
+    "ix_claims_receiver": "claims (Receiver_ID)",
+    "ix_claims_status": "claims (Status, Food_ID)",
+    "ix_food_listings_provider": "food_listings (Provider_ID, Quantity)",
+    "ix_food_listings_location": "food_listings (Location)",
+    "ix_food_listings_food_type": "food_listings (Food_Type)",
+    "ix_providers_city": "providers (City, Name, Contact)",
+    "ix_providers_type": "providers (Type)",
+    "ix_receivers_city": "receivers (City)",
+}
+
+
+def _has_primary_key(conn, table):
+    return any(row[5] for row in conn.execute(f'PRAGMA table_info("{table}")'))
+
+
+def _table_exists(conn, table):
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()
+    return row is not None
+
+
+def create_keyed_tables(conn):
+    """Create the tables with primary keys, rebuilding any created by to_sql.
+
+    Rows are copied in rowid order with INSERT OR REPLACE, so where the old
+    table held duplicate keys the last row wins (the same rule sync.py uses).
+    Extra columns picked up from the CSVs are carried over.
+    """
+    for table, ddl in TABLE_DDL.items():
+        if not _table_exists(conn, table):
+            conn.execute(ddl)
+            continue
+        if _has_primary_key(conn, table):
+            continue
+        old = f"_{table}_unkeyed"
+        conn.execute(f'ALTER TABLE "{table}" RENAME TO "{old}"')
+        conn.execute(ddl)
+        new_columns = {row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')}
+        for row in conn.execute(f'PRAGMA table_info("{old}")').fetchall():
+            if row[1] not in new_columns:
+                conn.execute(f'ALTER TABLE "{table}" ADD COLUMN "{row[1]}"')
+        columns = ", ".join(f'"{row[1]}"' for row in conn.execute(f'PRAGMA table_info("{old}")'))
+        conn.execute(
+            f'INSERT OR REPLACE INTO "{table}" ({columns}) SELECT {columns} FROM "{old}" ORDER BY rowid'
+        )
+        conn.execute(f'DROP TABLE "{old}"')
+
+
+def create_indexes(conn):
+    for name, target in INDEXES.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+
+
+def add_claim_quantity(conn):
+    # quantity reserved by a claim (claims.place_claim); NULL for claims placed before
+    if "Quantity" not in {row[1] for row in conn.execute('PRAGMA table_info("claims")')}:
+        conn.execute('ALTER TABLE claims ADD COLUMN Quantity INTEGER')
+
+
+def add_listing_reserved(conn):
+    """Keep what was donated in food_listings.Quantity and what claims hold in Reserved.
+
+    claims.place_claim used to take a claim's quantity off Quantity; the
+    Pending and Completed claims' quantities are added back and become
+    Reserved.
+    """
+    if "Reserved" not in {row[1] for row in conn.execute('PRAGMA table_info("food_listings")')}:
+        conn.execute("ALTER TABLE food_listings ADD COLUMN Reserved INTEGER NOT NULL DEFAULT 0")
+    conn.execute("""
+        WITH held AS (
+            SELECT Food_ID, SUM(Quantity) AS Quantity FROM claims
+            WHERE Status IN ('Pending', 'Completed') AND Quantity IS NOT NULL
+            GROUP BY Food_ID
+        )
+        UPDATE food_listings SET Quantity = food_listings.Quantity + held.Quantity, Reserved = held.Quantity
+        FROM held WHERE food_listings.Food_ID = held.Food_ID
+    """)
+
+
+# (version, migration); append only, never edit a released step
+MIGRATIONS = [
+    (1, create_keyed_tables),
+    (2, create_indexes),
+    (3, create_aggregates),
+    (4, create_claim_rollups),
+    (5, create_expiry_objects),
+    (6, add_claim_quantity),
+    (7, create_search_index),
+    (8, ensure_database_id),
+    (9, add_listing_reserved),
+    (10, create_archive_rollups),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """Apply pending migrations, each in its own transaction. Returns the versions applied."""
+    applied = []
+    for version, step in MIGRATIONS:
+        if version <= schema_version(conn):
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            step(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        applied.append(version)
+    if applied:
+        conn.execute("ANALYZE")
+    return applied
+
+
+# Plan checks (tests/test_query_plans.py): a plain "SCAN <table>" (no index)
+# nested inside another loop is a regression; so is any plain scan in a
+# point lookup. Aggregates over every row may still scan their outer table.
+
+
+def query_plan(conn, sql, params=()):
+    return [(node, parent, detail) for node, parent, _, detail
+            in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+def table_scans(plan, allow_outer=True):
+    # loops sharing a parent run nested in plan order; each UNION arm and
+    # subquery has its own parent, and its first loop is an outer one unless
+    # it is correlated (re-run for every row of the enclosing query)
+    details = {node: detail for node, _, detail in plan}
+    loops = {}
+    for node, parent, detail in plan:
+        if detail.startswith(("SCAN ", "SEARCH ")) and not detail.startswith("SCAN (subquery"):
+            loops.setdefault(parent, []).append(detail)
+    scans = []
+    for parent, steps in loops.items():
+        if allow_outer and not details.get(parent, "").startswith("CORRELATED "):
+            steps = steps[1:]
+        # an AUTOMATIC index is built from a full scan on every execution
+        scans += [step for step in steps
+                  if (step.startswith("SCAN ") and " USING " not in step) or "AUTOMATIC" in step]
+    return scans
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply schema migrations to the food database.")
+    parser.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db, isolation_level=None)
+    try:
+        applied = migrate(conn)
+        print(f"schema at version {schema_version(conn)} (applied: {applied or 'none'})")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+import difflib
+import re
+
+import pandas as pd
+
+import metrics
+from datasource import pool
+
+
+# Searchable text columns, and what a match in each is worth to a row's score.
+SEARCH_COLUMNS = {
+    "providers": {"Name": 10, "City": 5, "Address": 2, "Type": 1},
+    "food_listings": {"Food_Name": 10, "Location": 5, "Food_Type": 2, "Meal_Type": 1},
+}
+# Columns returned for each hit.
+RESULT_COLUMNS = {
+    "providers": ["Provider_ID", "Name", "Type", "Address", "City", "Contact"],
+    "food_listings": ["Food_ID", "Food_Name", "Quantity", "Expiry_Date", "Location", "Food_Type", "Meal_Type", "Provider_ID"],
+}
+# Row lookups by value need an index on every searchable column; schema.INDEXES covers the rest.
+SEARCH_INDEXES = {
+    "ix_providers_name": "providers (Name)",
+    "ix_providers_address": "providers (Address)",
+    "ix_food_listings_name": "food_listings (Food_Name)",
+    "ix_food_listings_meal_type": "food_listings (Meal_Type)",
+}
+
+TERM_CANDIDATES = 200   # dictionary values read per word and kind of match
+FUZZY_MIN = 0.6         # difflib ratio a value needs to count as a fuzzy match
+# close spellings are looked for only when a word matches fewer values than this
+# literally; ranking trigram hits for a common word costs tens of milliseconds
+FUZZY_BELOW = 20
+
+# how well a value matches a word, by where it contains it; fuzzy matches score their ratio (< 1)
+EXACT, PREFIX, WORD_PREFIX, SUBSTRING = 4, 3, 2, 1
+
+_WORDS = re.compile(r"\w+")
+
+
+def _count(table, column, row, sign, changed="1"):
+    source = f"'{table}.{column}'"
+    value = f'{row}"{column}"'
+    if sign == "+":
+        return (f"INSERT INTO _search_terms (Source, Value, Rows) SELECT {source}, {value}, 1 "
+                f"WHERE {value} IS NOT NULL AND {changed} "
+                f"ON CONFLICT (Source, Value) DO UPDATE SET Rows = Rows + 1;")
+    match = f"Source = {source} AND Value = {value} AND {changed}"
+    return (f"UPDATE _search_terms SET Rows = Rows - 1 WHERE {match};\n"
+            f"        DELETE FROM _search_terms WHERE {match} AND Rows <= 0;")
+
+
+def create_search_index(conn):
+    """Distinct-value dictionary of the searchable columns with an FTS5 trigram index over it.
+
+    _search_terms holds each (table.column, value) with the number of rows
+    carrying it, maintained by triggers like the aggregate tables; the
+    trigram index makes substring matching case-insensitive and indexed.
+    Listings repeat a few names and cities many times over, so words are
+    matched against the distinct values and rows fetched through the
+    column indexes, rather than indexing and ranking every row.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS _search_terms (
+            Term_ID INTEGER PRIMARY KEY,
+            Source TEXT NOT NULL,
+            Value TEXT NOT NULL,
+            Rows INTEGER NOT NULL,
+            UNIQUE (Source, Value)
+        )
+    """)
+    conn.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS _search_fts USING fts5("
+        "Value, content='_search_terms', content_rowid='Term_ID', tokenize='trigram')"
+    )
+    # only Rows changes in place; a value comes and goes with its row
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS tr_search_terms_insert AFTER INSERT ON _search_terms BEGIN
+        INSERT INTO _search_fts (rowid, Value) VALUES (NEW.Term_ID, NEW.Value);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS tr_search_terms_delete AFTER DELETE ON _search_terms BEGIN
+        INSERT INTO _search_fts (_search_fts, rowid, Value) VALUES ('delete', OLD.Term_ID, OLD.Value);
+        END
+    """)
+    for name, target in SEARCH_INDEXES.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+    for table, weights in SEARCH_COLUMNS.items():
+        columns = list(weights)
+        added = "\n        ".join(_count(table, column, "NEW.", "+") for column in columns)
+        removed = "\n        ".join(_count(table, column, "OLD.", "-") for column in columns)
+        changed = "\n        ".join(
+            _count(table, column, "OLD.", "-", f'OLD."{column}" IS NOT NEW."{column}"') + "\n        "
+            + _count(table, column, "NEW.", "+", f'OLD."{column}" IS NOT NEW."{column}"')
+            for column in columns
+        )
+        quoted = ", ".join(f'"{column}"' for column in columns)
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS tr_search_{table}_insert AFTER INSERT ON {table} BEGIN\n        {added}\n        END")
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS tr_search_{table}_delete AFTER DELETE ON {table} BEGIN\n        {removed}\n        END")
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS tr_search_{table}_update AFTER UPDATE OF {quoted} ON {table} BEGIN\n        {changed}\n        END")
+        rebuild_search_terms(conn, table)
+
+
+def rebuild_search_terms(conn, table):
+    """Recount a table's dictionary entries from scratch (after a bulk load)."""
+    conn.execute("DELETE FROM _search_terms WHERE Source LIKE ?", (f"{table}.%",))
+    for column in SEARCH_COLUMNS[table]:
+        conn.execute(
+            f'INSERT INTO _search_terms (Source, Value, Rows) SELECT ?, "{column}", COUNT(*) FROM {table} '
+            f'WHERE "{column}" IS NOT NULL GROUP BY "{column}"',
+            (f"{table}.{column}",),
+        )
+
+
+def _phrase(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _glob_escape(text):
+    return re.sub(r"([*?\[])", r"[\1]", text)
+
+
+def _kind(word, value):
+    text = str(value).lower()
+    if text == word:
+        return EXACT
+    if text.startswith(word):
+        return PREFIX
+    if any(part.startswith(word) for part in _WORDS.findall(text)):
+        return WORD_PREFIX
+    return SUBSTRING if word in text else 0
+
+
+def _similarity(word, value):
+    text = str(value).lower()
+    return max(difflib.SequenceMatcher(None, word, part).ratio() for part in [text] + _WORDS.findall(text))
+
+
+def _word_matches(conn, table, word, fuzzy, columns):
+    """{(column, value): (score, rows, literal)} for the dictionary values one word matches."""
+    sources = {f"{table}.{column}": column for column in columns}
+    marks = ", ".join("?" * len(sources))
+    lowered = word.lower()
+    # exact values first (any of the usual casings), so a long list of substring hits cannot crowd them out
+    variants = list(dict.fromkeys([word, lowered, word.title(), word.upper()]))
+    found = conn.execute(
+        f"SELECT Source, Value, Rows FROM _search_terms "
+        f"WHERE Source IN ({marks}) AND Value IN ({', '.join('?' * len(variants))})",
+        (*sources, *variants),
+    ).fetchall()
+    if len(word) >= 3:
+        found += conn.execute(
+            f"SELECT t.Source, t.Value, t.Rows FROM _search_fts JOIN _search_terms t ON t.Term_ID = _search_fts.rowid "
+            f"WHERE _search_fts MATCH ? AND t.Source IN ({marks}) LIMIT ?",
+            (_phrase(word), *sources, TERM_CANDIDATES),
+        ).fetchall()
+    else:
+        # too short for a trigram: prefix matches only, through the (Source, Value) index
+        found += conn.execute(
+            f"SELECT Source, Value, Rows FROM _search_terms WHERE Source IN ({marks}) "
+            f"AND ({' OR '.join(['Value GLOB ?'] * len(variants))}) LIMIT ?",
+            (*sources, *(_glob_escape(variant) + "*" for variant in variants), TERM_CANDIDATES),
+        ).fetchall()
+    matches = {}
+    for source, value, rows in found:
+        column = sources[source]
+        score = _kind(lowered, value) * columns[column]
+        if score:
+            matches[(column, value)] = (score, rows, True)
+    if fuzzy and len(lowered) >= 3 and len(matches) < FUZZY_BELOW:
+        trigrams = {lowered[i:i + 3] for i in range(len(lowered) - 2)}
+        # bm25 favours values sharing more, and rarer, trigrams with the word
+        candidates = conn.execute(
+            f"SELECT t.Source, t.Value, t.Rows FROM _search_fts JOIN _search_terms t ON t.Term_ID = _search_fts.rowid "
+            f"WHERE _search_fts MATCH ? AND t.Source IN ({marks}) ORDER BY _search_fts.rank LIMIT ?",
+            (" OR ".join(_phrase(trigram) for trigram in trigrams), *sources, TERM_CANDIDATES),
+        ).fetchall()
+        for source, value, rows in candidates:
+            key = (sources[source], value)
+            if key not in matches:
+                similarity = _similarity(lowered, value)
+                if similarity >= FUZZY_MIN:
+                    matches[key] = (similarity * columns[key[0]] / EXACT, rows, False)
+    return matches
+
+
+def _fetch(conn, table, matched, limit, rows, fetched_in):
+    """Add {key: (row, fetched_in)} to rows for rows matching a value of every word, up to limit."""
+    result_columns = RESULT_COLUMNS[table]
+    driver = min(range(len(matched)), key=lambda i: sum(match[1] for match in matched[i].values()))
+    conditions, params = [], []
+    for i, matches in enumerate(matched):
+        if i == driver:
+            continue
+        by_column = {}
+        for column, value in matches:
+            by_column.setdefault(column, []).append(value)
+        conditions.append("(" + " OR ".join(
+            f'"{column}" IN ({", ".join("?" * len(values))})' for column, values in by_column.items()
+        ) + ")")
+        params += [value for values in by_column.values() for value in values]
+    selected = ", ".join(f'"{column}"' for column in result_columns)
+    for (column, value), _ in sorted(matched[driver].items(), key=lambda item: -item[1][0]):
+        # rows found by an earlier pass can come back; ask for that many more
+        found = conn.execute(
+            f'SELECT {selected} FROM {table} WHERE "{column}" = ? {"".join(" AND " + c for c in conditions)} LIMIT ?',
+            (value, *params, limit + len(rows) + 1),
+        ).fetchall()
+        for row in found:
+            rows.setdefault(row[0], (row, fetched_in))
+        if len(rows) >= limit:
+            break
+
+
+def search(table, text, limit=20, fuzzy=True):
+    """Rows of table matching every word of text, best first, with a Score column.
+
+    A word matches a searchable column case-insensitively as the whole
+    value, a prefix, a word prefix or a substring, scored in that order and
+    weighted by column (SEARCH_COLUMNS); with fuzzy, values within
+    FUZZY_MIN similarity count too for words with fewer than FUZZY_BELOW
+    literal matches. Rows matching every word literally are fetched first
+    and rank above any row that needs a fuzzy match; the fuzzy pass runs
+    only when they fall short of limit. Each pass fetches rows value by
+    value for the word matching the fewest rows, best value first, and
+    filters them by the other words.
+    """
+    weights = SEARCH_COLUMNS[table]
+    result_columns = RESULT_COLUMNS[table]
+    words = text.split()
+    rows = {}
+    with metrics.timer("search", table) as span, pool().connection() as conn:
+        matched = [_word_matches(conn, table, word, fuzzy, weights) for word in words]
+        literal = [{key: match for key, match in matches.items() if match[2]} for matches in matched]
+        if literal and all(literal):
+            _fetch(conn, table, literal, limit, rows, 0)
+        if len(rows) < limit and matched != literal and all(matched):
+            _fetch(conn, table, matched, limit, rows, 1)
+        span["rows"] = len(rows)
+    df = pd.DataFrame([row for row, _ in rows.values()], columns=result_columns)
+    if df.empty:
+        return df.assign(Score=pd.Series(dtype=float))
+
+    def score(row):
+        # per word, the best of the row's values it matched
+        return sum(max((matches[(column, row[column])][0] for column in weights
+                        if (column, row[column]) in matches), default=0) for matches in matched)
+
+    df["Score"] = df.apply(score, axis=1)
+    df["_pass"] = [fetched_in for _, fetched_in in rows.values()]
+    df = df.sort_values(["_pass", "Score"], ascending=[True, False], kind="stable")
+    return df.drop(columns="_pass").head(limit).reset_index(drop=True)
+
+
+def suggest(table, column, text, limit=5, fuzzy=True):
+    """Values of one column resembling text, best first (e.g. city names for "did you mean")."""
+    weights = {column: 1}
+    with pool().connection() as conn:
+        matches = _word_matches(conn, table, text.strip(), fuzzy, weights) if text.strip() else {}
+    ranked = sorted(matches.items(), key=lambda item: (-item[1][0], -item[1][1]))
+    return [value for (_, value), _ in ranked[:limit]]
@@ -0,0 +1,151 @@
+import argparse
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from connection_pool import get_pool
+from datasource import DB_PATH
+from table_types import to_typed
+from versions import database_id, get_versions
+
+
+TABLES = ("providers", "receivers", "food_listings", "claims")
+
+
+def snapshot_dir(db_path=DB_PATH):
+    return f"{db_path}.snapshot"
+
+
+def _table_dir(db_path, table, database, version):
+    # version stamps restart in a new database at the same path; its id does not
+    return os.path.join(snapshot_dir(db_path), f"{table}-{database}-{version}")
+
+
+def write_snapshot(table, df, database, version, db_path=DB_PATH):
+    """Write df as a column store: one .npy per column plus meta.json.
+
+    Numeric, bool and datetime columns are saved as they are; nullable
+    integer columns as their values plus a .mask.npy; categorical columns as
+    their codes; other columns are dictionary encoded (int32 codes, -1 for
+    NULL, values in meta.json).
+    The directory is renamed into place once complete and older versions of
+    the table, of this database or any other, are removed. `database` is
+    versions.database_id. Returns False if a column cannot be encoded.
+    """
+    final = _table_dir(db_path, table, database, version)
+    if os.path.isdir(final):
+        return True
+    os.makedirs(snapshot_dir(db_path), exist_ok=True)
+    # a directory of its own per writer, also for threads of one process
+    tmp = tempfile.mkdtemp(prefix=f"{os.path.basename(final)}.tmp-", dir=snapshot_dir(db_path))
+    try:
+        columns = []
+        for position, name in enumerate(df.columns):
+            series = df[name]
+            path = os.path.join(tmp, f"{position}.npy")
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                np.save(path, series.cat.codes.to_numpy())
+                columns.append({"name": name, "kind": "categorical",
+                                "values": series.cat.categories.tolist()})
+            elif isinstance(series.array, pd.arrays.IntegerArray):
+                np.save(path, series.to_numpy(series.dtype.numpy_dtype, na_value=0))
+                np.save(os.path.join(tmp, f"{position}.mask.npy"), series.isna().to_numpy())
+                columns.append({"name": name, "kind": "masked"})
+            elif series.dtype.kind in "biufM":
+                np.save(path, series.to_numpy())
+                columns.append({"name": name, "kind": "array"})
+            else:
+                codes, values = pd.factorize(series, use_na_sentinel=True)
+                np.save(path, codes.astype(np.int32))
+                columns.append({"name": name, "kind": "dictionary", "values": values.tolist()})
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"table": table, "version": version, "rows": len(df), "columns": columns}, f)
+        os.replace(tmp, final)
+    except (TypeError, ValueError, OSError):
+        # e.g. a BLOB column; the table just keeps loading from SQLite
+        shutil.rmtree(tmp, ignore_errors=True)
+        return False
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    for entry in os.listdir(snapshot_dir(db_path)):
+        if entry.startswith(f"{table}-") and entry != os.path.basename(final) and ".tmp-" not in entry:
+            shutil.rmtree(os.path.join(snapshot_dir(db_path), entry), ignore_errors=True)
+    return True
+
+
+def has_snapshot(table, database, version, db_path=DB_PATH):
+    """Whether the table at `version` in this database has been snapshotted."""
+    return os.path.isfile(os.path.join(_table_dir(db_path, table, database, version), "meta.json"))
+
+
+def read_snapshot(table, database, version, db_path=DB_PATH):
+    """The table at exactly `version` from its snapshot, or None if there is none.
+
+    Numeric columns stay memory-mapped (the frame must be treated as
+    read-only, like every frame TableRepository hands out); dictionary
+    columns are decoded with one vectorized take.
+    """
+    if database is None:
+        return None
+    directory = _table_dir(db_path, table, database, version)
+    try:
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    data = {}
+    for position, column in enumerate(meta["columns"]):
+        array = np.load(os.path.join(directory, f"{position}.npy"), mmap_mode="r")
+        if column["kind"] == "masked":
+            mask = np.load(os.path.join(directory, f"{position}.mask.npy"), mmap_mode="r")
+            array = pd.arrays.IntegerArray(array, mask)
+        elif column["kind"] == "categorical":
+            array = pd.Categorical.from_codes(array, categories=column["values"])
+        elif column["kind"] == "dictionary":
+            # one extra slot so the -1 NULL code picks None
+            values = np.array(column["values"] + [None], dtype=object)
+            array = values[array]
+        data[column["name"]] = array
+    return pd.DataFrame(data, columns=[c["name"] for c in meta["columns"]], copy=False)
+
+
+def write_snapshots(db_path=DB_PATH, tables=TABLES):
+    """Snapshot every table at its current version. Returns {table: version written}.
+
+    Nothing is written for a database without an id (not migrated).
+    """
+    written = {}
+    with get_pool(db_path).connection() as conn:
+        # one read transaction, so each frame matches the version recorded with it
+        conn.execute("BEGIN")
+        try:
+            database = database_id(conn)
+            if database is None:
+                return written
+            versions = get_versions(conn)
+            frames = {table: to_typed(table, pd.read_sql(f'SELECT * FROM "{table}"', conn)) for table in tables}
+        finally:
+            conn.execute("COMMIT")
+    for table, df in frames.items():
+        if write_snapshot(table, df, database, versions.get(table, 0), db_path):
+            written[table] = versions.get(table, 0)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write memory-mappable column snapshots of the food tables.")
+    parser.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args()
+    with get_pool(args.db).connection() as conn:
+        database = database_id(conn)
+    for table, version in write_snapshots(args.db).items():
+        print(f"{table}: version {version} -> {_table_dir(args.db, table, database, version)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+import json
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from connection_pool import get_pool
+from datasource import DB_PATH, invalidate
+from versions import bump_version
+
+
+TABLE_KEYS = {
+    "providers": "Provider_ID",
+    "receivers": "Receiver_ID",
+    "food_listings": "Food_ID",
+    "claims": "Claim_ID",
+}
+
+# A table's archive (sweeper.py). Keys moved there are retired: next_id does
+# not hand them out again and CSV imports do not bring the rows back.
+ARCHIVES = {"food_listings": "food_listings_archive"}
+
+# A listing's donated Quantity may not drop below what claims hold
+# (claims.py); param: the new Quantity. NULL is allowed while nothing is held.
+QUANTITY_GUARD = '"Reserved" <= COALESCE(?, 0)'
+
+_indexed = set()
+_listeners = []
+_write_locks = {}
+_write_locks_lock = threading.Lock()
+
+
+def _write_lock(db_path):
+    with _write_locks_lock:
+        return _write_locks.setdefault(db_path, threading.Lock())
+
+
+def add_listener(callback):
+    """Call callback(table, key, version) after each committed row write."""
+    if callback not in _listeners:
+        _listeners.append(callback)
+
+
+def notify(table, key, version):
+    # cached query results that read the table go first, before any listener reads
+    invalidate(table)
+    for callback in _listeners:
+        callback(table, key, version)
+
+
+@contextmanager
+def transaction(db_path=DB_PATH):
+    """Write transaction holding the database write lock from the first statement.
+
+    BEGIN IMMEDIATE makes read-then-write sequences (next id, then insert)
+    atomic with respect to other writers, so concurrent CRUD calls cannot
+    lose each other's updates. Writers in this process queue on a lock
+    first: SQLite's busy handler backs off by sleeping (up to 100 ms a try),
+    which under contention idles the database between transactions.
+    """
+    with _write_lock(db_path), get_pool(db_path).connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+def ensure_key_index(conn, table):
+    key = (conn.execute("PRAGMA database_list").fetchone()[2], table)
+    if key in _indexed:
+        return
+    pk = TABLE_KEYS[table]
+    is_rowid_key = any(
+        row[1] == pk and row[5] for row in conn.execute(f'PRAGMA table_info("{table}")')
+    )
+    # tables created by schema.py are keyed already; legacy to_sql tables need an index
+    if not is_rowid_key:
+        conn.execute(f'CREATE INDEX IF NOT EXISTS "ix_{table}_{pk}" ON "{table}" ("{pk}")')
+    _indexed.add(key)
+
+
+def ensure_columns(conn, table, columns):
+    existing = {row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')}
+    for column in columns:
+        if column not in existing:
+            conn.execute(f'ALTER TABLE "{table}" ADD COLUMN "{column}"')
+
+
+def _value(value):
+    # date/datetime from st.date_input or a typed frame -> ISO string;
+    # numpy scalars -> python; NaT -> NULL
+    if value is pd.NaT:
+        return None
+    if isinstance(value, np.datetime64):
+        value = pd.Timestamp(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+def _archive(conn, table):
+    archive = ARCHIVES.get(table)
+    if archive is None:
+        return None
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (archive,)).fetchone()
+    return archive if row else None
+
+
+def archived_keys(conn, table, keys):
+    """The keys among `keys` that are in the table's archive."""
+    archive = _archive(conn, table)
+    if archive is None or not len(keys):
+        return set()
+    pk = TABLE_KEYS[table]
+    rows = conn.execute(
+        f'SELECT "{pk}" FROM "{archive}" WHERE "{pk}" IN (SELECT value FROM json_each(?))',
+        (json.dumps(pd.Series(keys).tolist()),),
+    )
+    return {row[0] for row in rows}
+
+
+def overdrawn(conn, quantities):
+    """The Food_IDs among (Food_ID, Quantity) pairs whose Reserved exceeds the new Quantity."""
+    if not len(quantities):
+        return set()
+    rows = conn.execute(
+        "SELECT f.Food_ID FROM json_each(?) AS e "
+        "JOIN food_listings AS f ON f.Food_ID = json_extract(e.value, '$[0]') "
+        "WHERE f.Reserved > COALESCE(json_extract(e.value, '$[1]'), 0)",
+        (json.dumps([[_value(k), _value(q)] for k, q in quantities]),),
+    )
+    return {row[0] for row in rows}
+
+
+def next_id(conn, table):
+    pk = TABLE_KEYS[table]
+    sql = f'SELECT MAX("{pk}") FROM "{table}"'
+    archive = _archive(conn, table)
+    if archive is not None:
+        sql = f'SELECT MAX(id) FROM (SELECT MAX("{pk}") AS id FROM "{table}" UNION ALL SELECT MAX("{pk}") FROM "{archive}")'
+    row = conn.execute(sql).fetchone()
+    return int(row[0]) + 1 if row[0] is not None else 1
+
+
+def insert_row(table, row, db_path=DB_PATH):
+    """Insert one row; a missing or None primary key is allocated as MAX + 1."""
+    pk = TABLE_KEYS[table]
+    with transaction(db_path) as conn:
+        ensure_key_index(conn, table)
+        row = {column: _value(value) for column, value in row.items()}
+        if row.get(pk) is None:
+            row[pk] = next_id(conn, table)
+        ensure_columns(conn, table, row)
+        columns = ", ".join(f'"{c}"' for c in row)
+        placeholders = ", ".join("?" for _ in row)
+        conn.execute(
+            f'INSERT INTO "{table}" ({columns}) VALUES ({placeholders})', tuple(row.values())
+        )
+        version = bump_version(conn, table)
+    notify(table, row[pk], version)
+    return row[pk]
+
+
+def update_row(table, key, values, db_path=DB_PATH):
+    """Update one row's columns; a listing's Quantity below its Reserved raises ClaimError."""
+    pk = TABLE_KEYS[table]
+    with transaction(db_path) as conn:
+        ensure_key_index(conn, table)
+        ensure_columns(conn, table, values)
+        assignments = ", ".join(f'"{c}" = ?' for c in values)
+        params = tuple(_value(v) for v in values.values()) + (_value(key),)
+        guard = ""
+        if table == "food_listings" and "Quantity" in values:
+            guard = f" AND {QUANTITY_GUARD}"
+            params += (_value(values["Quantity"]),)
+        count = conn.execute(
+            f'UPDATE "{table}" SET {assignments} WHERE "{pk}" = ?{guard}', params
+        ).rowcount
+        if not count and guard:
+            row = conn.execute('SELECT Reserved FROM food_listings WHERE Food_ID = ?', (_value(key),)).fetchone()
+            if row is not None:
+                # claims imports this module
+                from claims import ClaimError
+                raise ClaimError(f"food listing {key} has {row[0]} reserved, cannot set Quantity to {values['Quantity']}")
+        if count:
+            version = bump_version(conn, table)
+    if count:
+        notify(table, _value(key), version)
+    return count
+
+
+def delete_row(table, key, db_path=DB_PATH):
+    pk = TABLE_KEYS[table]
+    with transaction(db_path) as conn:
+        ensure_key_index(conn, table)
+        count = conn.execute(f'DELETE FROM "{table}" WHERE "{pk}" = ?', (_value(key),)).rowcount
+        if count:
+            version = bump_version(conn, table)
+    if count:
+        notify(table, _value(key), version)
+    return count
+
+
+def read_table(table, db_path=DB_PATH):
+    with get_pool(db_path).connection() as conn:
+        return pd.read_sql(f'SELECT * FROM "{table}"', conn)
@@ -0,0 +1,202 @@
+import argparse
+import threading
+from datetime import date
+
+from aggregates import claim_day_sql
+from connection_pool import get_pool
+from datasource import DB_PATH
+from storage import ensure_columns, transaction
+from versions import bump_version
+
+
+BATCH_SIZE = 1_000
+# claims that keep an expired listing out of the archive: its food was taken
+# (Completed) or may still be (Pending, looked at again next tick)
+KEPT_STATUSES = ("Completed",)
+WAITING_STATUSES = ("Pending",)
+
+# claim_day_sql parses any of the shipped date formats, not only claim timestamps
+_EXPIRY_DAY = claim_day_sql("{row}Expiry_Date")
+
+
+def _day(row):
+    return _EXPIRY_DAY.replace("{row}", row)
+
+
+def create_expiry_objects(conn):
+    """Expiry queue, archive and waste tables, and the triggers feeding the queue.
+
+    _expiry_queue holds (Expiry_Day, Food_ID) for every listing not yet
+    swept, clustered by day, so a sweep reads only the entries that are due.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS _expiry_queue (
+            Expiry_Day TEXT NOT NULL,
+            Food_ID INTEGER NOT NULL,
+            PRIMARY KEY (Expiry_Day, Food_ID)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE TABLE IF NOT EXISTS food_listings_archive AS SELECT * FROM food_listings WHERE 0")
+    ensure_columns(conn, "food_listings_archive", ["Archived_At"])
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_listings_archive_food ON food_listings_archive (Food_ID)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS waste_by_day (
+            Expiry_Day TEXT PRIMARY KEY,
+            Listings INTEGER NOT NULL,
+            Quantity NUMERIC NOT NULL
+        )
+    """)
+    enqueue = f"INSERT OR IGNORE INTO _expiry_queue SELECT {_day('NEW.')}, NEW.Food_ID WHERE {_day('NEW.')} IS NOT NULL;"
+    dequeue = f"DELETE FROM _expiry_queue WHERE Expiry_Day IS {_day('OLD.')} AND Food_ID = OLD.Food_ID;"
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS tr_expiry_queue_insert AFTER INSERT ON food_listings BEGIN {enqueue} END")
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS tr_expiry_queue_delete AFTER DELETE ON food_listings BEGIN {dequeue} END")
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS tr_expiry_queue_update AFTER UPDATE OF Food_ID, Expiry_Date ON food_listings BEGIN
+        {dequeue}
+        {enqueue}
+        END
+    """)
+    rebuild_expiry_queue(conn)
+
+
+def rebuild_expiry_queue(conn):
+    conn.execute("DELETE FROM _expiry_queue")
+    conn.execute(
+        f"INSERT OR IGNORE INTO _expiry_queue SELECT {_day('')}, Food_ID FROM food_listings "
+        f"WHERE Food_ID IS NOT NULL AND {_day('')} IS NOT NULL"
+    )
+
+
+def _sweep_batch(conn, as_of, after, batch_size, archived_at):
+    """Sweep up to batch_size queue entries due before as_of, past the (day, id) cursor `after`."""
+    due = conn.execute(
+        "SELECT Expiry_Day, Food_ID FROM _expiry_queue "
+        "WHERE Expiry_Day < ? AND (Expiry_Day, Food_ID) > (?, ?) "
+        "ORDER BY Expiry_Day, Food_ID LIMIT ?",
+        (as_of, after[0], after[1], batch_size),
+    ).fetchall()
+    if not due:
+        return None, 0, 0
+    ids = ",".join(str(int(food_id)) for _, food_id in due)
+    statuses = ",".join(f"'{status}'" for status in KEPT_STATUSES + WAITING_STATUSES)
+    waiting = ",".join(f"'{status}'" for status in WAITING_STATUSES)
+    # the batch's unclaimed listings, decided once for the three statements below
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS _sweep_batch (Food_ID INTEGER PRIMARY KEY)")
+    conn.execute("DELETE FROM temp._sweep_batch")
+    conn.execute(f"""
+        INSERT INTO temp._sweep_batch
+        SELECT Food_ID FROM food_listings f
+        WHERE Food_ID IN ({ids})
+          AND NOT EXISTS (SELECT 1 FROM claims c WHERE c.Food_ID = f.Food_ID AND c.Status IN ({statuses}))
+    """)
+    wasted = "SELECT Food_ID FROM temp._sweep_batch"
+    # archived and counted already, e.g. put back by an external writer: only removed again
+    fresh = f"{wasted} b WHERE NOT EXISTS (SELECT 1 FROM food_listings_archive a WHERE a.Food_ID = b.Food_ID)"
+    # counted before the archive insert, which makes the rows no longer fresh
+    conn.execute(f"""
+        INSERT INTO waste_by_day (Expiry_Day, Listings, Quantity)
+        SELECT {_day('')}, COUNT(*), IFNULL(SUM(Quantity), 0) FROM food_listings
+        WHERE Food_ID IN ({fresh}) GROUP BY 1
+        ON CONFLICT(Expiry_Day) DO UPDATE SET
+            Listings = Listings + excluded.Listings, Quantity = Quantity + excluded.Quantity
+    """)
+    names = [row[1] for row in conn.execute('PRAGMA table_info("food_listings")')]
+    ensure_columns(conn, "food_listings_archive", names)
+    columns = ", ".join(f'"{name}"' for name in names)
+    conn.execute(
+        f"INSERT INTO food_listings_archive ({columns}, Archived_At) "
+        f"SELECT {columns}, ? FROM food_listings WHERE Food_ID IN ({fresh})",
+        (archived_at,),
+    )
+    archived = conn.execute(f"DELETE FROM food_listings WHERE Food_ID IN ({wasted})").rowcount
+    # the rest leave the queue too, except those with a claim still pending
+    conn.execute(f"""
+        DELETE FROM _expiry_queue
+        WHERE Expiry_Day < ? AND (Expiry_Day, Food_ID) > (?, ?) AND (Expiry_Day, Food_ID) <= (?, ?)
+          AND NOT EXISTS (SELECT 1 FROM claims c WHERE c.Food_ID = _expiry_queue.Food_ID AND c.Status IN ({waiting}))
+    """, (as_of, after[0], after[1], due[-1][0], due[-1][1]))
+    return due[-1], len(due), archived
+
+
+def sweep(as_of=None, batch_size=BATCH_SIZE, db_path=DB_PATH):
+    """Archive listings whose expiry day is before as_of (default today) and count their quantity as wasted.
+
+    Walks the expiry queue in batches of batch_size, one write transaction
+    each, so readers and CRUD writers are held up for one batch at most.
+    Listings with a Completed claim leave the queue but stay in
+    food_listings (claim history joins them); those with a Pending claim
+    stay queued until the claim is resolved. A listing already archived is
+    deleted again but not archived or counted twice. Returns {"examined", "archived"}.
+    """
+    as_of = (as_of or date.today()).isoformat()
+    archived_at = date.today().isoformat()
+    after = ("", -1)
+    examined = archived = 0
+    while True:
+        with transaction(db_path) as conn:
+            last, seen, moved = _sweep_batch(conn, as_of, after, batch_size, archived_at)
+            if moved:
+                for table in ("food_listings", "food_listings_archive", "waste_by_day"):
+                    bump_version(conn, table)
+        if last is None:
+            break
+        after = last
+        examined += seen
+        archived += moved
+    return {"examined": examined, "archived": archived}
+
+
+def wasted_totals(conn):
+    """(listings, quantity) swept as wasted so far; reads the small per-day table only."""
+    listings, quantity = conn.execute("SELECT IFNULL(SUM(Listings), 0), IFNULL(SUM(Quantity), 0) FROM waste_by_day").fetchone()
+    return listings, quantity
+
+
+class ExpirySweeper:
+    """Runs sweep() every interval_s seconds on a daemon thread."""
+
+    def __init__(self, interval_s, db_path=DB_PATH):
+        self.interval_s = interval_s
+        self.db_path = db_path
+        self.last = None
+        self.error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="expiry-sweeper", daemon=True)
+            self._thread.start()
+        return self
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.last = sweep(db_path=self.db_path)
+                self.error = None
+            except Exception as e:
+                # e.g. the database is locked for longer than busy_timeout; retry next tick
+                self.error = e
+            self._stop.wait(self.interval_s)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move expired food listings to food_listings_archive.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--as-of", type=date.fromisoformat, help="archive what expired before this day (default today)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+    result = sweep(args.as_of, args.batch_size, args.db)
+    with get_pool(args.db).connection() as conn:
+        listings, quantity = wasted_totals(conn)
+    print(f"examined {result['examined']}, archived {result['archived']}; "
+          f"wasted so far: {listings} listings, quantity {quantity}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import hashlib
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from datasource import DB_PATH, TABLE_SOURCES
+from schema import migrate
+from snapshot import write_snapshots
+from storage import QUANTITY_GUARD, archived_keys, ensure_columns, overdrawn
+from versions import bump_version
+
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def ensure_sync_state(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS _sync_state (
+            table_name TEXT PRIMARY KEY,
+            mtime_ns INTEGER,
+            size INTEGER,
+            sha256 TEXT
+        )
+    """)
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_sync_state(conn, table):
+    return conn.execute(
+        "SELECT mtime_ns, size, sha256 FROM _sync_state WHERE table_name = ?", (table,)
+    ).fetchone()
+
+
+def set_sync_state(conn, table, mtime_ns, size, sha256):
+    conn.execute("""
+        INSERT INTO _sync_state (table_name, mtime_ns, size, sha256) VALUES (?, ?, ?, ?)
+        ON CONFLICT(table_name) DO UPDATE SET
+            mtime_ns = excluded.mtime_ns, size = excluded.size, sha256 = excluded.sha256
+    """, (table, mtime_ns, size, sha256))
+
+
+def table_exists(conn, table):
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()
+    return row is not None
+
+
+def ensure_sync_rows(conn):
+    # a hash of every row as the CSV had it at the last sync, so the next sync
+    # can tell the CSV's own edits from writes made in the database since
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS _sync_rows (
+            table_name TEXT NOT NULL,
+            key NOT NULL,
+            row_hash INTEGER NOT NULL,
+            PRIMARY KEY (table_name, key)
+        ) WITHOUT ROWID
+    """)
+
+
+def _to_records(df):
+    # NaN -> None so sqlite stores NULL, numpy scalars -> python scalars
+    return list(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
+
+
+def _canonical(series):
+    # 10 and 10.0 hash alike, so a NULL appearing elsewhere in a column
+    # (which makes pandas read it as float) does not count as an edit
+    if series.dtype.kind == "f":
+        whole = series.dropna()
+        if not whole.empty and (whole % 1 == 0).all() and whole.abs().max() < 2 ** 53:
+            series = series.astype("Int64")
+    return series.astype("string")
+
+
+def row_hashes(df):
+    """64-bit hash of each row's values, independent of column order and dtype."""
+    canonical = pd.DataFrame({column: _canonical(df[column]) for column in sorted(df.columns)}, index=df.index)
+    return pd.util.hash_pandas_object(canonical, index=False).to_numpy().view(np.int64)
+
+
+def _keys(series):
+    return series.astype("int64") if series.dtype.kind == "f" and (series % 1 == 0).all() else series
+
+
+def diff_csv(previous, new, pk):
+    """Compare a CSV with the row hashes recorded when it was last synced.
+
+    previous maps key -> row hash (empty before the first sync). Returns
+    (keys dropped from the CSV, rows added to it, rows edited in it, the
+    CSV's {key: row hash}).
+    """
+    new = new.dropna(subset=[pk]).drop_duplicates(pk, keep="last")
+    new = new.assign(**{pk: _keys(new[pk])})
+    hashes = dict(zip(new[pk].tolist(), row_hashes(new).tolist()))
+    dropped = [key for key in previous if key not in hashes]
+    known = np.array([key in previous for key in hashes], dtype=bool)
+    edited = np.array([previous.get(key, row_hash) != row_hash for key, row_hash in hashes.items()], dtype=bool)
+    return dropped, new[~known], new[edited], hashes
+
+
+def apply_csv_diff(conn, table, pk, dropped, added, edited):
+    """Apply a CSV's own changes to the database; returns (rows written, keys held back).
+
+    The database is the system of record: rows new to the CSV are inserted
+    unless the key is already taken or archived, a row edited in the CSV overwrites only
+    the columns the CSV has, and a row dropped from the CSV is deleted.
+    Rows that exist only in the database are never touched. A listing edit
+    that would set Quantity below what claims hold is held back.
+    """
+    ensure_columns(conn, table, added.columns)
+    written = 0
+    retired = archived_keys(conn, table, added[pk])
+    if retired:
+        added = added[~added[pk].isin(retired)]
+    if not added.empty:
+        columns = ", ".join(f'"{c}"' for c in added.columns)
+        placeholders = ", ".join("?" for _ in added.columns)
+        written += conn.executemany(
+            f'INSERT INTO "{table}" ({columns}) VALUES ({placeholders}) ON CONFLICT("{pk}") DO NOTHING',
+            _to_records(added),
+        ).rowcount
+    held = set()
+    if not edited.empty:
+        values = [c for c in edited.columns if c != pk]
+        params = values + [pk]
+        guard = ""
+        if table == "food_listings" and "Quantity" in values:
+            held = overdrawn(conn, _to_records(edited[[pk, "Quantity"]]))
+            edited = edited[~edited[pk].isin(held)]
+            guard = f" AND {QUANTITY_GUARD}"
+            params.append("Quantity")
+        assignments = ", ".join(f'"{c}" = ?' for c in values)
+        written += conn.executemany(
+            f'UPDATE "{table}" SET {assignments} WHERE "{pk}" = ?{guard}',
+            _to_records(edited[params]),
+        ).rowcount
+    if dropped:
+        written += conn.executemany(
+            f'DELETE FROM "{table}" WHERE "{pk}" = ?', [(key,) for key in dropped]
+        ).rowcount
+    return written, held
+
+
+def _record_hashes(conn, table, dropped, hashes, changed):
+    conn.executemany(
+        "DELETE FROM _sync_rows WHERE table_name = ? AND key = ?", [(table, key) for key in dropped]
+    )
+    conn.executemany(
+        "INSERT INTO _sync_rows (table_name, key, row_hash) VALUES (?, ?, ?) "
+        "ON CONFLICT(table_name, key) DO UPDATE SET row_hash = excluded.row_hash",
+        [(table, key, hashes[key]) for key in changed],
+    )
+
+
+def sync_table(conn, table, csv_path, pk):
+    """Apply what changed in `table`'s CSV since its last sync. Returns the number of rows written.
+
+    Only the CSV's own edits are applied (see apply_csv_diff), so rows
+    added, updated or deleted through storage.py and claims.py survive a
+    later edit of the CSV. The first sync imports the CSV's rows whose keys
+    the database does not have yet.
+    """
+    mtime_ns, size = file_signature(csv_path)
+    state = get_sync_state(conn, table)
+    if state is not None and state[0] == mtime_ns and state[1] == size:
+        return 0
+
+    sha256 = file_hash(csv_path)
+    if state is not None and state[2] == sha256 and table_exists(conn, table):
+        # touched but not modified
+        with conn:
+            set_sync_state(conn, table, mtime_ns, size, sha256)
+        return 0
+
+    new = pd.read_csv(csv_path)
+    with conn:
+        previous = dict(conn.execute("SELECT key, row_hash FROM _sync_rows WHERE table_name = ?", (table,)))
+        dropped, added, edited, hashes = diff_csv(previous, new, pk)
+        written, held = apply_csv_diff(conn, table, pk, dropped, added, edited)
+        # held-back edits keep their old hash, so the next sync of the CSV tries them again
+        changed = [key for key in added[pk].tolist() + edited[pk].tolist() if key not in held]
+        _record_hashes(conn, table, dropped, hashes, changed)
+        if written:
+            bump_version(conn, table)
+        set_sync_state(conn, table, mtime_ns, size, sha256)
+    return written
+
+
+def sync_all(db_path=DB_PATH, sources=TABLE_SOURCES):
+    """Apply CSV edits to the database. Cheap (one stat per table) when nothing changed."""
+    conn = sqlite3.connect(db_path)
+    try:
+        migrate(conn)
+        with conn:
+            ensure_sync_state(conn)
+            ensure_sync_rows(conn)
+        applied = {
+            table: sync_table(conn, table, csv_path, pk)
+            for table, (csv_path, pk) in sources.items()
+        }
+        if any(applied.values()):
+            # refresh planner statistics for tables whose size moved
+            conn.execute("PRAGMA optimize")
+    finally:
+        conn.close()
+    # a sync that applied CSV rows is a bulk change: re-snapshot those tables.
+    # Row writes (CRUD, claims, the sweeper) never snapshot; the next bulk
+    # load or `python snapshot.py` does, so a rerun after a write only reads
+    stale = [table for table in sources if applied[table]]
+    if stale:
+        write_snapshots(db_path, stale)
+    return applied
+
+
+if __name__ == "__main__":
+    for table, touched in sync_all().items():
+        print(f"{table}: {touched} rows applied")
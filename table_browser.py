@@ -0,0 +1,93 @@
+import sqlite3
+
+import pandas as pd
+
+from datasource import pool
+from storage import TABLE_KEYS
+
+
+DEFAULT_PAGE_SIZE = 50
+
+
+def table_columns(table):
+    with pool().connection() as conn:
+        return [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')]
+
+
+def estimate_row_count(table):
+    """Row count without a scan: ANALYZE statistics, else the largest rowid.
+
+    Both are O(1)/O(log N); the rowid bound over-counts after deletes.
+    """
+    with pool().connection() as conn:
+        try:
+            row = conn.execute(
+                "SELECT stat FROM sqlite_stat1 WHERE tbl = ? LIMIT 1", (table,)
+            ).fetchone()
+        except sqlite3.OperationalError:
+            # never analyzed
+            row = None
+        if row and row[0]:
+            return int(row[0].split()[0])
+        return conn.execute(f'SELECT IFNULL(MAX(rowid), 0) FROM "{table}"').fetchone()[0]
+
+
+def _after(sort_col, pk, descending, cursor):
+    # Keyset condition for "rows after (value, key)" in the page order.
+    # SQLite sorts NULLs first ascending and last descending, so a NULL cursor
+    # value needs its own branch; comparisons with NULL are never true.
+    value, key = cursor
+    if sort_col == pk:
+        return (f'"{pk}" < ?' if descending else f'"{pk}" > ?'), (key,)
+    col = f'"{sort_col}"'
+    if not descending:
+        if value is None:
+            return f'(({col} IS NULL AND "{pk}" > ?) OR {col} IS NOT NULL)', (key,)
+        return f'({col} > ? OR ({col} = ? AND "{pk}" > ?))', (value, value, key)
+    if value is None:
+        return f'({col} IS NULL AND "{pk}" < ?)', (key,)
+    return f'({col} < ? OR ({col} = ? AND "{pk}" < ?) OR {col} IS NULL)', (value, value, key)
+
+
+def fetch_page(table, columns=None, sort_by=None, descending=False, cursor=None,
+               page_size=DEFAULT_PAGE_SIZE):
+    """Fetch one page of `table` ordered by (sort_by, primary key).
+
+    `cursor` is the (sort value, key) of the last row of the previous page,
+    or None for the first page. Returns (DataFrame, cursor for the next page
+    or None when this is the last page). Only the projected columns and at
+    most page_size rows are read.
+    """
+    pk = TABLE_KEYS[table]
+    known = table_columns(table)
+    sort_by = sort_by or pk
+    if sort_by not in known:
+        raise ValueError(f"unknown column {sort_by!r} for {table}")
+    columns = [c for c in (columns or known) if c in known]
+
+    # the sort column and key are fetched even when not shown, to build the cursor
+    selected = list(dict.fromkeys(columns + [sort_by, pk]))
+    direction = "DESC" if descending else "ASC"
+    order = f'"{pk}" {direction}' if sort_by == pk else f'"{sort_by}" {direction}, "{pk}" {direction}'
+    where, params = ("", ())
+    if cursor is not None:
+        condition, params = _after(sort_by, pk, descending, cursor)
+        where = f"WHERE {condition}"
+
+    projection = ", ".join(f'"{c}"' for c in selected)
+    sql = f'SELECT {projection} FROM "{table}" {where} ORDER BY {order} LIMIT ?'
+    with pool().connection() as conn:
+        # one extra row tells us whether another page exists
+        rows = conn.execute(sql, params + (page_size + 1,)).fetchall()
+
+    df = pd.DataFrame(rows[:page_size], columns=selected)
+    next_cursor = None
+    if len(rows) > page_size:
+        last = df.iloc[-1]
+        value = last[sort_by]
+        next_cursor = (None if pd.isna(value) else _python(value), _python(last[pk]))
+    return df[columns], next_cursor
+
+
+def _python(value):
+    return value.item() if hasattr(value, "item") else value
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+
+# Column encodings for the in-memory tables. Columns not listed (names,
+# contacts, addresses: mostly unique) stay as they are.
+TABLE_TYPES = {
+    "providers": {
+        "Provider_ID": "id",
+        "Type": "category",
+        "City": "category",
+    },
+    "receivers": {
+        "Receiver_ID": "id",
+        "Type": "category",
+        "City": "category",
+    },
+    "food_listings": {
+        "Food_ID": "id",
+        "Food_Name": "category",
+        "Quantity": "quantity",
+        "Expiry_Date": "datetime",
+        "Provider_ID": "id",
+        "Provider_Type": "category",
+        "Location": "category",
+        "Food_Type": "category",
+        "Meal_Type": "category",
+    },
+    "claims": {
+        "Claim_ID": "id",
+        "Food_ID": "id",
+        "Receiver_ID": "id",
+        "Status": "category",
+        "Quantity": "quantity",
+        "Timestamp": "datetime",
+        "Claim_Date": "datetime",
+    },
+}
+
+# Tried in order on the values the previous formats left unparsed; the
+# shipped CSVs use M/D/YYYY [H:MM], CRUD writes ISO dates.
+DATETIME_FORMATS = ["ISO8601", "%m/%d/%Y %H:%M", "%m/%d/%Y"]
+
+
+def _id(series):
+    # int32 only when every key is present and fits; a NULL keeps the float column
+    if series.dtype == np.int32 or series.dtype.kind not in "iuf" or series.isna().any():
+        return series
+    if series.empty or (series.min() >= np.iinfo(np.int32).min and series.max() <= np.iinfo(np.int32).max):
+        return series.astype(np.int32)
+    return series
+
+
+def _quantity(series):
+    values = pd.to_numeric(series, errors="coerce")
+    if isinstance(values.array, pd.arrays.IntegerArray):
+        return values
+    present = values.dropna()
+    if (present != np.floor(present)).any():
+        # fractional quantities stay float64
+        return values
+    if len(present) == len(values):
+        return pd.to_numeric(values, downcast="integer")
+    # a NULL takes a nullable integer column, not float32: that loses counts above 2**24
+    fits = present.empty or (present.min() >= np.iinfo(np.int32).min and present.max() <= np.iinfo(np.int32).max)
+    return values.astype("Int32" if fits else "Int64")
+
+
+def _category(series):
+    return series if isinstance(series.dtype, pd.CategoricalDtype) else series.astype("category")
+
+
+def _datetime(series):
+    if series.dtype.kind == "M":
+        return series
+    text = series.astype(object).where(series.notna(), None)
+    parsed = pd.Series(pd.NaT, index=series.index, dtype="datetime64[ns]")
+    for fmt in DATETIME_FORMATS:
+        missing = parsed.isna() & text.notna()
+        if not missing.any():
+            break
+        parsed[missing] = pd.to_datetime(text[missing], format=fmt, errors="coerce")
+    return parsed
+
+
+_CONVERTERS = {"id": _id, "quantity": _quantity, "category": _category, "datetime": _datetime}
+
+
+def to_typed(table, df):
+    """Return df with the table's columns dictionary encoded and downcast.
+
+    Idempotent: columns already in their target type are left alone, so a
+    frame read back from a typed snapshot costs nothing here.
+    """
+    types = TABLE_TYPES.get(table, {})
+    converted = {
+        column: _CONVERTERS[kind](df[column])
+        for column, kind in types.items()
+        if column in df.columns
+    }
+    return df.assign(**converted) if converted else df
+
+
+def memory_report(frames):
+    """Per-table deep memory of the plain frames and of their typed form.
+
+    frames maps table name to a DataFrame as read from SQLite.
+    """
+    rows = []
+    for table, df in frames.items():
+        before = int(df.memory_usage(index=True, deep=True).sum())
+        after = int(to_typed(table, df).memory_usage(index=True, deep=True).sum())
+        rows.append({"Table": table, "Rows": len(df), "Plain_Bytes": before, "Typed_Bytes": after,
+                     "Ratio": before / after if after else float("nan")})
+    return pd.DataFrame(rows, columns=["Table", "Rows", "Plain_Bytes", "Typed_Bytes", "Ratio"])
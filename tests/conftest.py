@@ -0,0 +1,54 @@
+import os
+import sqlite3
+import sys
+import tempfile
+
+import pytest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Modules read these at import time; point them away from the shipped
+# databases and CSVs before anything imports datasource.
+_scratch = tempfile.mkdtemp(prefix="food-tests-")
+os.environ["FOOD_DB_PATH"] = os.path.join(_scratch, "default.db")
+os.environ["FOOD_CSV_DIR"] = _scratch
+for name in ("FOOD_EXPORT_PORT", "FOOD_METRICS_PORT"):
+    os.environ.pop(name, None)
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """A freshly migrated database that datasource.pool() reads for this test.
+
+    Functions that take db_path must be given it: their defaults were bound
+    to FOOD_DB_PATH at import.
+    """
+    import datasource
+    import storage
+    from connection_pool import get_pool
+    from schema import migrate
+
+    path = str(tmp_path / "food.db")
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        migrate(conn)
+    finally:
+        conn.close()
+    monkeypatch.setattr(datasource, "DB_PATH", path)
+    monkeypatch.setattr(storage, "_listeners", [])
+    datasource.clear_cache()
+    yield path
+    datasource.clear_cache()
+    get_pool(path).close()
+
+
+@pytest.fixture
+def seed(db_path):
+    """seed(table, rows): insert dict rows through storage, as CRUD does."""
+    from storage import insert_row
+
+    def insert(table, rows):
+        return [insert_row(table, row, db_path) for row in rows]
+    return insert
@@ -0,0 +1,52 @@
+from datetime import date
+
+import pytest
+
+import storage
+from allocation import allocate
+from claims import ClaimError, cancel_claim, place_claim
+from matching import MatchIndex
+from tests.test_claims import listing
+
+
+AS_OF = date(2025, 1, 1)
+
+
+@pytest.fixture
+def pune(seed):
+    seed("receivers", [{"Receiver_ID": 1, "Name": "R", "City": "Pune"}])
+    seed("food_listings", [
+        {"Food_ID": 1, "Quantity": 10, "Expiry_Date": "2025-02-01", "Location": "Pune",
+         "Food_Type": "Veg", "Meal_Type": "Lunch"},
+        {"Food_ID": 2, "Quantity": 5, "Expiry_Date": "2025-03-01", "Location": "Pune",
+         "Food_Type": "Veg", "Meal_Type": "Lunch"},
+    ])
+
+
+def test_allocation_reserves_what_is_left(db_path, pune):
+    place_claim(1, 1, 4, db_path=db_path)
+    plan = allocate(AS_OF, db_path=db_path)
+    assert sorted(zip(plan["Food_ID"], plan["Quantity"])) == [(1, 6), (2, 5)]
+    assert listing(db_path, 1) == (10, 10)
+    # nothing left for a claim placed afterwards, nor for a second run
+    with pytest.raises(ClaimError):
+        place_claim(1, 1, 1, db_path=db_path)
+    assert allocate(AS_OF, db_path=db_path).empty
+
+
+def test_dry_run_reserves_nothing(db_path, pune):
+    assert len(allocate(AS_OF, dry_run=True, db_path=db_path)) == 2
+    assert listing(db_path, 1) == (10, 0)
+
+
+def test_match_index_follows_what_is_left(db_path, pune, monkeypatch):
+    index = MatchIndex(db_path)
+    monkeypatch.setattr(storage, "_listeners", [index.apply_change])
+    assert [food_id for _, food_id in index.top_k("Pune", as_of=AS_OF)] == [1, 2]
+
+    claim = place_claim(1, 1, 10, db_path=db_path)
+    assert [food_id for _, food_id in index.top_k("Pune", as_of=AS_OF)] == [2]
+    cancel_claim(claim, db_path)
+    place_claim(2, 1, 1, db_path=db_path)
+    assert [food_id for _, food_id in index.top_k("Pune", as_of=AS_OF)] == [1, 2]
+    assert index.builds == 1
@@ -0,0 +1,78 @@
+import os
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from claims import ClaimError, cancel_claim, complete_claim, place_claim, remove_claim
+from query_registry import run_question
+from storage import insert_row, update_row
+from sweeper import sweep
+from sync import sync_all
+
+
+def listing(db_path, food_id):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT Quantity, Reserved FROM food_listings WHERE Food_ID = ?", (food_id,)).fetchone()
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def rice(db_path):
+    insert_row("food_listings", {"Food_ID": 1, "Food_Name": "Rice", "Quantity": 10, "Provider_ID": 7,
+                                 "Expiry_Date": "2030-01-01"}, db_path)
+    return 1
+
+
+def test_claims_reserve_without_changing_the_donated_quantity(db_path, rice):
+    first = place_claim(rice, 1, 4, db_path=db_path)
+    second = place_claim(rice, 2, 6, db_path=db_path)
+    assert listing(db_path, rice) == (10, 10)
+    with pytest.raises(ClaimError):
+        place_claim(rice, 3, 1, db_path=db_path)
+
+    complete_claim(first, db_path)
+    cancel_claim(second, db_path)
+    assert listing(db_path, rice) == (10, 4)
+    with pytest.raises(ClaimError):
+        cancel_claim(first, db_path)
+    assert run_question("q5").iloc[0, 0] == 10
+
+
+def test_removing_a_pending_claim_releases_it(db_path, rice):
+    pending = place_claim(rice, 1, 3, db_path=db_path)
+    done = place_claim(rice, 2, 2, db_path=db_path)
+    complete_claim(done, db_path)
+    assert remove_claim(pending, db_path)
+    assert remove_claim(done, db_path)
+    # collected food stays reserved
+    assert listing(db_path, rice) == (10, 2)
+    assert not remove_claim(pending, db_path)
+
+
+def test_donations_by_provider_include_archived_listings(db_path, rice):
+    insert_row("food_listings", {"Food_ID": 2, "Quantity": 5, "Provider_ID": 7, "Expiry_Date": "2020-01-01"}, db_path)
+    place_claim(rice, 1, 3, db_path=db_path)
+    assert run_question("q13").values.tolist() == [[7, 15]]
+    sweep(db_path=db_path)
+    assert run_question("q13").values.tolist() == [[7, 15]]
+
+
+def test_quantity_cannot_drop_below_what_is_reserved(db_path, rice, tmp_path):
+    place_claim(rice, 1, 8, db_path=db_path)
+    with pytest.raises(ClaimError):
+        update_row("food_listings", rice, {"Quantity": 5}, db_path)
+    assert listing(db_path, rice) == (10, 8)
+    assert update_row("food_listings", rice, {"Quantity": 8}, db_path) == 1
+
+    # nor through a CSV edit: it is held back and tried again on the next sync
+    path = str(tmp_path / "food_listings.csv")
+    sources = {"food_listings": (path, "Food_ID")}
+    pd.DataFrame([{"Food_ID": rice, "Food_Name": "Rice", "Quantity": 8}]).to_csv(path, index=False)
+    sync_all(db_path, sources)
+    pd.DataFrame([{"Food_ID": rice, "Food_Name": "Brown Rice", "Quantity": 2}]).to_csv(path, index=False)
+    os.utime(path, ns=(1, 1))
+    assert sync_all(db_path, sources) == {"food_listings": 0}
+    assert listing(db_path, rice) == (8, 8)
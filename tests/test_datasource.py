@@ -0,0 +1,48 @@
+import sqlite3
+
+from datasource import cache_stats, fetchall, fetchone
+from storage import delete_row, insert_row, update_row
+from versions import bump_version
+
+
+def test_write_through_storage_invalidates_cached_result(db_path, seed):
+    seed("providers", [{"Provider_ID": 1, "Name": "A", "City": "Pune"}])
+    assert fetchone("SELECT COUNT(*) FROM providers") == (1,)
+
+    insert_row("providers", {"Provider_ID": 2, "Name": "B", "City": "Pune"}, db_path)
+    assert fetchone("SELECT COUNT(*) FROM providers") == (2,)
+    update_row("providers", 2, {"City": "Goa"}, db_path)
+    assert fetchall("SELECT City FROM providers ORDER BY Provider_ID") == [("Pune",), ("Goa",)]
+    delete_row("providers", 1, db_path)
+    assert fetchall("SELECT City FROM providers ORDER BY Provider_ID") == [("Goa",)]
+
+
+def test_write_keeps_results_of_other_tables(db_path, seed):
+    seed("receivers", [{"Receiver_ID": 1, "Name": "R", "City": "Pune"}])
+    fetchone("SELECT COUNT(*) FROM receivers")
+    hits = cache_stats()["hits"]
+
+    insert_row("providers", {"Provider_ID": 1, "Name": "A", "City": "Pune"}, db_path)
+    assert fetchone("SELECT COUNT(*) FROM receivers") == (1,)
+    assert cache_stats()["hits"] == hits + 1
+
+
+def test_aggregate_results_follow_their_source_table(db_path, seed):
+    seed("providers", [{"Provider_ID": 1, "Name": "A", "City": "Pune"}])
+    assert fetchall("SELECT City, Row_Count FROM agg_providers_city") == [("Pune", 1)]
+
+    insert_row("providers", {"Provider_ID": 2, "Name": "B", "City": "Pune"}, db_path)
+    assert fetchall("SELECT City, Row_Count FROM agg_providers_city") == [("Pune", 2)]
+
+
+def test_write_from_another_connection_is_seen_through_the_version_stamp(db_path, seed):
+    seed("providers", [{"Provider_ID": 1, "Name": "A", "City": "Pune"}])
+    assert fetchone("SELECT COUNT(*) FROM providers") == (1,)
+
+    # e.g. another process: no notify, only the stamp moves
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute("INSERT INTO providers (Provider_ID, Name) VALUES (2, 'B')")
+        bump_version(conn, "providers")
+    conn.close()
+    assert fetchone("SELECT COUNT(*) FROM providers") == (2,)
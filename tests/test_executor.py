@@ -0,0 +1,47 @@
+import threading
+
+import pytest
+
+from executor import QueryExecutor
+
+
+def blocking(calls, release, outcome):
+    def fn(x):
+        calls.append(x)
+        release.wait(5)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    return fn
+
+
+def test_identical_requests_in_flight_run_once(db_path):
+    executor = QueryExecutor(max_workers=2)
+    calls, release = [], threading.Event()
+    fn = blocking(calls, release, ["rows"])
+    first = executor.submit("q", fn, 1)
+    second = executor.submit("q", fn, 1)
+    other = executor.submit("q", fn, 2)
+    assert second is first and other is not first
+    release.set()
+    assert first.result(5) is second.result(5)
+    assert first.result() == ["rows"] and other.result(5) == ["rows"]
+    assert sorted(calls) == [1, 2]
+    assert (executor.executed, executor.joined, first.waiters) == (2, 1, 1)
+    # done at this data version: answered without running again
+    assert executor.submit("q", fn, 1) is first and sorted(calls) == [1, 2]
+
+
+def test_a_failure_reaches_every_waiter_and_is_not_kept(db_path):
+    executor = QueryExecutor(max_workers=2)
+    calls, release = [], threading.Event()
+    fn = blocking(calls, release, ValueError("boom"))
+    jobs = [executor.submit("q", fn, 1) for _ in range(3)]
+    release.set()
+    for job in jobs:
+        with pytest.raises(ValueError, match="boom"):
+            job.result(5)
+    assert calls == [1]
+    assert executor.latest("q", (1,)) is None and executor.running() == []
+    retry = executor.submit("q", blocking(calls, release, "ok"), 1)
+    assert retry is not jobs[0] and retry.result(5) == "ok"
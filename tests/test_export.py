@@ -0,0 +1,20 @@
+import importlib
+
+import export
+
+
+def test_endpoint_is_off_unless_a_port_is_set(monkeypatch):
+    monkeypatch.delenv("FOOD_EXPORT_PORT", raising=False)
+    assert importlib.reload(export).EXPORT_PORT == 0
+    monkeypatch.setenv("FOOD_EXPORT_PORT", "8600")
+    assert importlib.reload(export).EXPORT_PORT == 8600
+    monkeypatch.delenv("FOOD_EXPORT_PORT")
+    importlib.reload(export)
+
+
+def test_table_streams_as_csv(db_path, seed):
+    seed("providers", [{"Provider_ID": 1, "Name": "A"}, {"Provider_ID": 2, "Name": "B"}])
+    text = b"".join(export.stream("table", "providers", "csv", batch_rows=1)).decode()
+    lines = text.splitlines()
+    assert lines[0].startswith("Provider_ID,Name")
+    assert [line.split(",")[:2] for line in lines[1:]] == [["1", "A"], ["2", "B"]]
@@ -0,0 +1,64 @@
+import sqlite3
+
+import pytest
+
+import storage
+from facets import FacetIndex
+from storage import delete_row, insert_row
+
+
+CITIES = ["Pune", None, "Goa", "Pune", "Agra", "Goa", "Pune", None, "Delhi"]
+TYPES = ["Vegan", "Vegetarian", "Vegan", None, "Vegan", "Vegetarian", "Vegetarian", "Vegan", "Vegan"]
+
+
+@pytest.fixture
+def listings(seed):
+    seed("food_listings", [
+        {"Food_ID": i + 1, "Location": city, "Food_Type": food_type, "Quantity": i + 1,
+         "Expiry_Date": f"2030-01-{i + 1:02d}"}
+        for i, (city, food_type) in enumerate(zip(CITIES, TYPES))
+    ])
+
+
+def group_by(db_path, column, where="", params=()):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(
+            f'SELECT "{column}", COUNT(*) FROM food_listings WHERE "{column}" IS NOT NULL {where} '
+            f'GROUP BY "{column}" ORDER BY "{column}"', params
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+def test_counts_match_a_group_by(db_path, listings):
+    facets = FacetIndex(db_path)
+    assert facets.values("food_listings", "Location") == group_by(db_path, "Location")
+    assert facets.values("food_listings", "Food_Type") == group_by(db_path, "Food_Type")
+
+    keys = facets.filter("food_listings", {"Location": ["Pune", "Goa"], "Food_Type": ["Vegan"]},
+                         {"Quantity": (2, None)})
+    conn = sqlite3.connect(db_path)
+    try:
+        expected = [key for key, in conn.execute(
+            "SELECT Food_ID FROM food_listings WHERE Location IN ('Pune', 'Goa') AND Food_Type = 'Vegan' "
+            "AND Quantity >= 2 ORDER BY Food_ID")]
+    finally:
+        conn.close()
+    assert keys == expected == [3]
+
+
+@pytest.mark.parametrize("listening", [True, False])
+def test_inserts_and_deletes_are_reflected(db_path, listings, monkeypatch, listening):
+    facets = FacetIndex(db_path)
+    facets.values("food_listings", "Location")
+    if listening:
+        monkeypatch.setattr(storage, "_listeners", [facets.apply_change])
+
+    insert_row("food_listings", {"Food_ID": 100, "Location": "Agra", "Food_Type": "Vegan"}, db_path)
+    delete_row("food_listings", 1, db_path)
+    assert facets.values("food_listings", "Location") == group_by(db_path, "Location")
+    assert facets.filter("food_listings", {"Location": ["Agra"]}) == [5, 100]
+    assert facets.filter("food_listings", {"Location": ["Pune"]}) == [4, 7]
+    # in place when listening, by one rebuild on the moved version otherwise
+    assert facets.builds == (1 if listening else 2)
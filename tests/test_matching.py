@@ -0,0 +1,76 @@
+import random
+import sqlite3
+from datetime import date
+
+import pytest
+
+import storage
+from claims import place_claim
+from matching import MatchIndex
+
+
+AS_OF = date(2030, 1, 15)
+
+
+@pytest.fixture
+def listings(seed):
+    rng = random.Random(0)
+    seed("receivers", [{"Receiver_ID": 1, "City": "Pune"}, {"Receiver_ID": 2, "City": "Goa"}])
+    seed("food_listings", [
+        {"Food_ID": i, "Location": rng.choice(["Pune", "Goa", "Agra"]),
+         "Food_Type": rng.choice(["Vegan", "Vegetarian"]), "Meal_Type": rng.choice(["Lunch", "Dinner"]),
+         # days 1-30 of January: about half expire before AS_OF
+         "Expiry_Date": f"2030-01-{rng.randint(1, 30):02d}", "Quantity": rng.randint(1, 3)}
+        for i in range(1, 121)
+    ])
+
+
+def brute_force(db_path, receiver_id, k, food_types=None):
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("""
+            SELECT f.Expiry_Date, f.Food_ID, f.Food_Type FROM food_listings f
+            JOIN receivers r ON r.City = f.Location
+            WHERE r.Receiver_ID = ? AND f.Quantity - f.Reserved > 0 AND f.Expiry_Date >= ?
+        """, (receiver_id, AS_OF.isoformat())).fetchall()
+    finally:
+        conn.close()
+    rows = [(expiry, food_id) for expiry, food_id, food_type in rows if food_types is None or food_type in food_types]
+    return sorted(rows)[:k]
+
+
+@pytest.mark.parametrize("receiver_id", [1, 2])
+@pytest.mark.parametrize("k", [1, 5, 100])
+def test_matches_equal_a_scan(db_path, listings, receiver_id, k):
+    index = MatchIndex(db_path)
+    matches = index.match_receiver(receiver_id, k=k, as_of=AS_OF)
+    assert matches == brute_force(db_path, receiver_id, k)
+    assert all(expiry >= AS_OF.isoformat() for expiry, _ in matches)
+    assert index.match_receiver(1, ["Vegan"], k=k, as_of=AS_OF) == brute_force(db_path, 1, k, ["Vegan"])
+
+
+@pytest.mark.parametrize("listening", [True, False])
+def test_a_claimed_listing_leaves_the_candidates(db_path, listings, monkeypatch, listening):
+    index = MatchIndex(db_path)
+    if listening:
+        monkeypatch.setattr(storage, "_listeners", [index.apply_change])
+    first = index.match_receiver(1, k=3, as_of=AS_OF)
+    expiry, food_id = first[0]
+    left = brute_force(db_path, 1, 100)
+    # take all of the soonest listing, then part of the next one
+    conn = sqlite3.connect(db_path)
+    quantity, = conn.execute("SELECT Quantity FROM food_listings WHERE Food_ID = ?", (food_id,)).fetchone()
+    conn.close()
+    place_claim(food_id, 1, quantity, db_path=db_path)
+    matches = index.match_receiver(1, k=100, as_of=AS_OF)
+    assert (expiry, food_id) not in matches
+    assert matches == brute_force(db_path, 1, 100) == left[1:]
+    assert index.builds == (1 if listening else 2)
+
+
+def test_receivers_elsewhere_and_unknown_ones_get_nothing_from_this_city(db_path, listings):
+    index = MatchIndex(db_path)
+    pune = {food_id for _, food_id in index.match_receiver(1, k=100, as_of=AS_OF)}
+    goa = {food_id for _, food_id in index.match_receiver(2, k=100, as_of=AS_OF)}
+    assert pune and goa and not pune & goa
+    assert index.match_receiver(3, k=100, as_of=AS_OF) == []
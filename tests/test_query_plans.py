@@ -0,0 +1,76 @@
+import inspect
+import sqlite3
+
+import pytest
+
+import database
+import datasource
+import extraqs
+from query_registry import PROVIDER_CITIES_SQL, QUESTIONS
+from schema import query_plan, table_scans
+
+
+# Point lookups may not scan even their outer table; the distinct-city list
+# a case-insensitive lookup filters is read whole (and cached).
+POINT_LOOKUPS = {"database.get_provider_contacts_by_city", "q3"}
+
+
+def _query_functions():
+    for module in (database, extraqs):
+        for name, fn in inspect.getmembers(module, inspect.isfunction):
+            if fn.__module__ == module.__name__ and name.startswith("get_"):
+                yield f"{module.__name__}.{name}", (fn, tuple(inspect.signature(fn).parameters))
+    for qid, question in QUESTIONS.items():
+        yield qid, (question.run, question.params)
+
+
+QUERIES = dict(_query_functions())
+
+
+@pytest.fixture(scope="module")
+def generated_db(tmp_path_factory):
+    from benchmarks.datagen import generate
+
+    path = str(tmp_path_factory.mktemp("plans") / "food.db")
+    generate(path, providers=500, receivers=500, listings=5000, claims=5000)
+    return path
+
+
+@pytest.fixture
+def statements(generated_db, monkeypatch):
+    """Run a query function and return every (sql, params) it executed."""
+    monkeypatch.setattr(datasource, "DB_PATH", generated_db)
+    run = datasource._run
+    seen = []
+
+    def record(fetch, sql, params):
+        seen.append((sql, params))
+        return run(fetch, sql, params)
+    monkeypatch.setattr(datasource, "_run", record)
+
+    conn = sqlite3.connect(generated_db)
+    city = conn.execute("SELECT City FROM providers WHERE City IS NOT NULL LIMIT 1").fetchone()[0]
+    conn.close()
+
+    def capture(fn, params):
+        # the only parameter any query takes is a city
+        assert set(params) <= {"city"}
+        seen.clear()
+        fn(**{name: city for name in params})
+        return list(seen)
+    yield capture
+    datasource.clear_cache()
+
+
+@pytest.mark.parametrize("name", sorted(QUERIES))
+def test_query_runs_on_indexes(name, generated_db, statements):
+    executed = statements(*QUERIES[name])
+    assert executed, f"{name} ran no SQL through datasource"
+    conn = sqlite3.connect(generated_db)
+    try:
+        for sql, params in executed:
+            allow_outer = name not in POINT_LOOKUPS or sql == PROVIDER_CITIES_SQL
+            scans = table_scans(query_plan(conn, sql, params), allow_outer)
+            assert not scans, f"{name}: {scans}\n{sql}"
+    finally:
+        conn.close()
@@ -0,0 +1,13 @@
+from query_registry import run_question
+
+
+def test_city_lookup_ignores_case_beyond_ascii(seed):
+    seed("providers", [
+        {"Provider_ID": 1, "Name": "A", "City": "Évora", "Contact": "1"},
+        {"Provider_ID": 2, "Name": "B", "City": "ÉVORA", "Contact": "2"},
+        {"Provider_ID": 3, "Name": "C", "City": "evora", "Contact": "3"},
+        {"Provider_ID": 4, "Name": "D", "City": "Pune", "Contact": "4"},
+    ])
+    assert sorted(run_question("q3", city="évora")["Name"]) == ["A", "B"]
+    assert run_question("q3", city="PUNE")["Name"].tolist() == ["D"]
+    assert run_question("q3", city="Agra").empty
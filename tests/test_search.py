@@ -0,0 +1,37 @@
+import pytest
+
+from search import search
+
+
+@pytest.fixture
+def listings(seed):
+    # the fuzzy-only city comes first in rowid order, so a rowid-ordered
+    # fetch would fill the limit with it
+    rows = [{"Food_Name": "Bread", "Location": "City 00000", "Food_Type": "Vegan", "Meal_Type": "Lunch"}] * 30
+    rows += [{"Food_Name": "Bread", "Location": "City 00001", "Food_Type": "Vegan", "Meal_Type": "Lunch"}] * 5
+    rows += [{"Food_Name": "Rice", "Location": "City 00001", "Food_Type": "Vegan", "Meal_Type": "Dinner"}] * 3
+    seed("food_listings", [dict(row, Food_ID=i + 1) for i, row in enumerate(rows)])
+
+
+@pytest.mark.parametrize("text", ["bread 00001", "city 0001 bread"])
+def test_literal_matches_rank_above_fuzzy_ones(listings, text):
+    literal = search("food_listings", text, 10, fuzzy=False)
+    assert len(literal) == 5 and set(literal["Location"]) == {"City 00001"}
+
+    df = search("food_listings", text, 10, fuzzy=True)
+    assert len(df) == 10
+    assert df["Location"].head(5).tolist() == ["City 00001"] * 5
+    assert df["Score"].head(5).min() > df["Score"].iloc[5:].max()
+    assert set(df["Food_ID"].head(5)) == set(literal["Food_ID"])
+
+
+def test_fuzzy_matches_fill_in_when_nothing_matches_literally(listings):
+    assert search("food_listings", "brend", 10, fuzzy=False).empty
+    df = search("food_listings", "brend", 10, fuzzy=True)
+    assert len(df) == 10 and set(df["Food_Name"]) == {"Bread"}
+
+
+def test_scores_follow_the_kind_of_match(listings):
+    df = search("food_listings", "rice", 10)
+    assert df["Food_Name"].tolist() == ["Rice"] * 3
+    assert (df["Score"] == 40).all()
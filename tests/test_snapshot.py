@@ -0,0 +1,79 @@
+import os
+import sqlite3
+
+import pandas as pd
+
+from connection_pool import get_pool
+from repository import TableRepository
+from schema import migrate
+from snapshot import has_snapshot, write_snapshots
+from storage import insert_row
+from sync import sync_all
+from versions import database_id
+
+
+def _recreate(path):
+    get_pool(path).close()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        migrate(conn)
+        return database_id(conn)
+    finally:
+        conn.close()
+
+
+def test_a_new_database_at_the_same_path_does_not_read_the_old_snapshot(db_path):
+    insert_row("providers", {"Provider_ID": 1, "Name": "Old"}, db_path)
+    assert write_snapshots(db_path, ["providers"]) == {"providers": 1}
+    repository = TableRepository(db_path, tables=("providers",))
+    assert repository.get("providers")["Name"].tolist() == ["Old"]
+
+    # same table, same version stamp, different file
+    database = _recreate(db_path)
+    insert_row("providers", {"Provider_ID": 1, "Name": "New"}, db_path)
+    assert not has_snapshot("providers", database, 1, db_path)
+    assert repository.get("providers")["Name"].tolist() == ["New"]
+    assert TableRepository(db_path, tables=("providers",)).get("providers")["Name"].tolist() == ["New"]
+
+    write_snapshots(db_path, ["providers"])
+    assert has_snapshot("providers", database, 1, db_path)
+    assert TableRepository(db_path, tables=("providers",)).get("providers")["Name"].tolist() == ["New"]
+
+
+def test_a_write_after_the_snapshot_is_not_hidden_by_it(db_path):
+    insert_row("providers", {"Provider_ID": 1, "Name": "A"}, db_path)
+    write_snapshots(db_path, ["providers"])
+    repository = TableRepository(db_path, tables=("providers",))
+    assert repository.get("providers")["Name"].tolist() == ["A"]
+
+    insert_row("providers", {"Provider_ID": 2, "Name": "B"}, db_path)
+    assert repository.get("providers")["Name"].tolist() == ["A", "B"]
+    assert TableRepository(db_path, tables=("providers",)).get("providers")["Name"].tolist() == ["A", "B"]
+
+    # the next snapshot replaces the old version's
+    assert write_snapshots(db_path, ["providers"]) == {"providers": 2}
+    assert [entry.rsplit("-", 1)[1] for entry in os.listdir(f"{db_path}.snapshot")] == ["2"]
+
+
+def test_only_a_sync_that_applied_rows_writes_snapshots(db_path, tmp_path):
+    path = str(tmp_path / "providers.csv")
+    pd.DataFrame([{"Provider_ID": 1, "Name": "A"}]).to_csv(path, index=False)
+    sources = {"providers": (path, "Provider_ID")}
+    sync_all(db_path, sources)
+    with get_pool(db_path).connection() as conn:
+        database = database_id(conn)
+    assert has_snapshot("providers", database, 1, db_path)
+
+    # a row write leaves the rerun's sync read-only; the table comes from SQLite
+    insert_row("providers", {"Provider_ID": 2, "Name": "B"}, db_path)
+    assert sync_all(db_path, sources) == {"providers": 0}
+    assert not has_snapshot("providers", database, 2, db_path)
+    assert TableRepository(db_path, tables=("providers",)).get("providers")["Name"].tolist() == ["A", "B"]
+
+    pd.DataFrame([{"Provider_ID": 1, "Name": "A2"}]).to_csv(path, index=False)
+    os.utime(path, ns=(1, 1))
+    assert sync_all(db_path, sources) == {"providers": 1}
+    assert has_snapshot("providers", database, 3, db_path)
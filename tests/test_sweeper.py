@@ -0,0 +1,80 @@
+import sqlite3
+from datetime import date
+
+import pytest
+
+from bulk_load import load_all
+from storage import insert_row, next_id, transaction
+from sweeper import sweep, wasted_totals
+from sync import sync_all
+from tests.test_sync import table, write_csv
+
+
+AS_OF = date(2024, 1, 1)
+
+
+def wasted(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return wasted_totals(conn)
+    finally:
+        conn.close()
+
+
+def archived_ids(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return [row[0] for row in conn.execute("SELECT Food_ID FROM food_listings_archive ORDER BY Food_ID")]
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def listings_csv(db_path, tmp_path):
+    path = str(tmp_path / "food.csv")
+    rows = [{"Food_ID": 1, "Food_Name": "Rice", "Quantity": 10, "Expiry_Date": "2023-06-01"},
+            {"Food_ID": 2, "Food_Name": "Dal", "Quantity": 4, "Expiry_Date": "2030-06-01"}]
+    write_csv(path, rows)
+    sync_all(db_path, {"food_listings": (path, "Food_ID")})
+    return path, rows
+
+
+def test_sweep_twice_counts_the_waste_once(db_path, listings_csv):
+    assert sweep(AS_OF, db_path=db_path)["archived"] == 1
+    assert sweep(AS_OF, db_path=db_path)["archived"] == 0
+    assert wasted(db_path) == (1, 10)
+    assert table(db_path, "food_listings", "Food_ID")["Food_ID"].tolist() == [2]
+
+
+def test_archived_listing_is_not_brought_back_by_the_csv(db_path, listings_csv):
+    path, rows = listings_csv
+    sources = {"food_listings": (path, "Food_ID")}
+    sweep(AS_OF, db_path=db_path)
+
+    # dropped from the CSV and added back, then the whole CSV reloaded
+    write_csv(path, rows[1:])
+    sync_all(db_path, sources)
+    write_csv(path, rows)
+    sync_all(db_path, sources)
+    load_all(db_path, sources)
+    assert table(db_path, "food_listings", "Food_ID")["Food_ID"].tolist() == [2]
+
+    sweep(AS_OF, db_path=db_path)
+    assert archived_ids(db_path) == [1]
+    assert wasted(db_path) == (1, 10)
+
+
+def test_listing_put_back_by_another_writer_is_not_counted_twice(db_path, listings_csv):
+    sweep(AS_OF, db_path=db_path)
+    with transaction(db_path) as conn:
+        conn.execute("INSERT INTO food_listings (Food_ID, Quantity, Expiry_Date) VALUES (1, 10, '2023-06-01')")
+    assert sweep(AS_OF, db_path=db_path)["archived"] == 1
+    assert archived_ids(db_path) == [1]
+    assert wasted(db_path) == (1, 10)
+
+
+def test_archived_keys_are_not_reused(db_path):
+    insert_row("food_listings", {"Food_ID": 5, "Quantity": 1, "Expiry_Date": "2023-06-01"}, db_path)
+    sweep(AS_OF, db_path=db_path)
+    with transaction(db_path) as conn:
+        assert next_id(conn, "food_listings") == 6
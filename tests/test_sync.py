@@ -0,0 +1,139 @@
+import itertools
+import os
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from claims import place_claim
+from export import export_to_file
+from storage import delete_row, insert_row, update_row
+from sync import sync_all
+
+
+_mtimes = itertools.count(1_700_000_000 * 10 ** 9, 10 ** 9)
+
+
+def write_csv(path, rows):
+    pd.DataFrame(rows).to_csv(path, index=False)
+    # a distinct mtime per write, whatever the filesystem's clock resolution
+    mtime = next(_mtimes)
+    os.utime(path, ns=(mtime, mtime))
+
+
+def table(db_path, name, pk):
+    conn = sqlite3.connect(db_path)
+    try:
+        return pd.read_sql(f'SELECT * FROM "{name}" ORDER BY "{pk}"', conn)
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def providers_csv(tmp_path):
+    path = str(tmp_path / "providers.csv")
+    rows = [
+        {"Provider_ID": 1, "Name": "Annapurna", "Type": "Restaurant", "City": "Pune"},
+        {"Provider_ID": 2, "Name": "Bake House", "Type": "Bakery", "City": "Goa"},
+    ]
+    write_csv(path, rows)
+    return path, rows
+
+
+def test_first_sync_imports_the_csv_and_an_unchanged_csv_is_skipped(db_path, providers_csv):
+    path, rows = providers_csv
+    sources = {"providers": (path, "Provider_ID")}
+    assert sync_all(db_path, sources) == {"providers": 2}
+    assert table(db_path, "providers", "Provider_ID")["Name"].tolist() == ["Annapurna", "Bake House"]
+    assert sync_all(db_path, sources) == {"providers": 0}
+
+
+def test_csv_edits_are_applied(db_path, providers_csv):
+    path, rows = providers_csv
+    sources = {"providers": (path, "Provider_ID")}
+    sync_all(db_path, sources)
+
+    rows[0]["Name"] = "Annapurna Mess"
+    del rows[1]
+    rows.append({"Provider_ID": 3, "Name": "Curry Point", "Type": "Restaurant", "City": "Agra"})
+    write_csv(path, rows)
+    assert sync_all(db_path, sources) == {"providers": 3}
+
+    df = table(db_path, "providers", "Provider_ID")
+    assert df["Provider_ID"].tolist() == [1, 3]
+    assert df["Name"].tolist() == ["Annapurna Mess", "Curry Point"]
+
+
+def test_database_writes_survive_a_csv_edit(db_path, providers_csv):
+    path, rows = providers_csv
+    sources = {"providers": (path, "Provider_ID")}
+    sync_all(db_path, sources)
+    insert_row("providers", {"Provider_ID": 10, "Name": "Dosa Corner", "City": "Pune"}, db_path)
+    update_row("providers", 1, {"City": "Mumbai"}, db_path)
+    delete_row("providers", 2, db_path)
+
+    rows.append({"Provider_ID": 3, "Name": "Curry Point", "Type": "Restaurant", "City": "Agra"})
+    write_csv(path, rows)
+    sync_all(db_path, sources)
+
+    df = table(db_path, "providers", "Provider_ID").set_index("Provider_ID")
+    assert df.index.tolist() == [1, 3, 10]
+    assert df.loc[1, "City"] == "Mumbai"
+
+
+def test_a_null_elsewhere_in_a_column_is_not_an_edit(db_path, tmp_path):
+    path = str(tmp_path / "food.csv")
+    rows = [{"Food_ID": 1, "Food_Name": "Rice", "Quantity": 10}, {"Food_ID": 2, "Food_Name": "Dal", "Quantity": 4}]
+    write_csv(path, rows)
+    sources = {"food_listings": (path, "Food_ID")}
+    sync_all(db_path, sources)
+    update_row("food_listings", 1, {"Food_Name": "Jeera Rice"}, db_path)
+
+    # pandas now reads Quantity as float: 10 becomes 10.0 but row 1 is unchanged
+    rows[1]["Quantity"] = None
+    write_csv(path, rows)
+    assert sync_all(db_path, sources) == {"food_listings": 1}
+    df = table(db_path, "food_listings", "Food_ID")
+    assert df["Food_Name"].tolist() == ["Jeera Rice", "Dal"]
+    assert df["Quantity"].isna().tolist() == [False, True]
+
+
+def test_reservation_survives_a_csv_edit(db_path, tmp_path):
+    listings = str(tmp_path / "food.csv")
+    rows = [{"Food_ID": 1, "Food_Name": "Rice", "Quantity": 10, "Location": "Pune"},
+            {"Food_ID": 2, "Food_Name": "Dal", "Quantity": 4, "Location": "Pune"}]
+    write_csv(listings, rows)
+    sources = {"food_listings": (listings, "Food_ID")}
+    sync_all(db_path, sources)
+    place_claim(1, 5, 3, db_path=db_path)
+
+    rows[1]["Quantity"] = 6
+    write_csv(listings, rows)
+    sync_all(db_path, sources)
+    df = table(db_path, "food_listings", "Food_ID")
+    assert df["Quantity"].tolist() == [10, 6]
+    assert df["Reserved"].tolist() == [3, 0]
+
+
+def test_first_sync_keeps_rows_the_database_already_has(db_path, providers_csv):
+    path, rows = providers_csv
+    insert_row("providers", {"Provider_ID": 1, "Name": "Annapurna", "City": "Mumbai"}, db_path)
+    sync_all(db_path, {"providers": (path, "Provider_ID")})
+
+    df = table(db_path, "providers", "Provider_ID")
+    assert df["City"].tolist() == ["Mumbai", "Goa"]
+
+
+def test_a_csv_exported_from_the_database_syncs_back_unchanged(db_path, providers_csv, tmp_path):
+    path, rows = providers_csv
+    sync_all(db_path, {"providers": (path, "Provider_ID")})
+    update_row("providers", 2, {"City": "Panaji"}, db_path)
+    before = table(db_path, "providers", "Provider_ID")
+
+    exported = str(tmp_path / "exported.csv")
+    export_to_file(exported, "table", "providers")
+    sources = {"providers": (exported, "Provider_ID")}
+    # its rows differ from the last CSV's (more columns), so they are rewritten, with the same values
+    sync_all(db_path, sources)
+    assert sync_all(db_path, sources) == {"providers": 0}
+    assert table(db_path, "providers", "Provider_ID").equals(before)
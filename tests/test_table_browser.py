@@ -0,0 +1,48 @@
+import pytest
+
+from table_browser import fetch_page
+
+
+CITIES = ["Pune", None, "Goa", "Pune", None, "Agra", "Goa", "Pune", None, "Agra", "Delhi"]
+
+
+def _walk(table, **options):
+    keys, cursor = [], None
+    while True:
+        df, cursor = fetch_page(table, cursor=cursor, **options)
+        keys += df["Provider_ID"].tolist()
+        if cursor is None:
+            return keys
+
+
+@pytest.fixture
+def providers(seed):
+    seed("providers", [{"Provider_ID": i + 1, "Name": f"P{i}", "City": city} for i, city in enumerate(CITIES)])
+
+
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("page_size", [1, 2, 3, 50])
+def test_pages_by_key_cover_every_row_once(providers, page_size, descending):
+    keys = _walk("providers", page_size=page_size, descending=descending)
+    assert keys == sorted(range(1, len(CITIES) + 1), reverse=descending)
+
+
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("page_size", [1, 2, 4])
+def test_pages_by_column_with_ties_and_nulls_cover_every_row_once(providers, page_size, descending):
+    keys = _walk("providers", columns=["Provider_ID", "City"], sort_by="City",
+                 page_size=page_size, descending=descending)
+    # SQLite's order: NULLs first ascending, last descending; ties by key
+    rows = [(city, key) for key, city in enumerate(CITIES, 1)]
+    nulls = sorted(key for city, key in rows if city is None)
+    named = sorted((city, key) for city, key in rows if city is not None)
+    if descending:
+        expected = [key for _, key in reversed(named)] + nulls[::-1]
+    else:
+        expected = nulls + [key for _, key in named]
+    assert keys == expected
+
+
+def test_unknown_sort_column_is_rejected(providers):
+    with pytest.raises(ValueError):
+        fetch_page("providers", sort_by="Nope")
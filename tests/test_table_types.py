@@ -0,0 +1,29 @@
+import pandas as pd
+
+from snapshot import read_snapshot, write_snapshot
+from table_types import to_typed
+
+
+def test_quantity_with_a_null_stays_an_exact_integer():
+    df = to_typed("food_listings", pd.DataFrame({"Quantity": [16_777_217, None, 3]}))
+    assert str(df["Quantity"].dtype) == "Int32"
+    assert df["Quantity"].tolist() == [16_777_217, pd.NA, 3]
+    assert to_typed("food_listings", df)["Quantity"].dtype == df["Quantity"].dtype
+
+    wide = to_typed("food_listings", pd.DataFrame({"Quantity": [2 ** 40, None]}))
+    assert str(wide["Quantity"].dtype) == "Int64"
+    assert wide["Quantity"].iloc[0] == 2 ** 40
+
+
+def test_fractional_quantity_stays_float():
+    df = to_typed("food_listings", pd.DataFrame({"Quantity": [1.5, None]}))
+    assert df["Quantity"].dtype == "float64"
+
+
+def test_nullable_quantity_round_trips_through_a_snapshot(tmp_path):
+    db_path = str(tmp_path / "food.db")
+    df = to_typed("claims", pd.DataFrame({"Claim_ID": [1, 2, 3], "Quantity": [5, None, 7]}))
+    assert write_snapshot("claims", df, "db", 1, db_path)
+    back = read_snapshot("claims", "db", 1, db_path)
+    assert back["Quantity"].dtype == df["Quantity"].dtype
+    assert back["Quantity"].tolist() == [5, pd.NA, 7]
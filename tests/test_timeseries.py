@@ -0,0 +1,52 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from timeseries import claim_counts
+
+
+# either side of midnight, of a week start (2030-01-07 and 2030-03-04 are
+# Mondays) and of a month end, plus a leap of several empty weeks
+TIMESTAMPS = [
+    "2030-01-06 23:59:59", "2030-01-07 00:00:00", "2030-01-07 00:59:00", "2030-01-07 01:00:00",
+    "2030-01-31 23:30:00", "2030-01-31 23:59:59", "2030-02-01 00:00:00", "2030-02-01 00:00:01",
+    "2030-02-28 12:00:00", "2030-03-01 00:00:00", "2030-03-03 23:59:59", "2030-03-04 00:00:00",
+    "2030-03-04 00:00:00", "2030-03-31 23:00:00",
+]
+
+# the bucket start for each resolution, computed independently of aggregates.py
+BUCKETS = {
+    "hour": "strftime('%Y-%m-%d %H:00:00', Timestamp)",
+    "day": "strftime('%Y-%m-%d', Timestamp)",
+    "week": "date(Timestamp, '-' || ((CAST(strftime('%w', Timestamp) AS INTEGER) + 6) % 7) || ' days')",
+    "month": "strftime('%Y-%m-01', Timestamp)",
+}
+
+
+@pytest.fixture
+def claims(seed):
+    seed("claims", [{"Claim_ID": i + 1, "Food_ID": 1, "Receiver_ID": 1, "Status": "Pending", "Timestamp": ts}
+                    for i, ts in enumerate(TIMESTAMPS)])
+
+
+@pytest.mark.parametrize("resolution", list(BUCKETS))
+def test_rollups_match_a_group_by(db_path, claims, resolution):
+    conn = sqlite3.connect(db_path)
+    try:
+        expected = {pd.Timestamp(bucket): count for bucket, count in conn.execute(
+            f"SELECT {BUCKETS[resolution]} AS bucket, COUNT(*) FROM claims GROUP BY bucket")}
+    finally:
+        conn.close()
+
+    df, used = claim_counts("2030-01-01", "2030-03-31", max_points=10_000, resolution=resolution)
+    assert used == resolution
+    assert df["Claims"].sum() == len(TIMESTAMPS)
+    assert dict(zip(df.loc[df["Claims"] > 0, "Period"], df.loc[df["Claims"] > 0, "Claims"])) == expected
+
+
+def test_downsampling_keeps_the_total(claims):
+    df, used = claim_counts("2030-01-01", "2030-03-31", max_points=10)
+    assert used == "month" and len(df) == 3
+    df, used = claim_counts("2030-01-01", "2030-03-31", max_points=10, resolution="day")
+    assert len(df) <= 10 and df["Claims"].sum() == len(TIMESTAMPS)
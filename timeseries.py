@@ -0,0 +1,95 @@
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from datasource import fetchall, fetchone
+
+
+# Claim counts per bucket, kept current by the aggregate triggers
+# (aggregates.AGGREGATES); finest first.
+Resolution = namedtuple("Resolution", "name table key step freq")
+
+RESOLUTIONS = [
+    Resolution("hour", "agg_claims_hour", "Claim_Hour", timedelta(hours=1), "h"),
+    Resolution("day", "agg_claims_day", "Claim_Day", timedelta(days=1), "D"),
+    Resolution("week", "agg_claims_week", "Claim_Week", timedelta(weeks=1), "W-MON"),
+    Resolution("month", "agg_claims_month", "Claim_Month", timedelta(days=31), "MS"),
+]
+
+MAX_POINTS = 500
+
+
+def _resolution(name):
+    return next(r for r in RESOLUTIONS if r.name == name)
+
+
+def _floor(moment, resolution):
+    moment = pd.Timestamp(moment)
+    if resolution.name == "hour":
+        return moment.floor("h")
+    moment = moment.normalize()
+    if resolution.name == "week":
+        return moment - pd.Timedelta(days=moment.weekday())
+    if resolution.name == "month":
+        return moment.replace(day=1)
+    return moment
+
+
+def _key(moment, resolution):
+    return moment.strftime("%Y-%m-%d %H:00" if resolution.name == "hour" else "%Y-%m-%d")
+
+
+def claim_range():
+    """(first, last) claim day as Timestamps, or None when no claim has a parseable date."""
+    first, last = fetchone("SELECT MIN(Claim_Day), MAX(Claim_Day) FROM agg_claims_day")
+    if first is None:
+        return None
+    return pd.Timestamp(first), pd.Timestamp(last)
+
+
+def pick_resolution(start, end, max_points=MAX_POINTS):
+    """The finest resolution covering [start, end] in at most max_points buckets (else month)."""
+    span = pd.Timestamp(end) - pd.Timestamp(start)
+    for resolution in RESOLUTIONS:
+        if span // resolution.step + 1 <= max_points:
+            return resolution
+    return RESOLUTIONS[-1]
+
+
+def claim_counts(start=None, end=None, max_points=MAX_POINTS, resolution=None):
+    """Claims per period over [start, end] (dates or datetimes, default: all claims).
+
+    Reads one rollup: the named resolution, or the finest that fits the range
+    in max_points buckets, so the rows read are bounded by max_points however
+    long the history. Empty buckets are filled with 0; if there are still more
+    than max_points, consecutive buckets are summed down to max_points.
+    Returns a DataFrame of Period (bucket start) and Claims, and the resolution used.
+    """
+    if start is None or end is None:
+        bounds = claim_range()
+        if bounds is None:
+            return pd.DataFrame({"Period": pd.Series(dtype="datetime64[ns]"), "Claims": pd.Series(dtype="int64")}), None
+        start = bounds[0] if start is None else start
+        end = bounds[1] + pd.Timedelta(hours=23) if end is None else end
+    if not isinstance(end, datetime) and pd.Timestamp(end) == pd.Timestamp(end).normalize():
+        # a date (or date string) as the end means the whole of that day
+        end = pd.Timestamp(end) + pd.Timedelta(hours=23)
+    resolution = _resolution(resolution) if resolution else pick_resolution(start, end, max_points)
+    first, last = _floor(start, resolution), _floor(end, resolution)
+
+    rows = fetchall(
+        f"SELECT {resolution.key}, Row_Count FROM {resolution.table} "
+        f"WHERE {resolution.key} BETWEEN ? AND ? ORDER BY {resolution.key}",
+        (_key(first, resolution), _key(last, resolution)),
+    )
+    periods = pd.date_range(first, last, freq=resolution.freq)
+    counts = pd.Series(dict(rows), dtype="int64")
+    counts.index = pd.to_datetime(counts.index)
+    series = counts.reindex(periods, fill_value=0)
+
+    if len(series) > max_points:
+        width = -(-len(series) // max_points)
+        groups = pd.RangeIndex(len(series)) // width
+        series = pd.Series(series.to_numpy(), index=groups).groupby(level=0).sum().set_axis(series.index[::width])
+    return pd.DataFrame({"Period": series.index, "Claims": series.to_numpy()}), resolution.name
@@ -0,0 +1,48 @@
+import sqlite3
+import uuid
+
+
+def ensure_versions(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS _table_versions (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+
+
+def bump_version(conn, table):
+    ensure_versions(conn)
+    conn.execute("""
+        INSERT INTO _table_versions (table_name, version) VALUES (?, 1)
+        ON CONFLICT(table_name) DO UPDATE SET version = version + 1
+    """, (table,))
+    return conn.execute(
+        "SELECT version FROM _table_versions WHERE table_name = ?", (table,)
+    ).fetchone()[0]
+
+
+def get_versions(conn):
+    try:
+        return dict(conn.execute("SELECT table_name, version FROM _table_versions"))
+    except sqlite3.OperationalError:
+        # nothing has been stamped yet
+        return {}
+
+
+def ensure_database_id(conn):
+    # a random identity, so caches keyed by version stamps (snapshot.py) can
+    # tell this database from another one later put at the same path
+    conn.execute("CREATE TABLE IF NOT EXISTS _database_id (id TEXT NOT NULL)")
+    if conn.execute("SELECT 1 FROM _database_id").fetchone() is None:
+        conn.execute("INSERT INTO _database_id (id) VALUES (?)", (uuid.uuid4().hex,))
+
+
+def database_id(conn):
+    try:
+        row = conn.execute("SELECT id FROM _database_id").fetchone()
+    except sqlite3.OperationalError:
+        # not migrated yet
+        return None
+    return row[0] if row else None
+